@@ -61,6 +61,7 @@ if hasattr(chess_ext, "VictoryType"):
     VICTORY_TO_STR = {
         chess_ext.VictoryType.WHITE: "white",
         chess_ext.VictoryType.BLACK: "black",
+        chess_ext.VictoryType.DRAW: "draw",
         chess_ext.VictoryType.NONE: None,
     }
 else:
@@ -327,32 +328,11 @@ class ChessEngineAdapter:
             if matching_pgn is None:
                 return False
 
-            # 캡처 대상의 스택을 이동 전에 확보
-            captured_stun = 0
-            captured_move = 0
-            try:
-                mover_color = self._board(sf, sr).getColor()
-                target_piece = self._board(df, dr)
-                if target_piece.getPieceType() != chess_ext.PieceType.NONE and target_piece.getColor() != mover_color:
-                    self._board.controllPocketValue(mover_color, target_piece.getPieceType(), 1)
-                    captured_stun = target_piece.getStun()
-                    captured_move = target_piece.getMove()
-            except Exception:
-                pass
-
+            # 잡기 스택 전가/포켓/이동 스택 감소/턴 종료는 엔진의 updatePiece가 처리한다
             try:
                 self._board.updatePiece(matching_pgn)
             except Exception:
                 return False
-            try:
-                moved_piece = self._board(df, dr)
-                if captured_stun:
-                    moved_piece.addStun(captured_stun)
-                if captured_move:
-                    moved_piece.addMove(captured_move)
-                moved_piece.minusOneMove()
-            except Exception:
-                pass
             self._last_move = (src, dst)
             return True
         except Exception:
@@ -437,32 +417,11 @@ class ChessEngineAdapter:
             return False
         chosen = matches[choice_index]
 
-        # preserve capture stacks similar to move()/promote_move()
-        captured_stun = 0
-        captured_move = 0
-        try:
-            mover_color = self._board(sf, sr).getColor()
-            target_piece = self._board(df, dr)
-            if target_piece.getPieceType() != chess_ext.PieceType.NONE and target_piece.getColor() != mover_color:
-                self._board.controllPocketValue(mover_color, target_piece.getPieceType(), 1)
-                captured_stun = target_piece.getStun()
-                captured_move = target_piece.getMove()
-        except Exception:
-            pass
-
+        # 잡기/스택 처리는 엔진의 updatePiece가 move()와 같은 규칙으로 수행한다
         try:
             self._board.updatePiece(chosen)
         except Exception:
             return False
-        try:
-            moved_piece = self._board(df, dr)
-            if captured_stun:
-                moved_piece.addStun(captured_stun)
-            if captured_move:
-                moved_piece.addMove(captured_move)
-            moved_piece.minusOneMove()
-        except Exception:
-            pass
         self._last_move = (src, dst)
         return True
 
@@ -506,25 +465,6 @@ class ChessEngineAdapter:
         if pt is None:
             return False
         try:
-            # 원본 스택
-            try:
-                origin_piece = self._board(sf, sr)
-                old_stun = origin_piece.getStun()
-                old_move = origin_piece.getMove()
-            except Exception:
-                old_stun = 0
-                old_move = 0
-            # 캡처 대상 스택
-            captured_stun = 0
-            captured_move = 0
-            try:
-                mover_color = self._board(sf, sr).getColor()
-                target_piece = self._board(df, dr)
-                if target_piece.getPieceType() != chess_ext.PieceType.NONE and target_piece.getColor() != mover_color:
-                    captured_stun = target_piece.getStun()
-                    captured_move = target_piece.getMove()
-            except Exception:
-                pass
             # 해당 승격 PGN 선택
             try:
                 mover_color = self._board(sf, sr).getColor()
@@ -548,21 +488,11 @@ class ChessEngineAdapter:
                         pass
             if chosen is None:
                 return False
+            # 승격 기물은 폰의 스택을 이어받고, 잡기/턴 종료 처리도 엔진이 함께 한다
             try:
                 self._board.updatePiece(chosen)
             except Exception:
                 return False
-            try:
-                promoted_piece = self._board(df, dr)
-                promoted_piece.setStun(old_stun)
-                promoted_piece.setMove(old_move)
-                if captured_stun:
-                    promoted_piece.addStun(captured_stun)
-                if captured_move:
-                    promoted_piece.addMove(captured_move)
-                promoted_piece.minusOneMove()
-            except Exception:
-                pass
             self._last_move = (src, dst)
             return True
         except Exception:
@@ -590,13 +520,15 @@ class ChessEngineAdapter:
 
     def stun(self, file: int, rank: int) -> bool:
         """
-        해당 위치 기물에 스턴 추가
+        해당 위치 기물에 스턴 추가 (규칙 10). 엔진이 턴 종료까지 처리한다.
         """
+        ct = chess_ext.ColorType.WHITE if self.turn == "white" else chess_ext.ColorType.BLACK
         try:
-            p = self._board(file, rank)
-            if p.getPieceType() == chess_ext.PieceType.NONE:
+            pgn = chess_ext.PGN(ct, file, rank, chess_ext.MoveType.STUN)
+            try:
+                self._board.updatePiece(pgn)
+            except Exception:
                 return False
-            p.addOneStun()
             return True
         except Exception:
             return False
@@ -630,16 +562,13 @@ class ChessEngineAdapter:
         winner = VICTORY_TO_STR.get(vt)
         return winner if winner in ("white", "black") else None
 
+    def position_hash(self) -> int:
+        """엔진이 유지하는 현재 포지션의 64비트 Zobrist 해시 (스택, 로얄, 포켓, 차례 포함)."""
+        return int(self._board.getHash())
+
     def end_turn(self, flip: bool = False):
-        """턴 종료 시 스택 처리. updatePiece가 이미 턴을 넘기므로 기본은 swap하지 않는다.
-        flip=True로 호출할 때만 턴을 추가로 넘긴다 (updatePiece를 거치지 않은 액션용)."""
-        current = self.turn
-        for f in range(8):
-            for r in range(8):
-                p = self._board(f, r)
-                if p.getStun() != 0 and p.getColor() != STR_TO_COLOR_TYPE.get(current):
-                    p.addStun(-1)
-                    p.addMove(1)
+        """턴 종료 훅. 스턴/이동 스택 처리와 차례 넘김은 엔진의 updatePiece가 수마다 수행하므로
+        기본은 아무것도 하지 않는다. flip=True로 호출할 때만 턴을 추가로 넘긴다 (updatePiece를 거치지 않은 액션용)."""
         if flip:
             try:
                 self._board.swapTurn()
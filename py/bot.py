@@ -18,11 +18,15 @@ class MinimaxBot:
         engine: ChessEngineAdapter instance
         color: 'white' or 'black'
         depth: search depth passed to the C++ bot
+        time_ms: per-move time budget in ms (0 = depth only). When set, the
+            C++ `search(board, SearchLimits)` driver stops on time and returns
+            the last completed iteration.
     """
-    def __init__(self, engine: ChessEngineAdapter, color: str = "black", depth: int = 3):
+    def __init__(self, engine: ChessEngineAdapter, color: str = "black", depth: int = 3, time_ms: int = 0):
         self.engine = engine
         self.color = color
         self.depth = depth
+        self.time_ms = time_ms
         self._last_move_str = ""
         ct = chess_ext.ColorType.WHITE if color == "white" else chess_ext.ColorType.BLACK
         self._bot = chess_ext.Minimax(ct)
@@ -35,7 +39,7 @@ class MinimaxBot:
         if self.engine.turn != self.color:
             return False
 
-        pgn = self._bot.getBestMove(self.engine._board, int(self.depth))
+        pgn = self._search(int(self.depth)).bestMove
         try:
             mt = pgn.getMoveType()
         except Exception:
@@ -100,8 +104,23 @@ class MinimaxBot:
                 pass
             return ok
 
+        if mt == chess_ext.MoveType.STUN:
+            # rule 10: stun any piece on the board; the engine ends the turn
+            f, r = pgn.getFromSquare()
+            ok = self.engine.stun(f, r)
+            try:
+                self._last_move_str = f"STUN at({f},{r})"
+            except Exception:
+                pass
+            return ok
+
         return False
 
+    def _search(self, depth: int):
+        """Run the C++ search driver with this wrapper's depth/time limits."""
+        limits = chess_ext.SearchLimits(depth=depth, time_ms=int(self.time_ms))
+        return self._bot.search(self.engine._board, limits)
+
     def get_best_line(self, depth: int = 0):
         """Return principal variation (list of PGN) from the C++ bot for given depth.
 
@@ -109,8 +128,7 @@ class MinimaxBot:
         """
         d = int(self.depth if depth is None else depth)
         try:
-            line = self._bot.getBestLine(self.engine._board, d)
-            return list(line)
+            return list(self._search(d).line)
         except Exception:
             return []
 
@@ -118,17 +136,18 @@ class MinimaxBot:
         """Return CalcInfo from the underlying C++ bot."""
         d = int(self.depth if depth is None or depth == 0 else depth)
         try:
-            return self._bot.getCalcInfo(self.engine._board, d)
+            return self._search(d)
         except Exception:
             return None
 
 
 class MinimaxGPTBot(MinimaxBot):
     """Wrapper that uses the GPT-proposed minimax implementation."""
-    def __init__(self, engine: ChessEngineAdapter, color: str = "black", depth: int = 3):
+    def __init__(self, engine: ChessEngineAdapter, color: str = "black", depth: int = 3, time_ms: int = 0):
         self.engine = engine
         self.color = color
         self.depth = depth
+        self.time_ms = time_ms
         ct = chess_ext.ColorType.WHITE if color == "white" else chess_ext.ColorType.BLACK
         self._bot = chess_ext.MinimaxGPT(ct)
         try:
@@ -146,8 +165,7 @@ class MinimaxGPTBot(MinimaxBot):
     def get_best_line(self, depth: int = 0):
         d = int(self.depth if depth == 0 else depth)
         try:
-            line = self._bot.getBestLine(self.engine._board, d)
-            return list(line)
+            return list(self._search(d).line)
         except Exception:
             return []
 
@@ -102,7 +102,8 @@ def demo_bot():
 	board.displayBoard()
 
 	# create a Minimax bot for white and ask it to play one move
-	bot = MinimaxBot(engine, color='white', depth=10)
+	# depth 10 is an upper bound; time_ms caps each search at about 2 seconds
+	bot = MinimaxBot(engine, color='white', depth=10, time_ms=2000)
 
 	# Example: request the principal variation (best line) from the bot
 	# - `get_best_line(depth)` returns a list of PGN objects; we'll print
@@ -124,6 +125,9 @@ def demo_bot():
 				elif mt == chess_ext.MoveType.SUCCESION:
 					f, r = mv.getFromSquare()
 					print(f"{i}. SUCCESION @ {idx_to_alg(f,r)}")
+				elif mt == chess_ext.MoveType.STUN:
+					f, r = mv.getFromSquare()
+					print(f"{i}. STUN @ {idx_to_alg(f,r)}")
 				else:
 					print(f"{i}. {mv}")
 			except Exception:
@@ -133,8 +137,8 @@ def demo_bot():
 
 	moved = bot.get_best_move()
 	if moved:
-		# the adapter's move functions do not automatically call end_turn(), so
-		# call it to advance the turn and apply end-of-turn bookkeeping
+		# the engine applies end-of-turn bookkeeping inside updatePiece;
+		# end_turn() is kept as the adapter's turn hook
 		engine.end_turn()
 		print('\nBot executed a move:')
 		board.displayBoard()
@@ -156,6 +160,9 @@ def _pgn_to_human(mv):
 	if mt == chess_ext.MoveType.SUCCESION:
 		f, r = mv.getFromSquare()
 		return f"SUCCESION @ {idx_to_alg(f,r)}"
+	if mt == chess_ext.MoveType.STUN:
+		f, r = mv.getFromSquare()
+		return f"STUN @ {idx_to_alg(f,r)}"
 	return repr(mv)
 
 
@@ -187,8 +187,8 @@ def main(engine):
                                     else:
                                         ok = False
                                     if ok:
-                                        # Stun does not pass through updatePiece, so we manually flip the turn
-                                        engine.end_turn(flip=True)
+                                        # Succession and stun go through updatePiece, which already ends the turn
+                                        engine.end_turn()
                                         ui.analysis_dirty = True
                                     # Check victory after action
                                     if not ui.victory_visible:
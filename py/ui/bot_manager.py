@@ -37,6 +37,9 @@ def pgn_to_str(pgn) -> str:
         dis_pt = pgn.getPieceType()
         sym = PIECE_TYPE_TO_STR.get(dis_pt, "?")
         return f"DIS {idx_to_alg(f, r)}={sym}"
+    if mt == chess_ext.MoveType.STUN:
+        f, r = pgn.getFromSquare()
+        return f"STUN@{idx_to_alg(f, r)}"
     return "?"
 
 
@@ -92,9 +95,9 @@ def update_analysis(ui: UIState, bot) -> None:
 def create_bot(engine, ui: UIState):
     """UI 설정을 반영해 봇 인스턴스를 만들고 placement_sample을 적용."""
     if ui.bot_type == "GPTproposed":
-        b = MinimaxGPTBot(engine, ui.bot_color, depth=ui.depth)
+        b = MinimaxGPTBot(engine, ui.bot_color, depth=ui.depth, time_ms=ui.search_time_ms)
     else:
-        b = MinimaxBot(engine, ui.bot_color, depth=ui.depth)
+        b = MinimaxBot(engine, ui.bot_color, depth=ui.depth, time_ms=ui.search_time_ms)
     try:
         b._bot.setPlacementSample(int(ui.placement_sample))
     except Exception:
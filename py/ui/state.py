@@ -44,6 +44,7 @@ class UIState:
     analysis_best: str = ""
     analysis_pv: List[str] = field(default_factory=list)
     depth: int = 4
+    search_time_ms: int = 0  # 0이면 depth까지 탐색, 양수면 이 시간(ms) 안에서 끝난 깊이까지만
     analysis_dirty: bool = True
 
     # Interaction helpers
@@ -36,6 +36,19 @@ static agent::calcInfo py_getCalcInfo_gpt(agent::minimax_GPTproposed &bot, const
 	return bot.getCalcInfo(pos, depth);
 }
 
+// search(board, limits): 포지션 복사 후 GIL을 풀고 탐색한다 (UI 스레드가 멈추지 않도록)
+static agent::calcInfo py_search(agent::minimax &bot, const chessboard &b, const agent::SearchLimits &limits){
+	position pos = b.getPosition();
+	py::gil_scoped_release release;
+	return bot.search(pos, limits);
+}
+
+static agent::calcInfo py_search_gpt(agent::minimax_GPTproposed &bot, const chessboard &b, const agent::SearchLimits &limits){
+	position pos = b.getPosition();
+	py::gil_scoped_release release;
+	return bot.search(pos, limits);
+}
+
 PYBIND11_MODULE(chess_ext, m) {
 	m.doc() = "pybind11 bindings for project_bc_refectoring chess engine (prototype)";
 
@@ -84,12 +97,14 @@ PYBIND11_MODULE(chess_ext, m) {
 		.value("SUCCESION", moveType::SUCCESION)
 		.value("PROMOTE", moveType::PROMOTE)
 		.value("DISGUISE", moveType::DISGUISE)
+		.value("STUN", moveType::STUN)
 		.export_values();
 
 	py::enum_<victoryType>(m, "VictoryType")
 	    .value("NONE", victoryType::NONE)
 		.value("WHITE", victoryType::WHITE)
 		.value("BLACK", victoryType::BLACK)
+		.value("DRAW", victoryType::DRAW)
 		.export_values();
 	// PGN
 	py::class_<PGN>(m, "PGN")
@@ -152,11 +167,16 @@ PYBIND11_MODULE(chess_ext, m) {
 		.def("displayPieceInfo", &chessboard::displayPieceInfo)
 		.def("isInBounds", &chessboard::isInBounds)
 		.def("calcLegalMovesInOnePiece", &chessboard::calcLegalMovesInOnePiece)
+		.def("countMobility", py::overload_cast<int, int, bool>(&chessboard::countMobility, py::const_), py::arg("file"), py::arg("rank"), py::arg("calc_potential"))
+		.def("threatenedValue", &chessboard::threatenedValue, py::arg("file"), py::arg("rank"), py::arg("values"))
 		.def("calcLegalPlacePiece", &chessboard::calcLegalPlacePiece)
 		.def("calcLegalSuccesion", &chessboard::calcLegalSuccesion)
 		.def("calcLegalDisguise", &chessboard::calcLegalDisguise)
+		.def("calcLegalStun", &chessboard::calcLegalStun)
 		.def("swapTurn", &chessboard::swapTurn)
 		.def("updatePiece", &chessboard::updatePiece)
+		.def("isLegal", py::overload_cast<const PGN&>(&chessboard::isLegal, py::const_), "Check a PGN against the current position without generating move lists")
+		.def("undoBoard", &chessboard::undoBoard)
 		.def("pieceStackControllByColor", &chessboard::pieceStackControllByColor)
 		.def("getWhitePocket", [](const chessboard &b) { return b.getWhitePocket(); })
 		.def("getBlackPocket", [](const chessboard &b) { return b.getBlackPocket(); })
@@ -190,6 +210,10 @@ PYBIND11_MODULE(chess_ext, m) {
 			out["board"] = board;
 			out["whitePocket"] = wp;
 			out["blackPocket"] = bp;
+			out["turn"] = pos.turn_right;
+			out["ply"] = pos.ply;
+			out["hash"] = pos.hash;
+			out["is_custom"] = pos.is_custom;
 			return out;
 		})
 		.def("setPosition", [](chessboard &b, py::dict d){
@@ -216,10 +240,21 @@ PYBIND11_MODULE(chess_ext, m) {
 			py::list wp = d["whitePocket"];
 			py::list bp = d["blackPocket"];
 			for(int i=0;i<NUMBER_OF_PIECEKIND;++i){ pos.whitePocket[i] = wp[i].cast<int>(); pos.blackPocket[i] = bp[i].cast<int>(); }
+			// 예전 형식의 dict(보드와 포켓만 있음)는 현재 보드의 차례/플래그를 유지한다
+			pos.turn_right = d.contains("turn") ? d["turn"].cast<colorType>() : b.getTurn();
+			pos.ply = d.contains("ply") ? d["ply"].cast<int>() : b.getPly();
+			pos.is_custom = d.contains("is_custom") ? d["is_custom"].cast<bool>() : b.getThisPositionIsCustom();
 			b.setPosition(pos);
 		})
 		.def("getTurn", &chessboard::getTurn)
-		.def("getWhoIsVictory", &chessboard::getWhoIsVictory);
+		.def("getWhoIsVictory", &chessboard::getWhoIsVictory)
+		.def("getHash", &chessboard::getHash)
+		.def("getPly", &chessboard::getPly)
+		// perft: 수 생성기 노드 수 (threads > 1이면 루트 수를 나눠 세므로 GIL을 풀어 둔다)
+		.def("perft", &chessboard::perft, py::arg("depth"), py::arg("include_stuns") = false, py::arg("threads") = 1,
+			py::call_guard<py::gil_scoped_release>())
+		.def("perftDivide", &chessboard::perftDivide, py::arg("depth"), py::arg("include_stuns") = false, py::arg("threads") = 1,
+			py::call_guard<py::gil_scoped_release>());
 
 	// helper: expose pair<int,int> conversion automatically via stl
 
@@ -228,7 +263,30 @@ PYBIND11_MODULE(chess_ext, m) {
 		.def(py::init<>())
 		.def_readwrite("eval_val", &agent::calcInfo::eval_val)
 		.def_readwrite("line", &agent::calcInfo::line)
-		.def_readwrite("bestMove", &agent::calcInfo::bestMove);
+		.def_readwrite("bestMove", &agent::calcInfo::bestMove)
+		.def_readwrite("depth", &agent::calcInfo::depth)
+		.def_readwrite("nodes", &agent::calcInfo::nodes)
+		.def_readwrite("qnodes", &agent::calcInfo::qnodes)
+		.def_readwrite("eval_probes", &agent::calcInfo::eval_probes)
+		.def_readwrite("eval_hits", &agent::calcInfo::eval_hits)
+		.def_readwrite("time_ms", &agent::calcInfo::time_ms);
+
+	// SearchLimits (0 = 제한 없음). 예: SearchLimits(depth=10, time_ms=500)
+	py::class_<agent::SearchLimits>(m, "SearchLimits")
+		.def(py::init([](int depth, int64_t time_ms, int64_t soft_ms, int64_t hard_ms, uint64_t nodes){
+			agent::SearchLimits l;
+			l.depth = depth;
+			l.time_ms = time_ms;
+			l.soft_ms = soft_ms;
+			l.hard_ms = hard_ms;
+			l.nodes = nodes;
+			return l;
+		}), py::arg("depth") = 64, py::arg("time_ms") = 0, py::arg("soft_ms") = 0, py::arg("hard_ms") = 0, py::arg("nodes") = 0)
+		.def_readwrite("depth", &agent::SearchLimits::depth)
+		.def_readwrite("time_ms", &agent::SearchLimits::time_ms)
+		.def_readwrite("soft_ms", &agent::SearchLimits::soft_ms)
+		.def_readwrite("hard_ms", &agent::SearchLimits::hard_ms)
+		.def_readwrite("nodes", &agent::SearchLimits::nodes);
 
 	// Bot bindings
 	py::class_<agent::minimax>(m, "Minimax")
@@ -236,31 +294,117 @@ PYBIND11_MODULE(chess_ext, m) {
 		.def(py::init<colorType>())
 		.def("setFollowTurn", &agent::minimax::setFollowTurn)
 		.def("setPlacementSample", &agent::minimax::setPlacementSample)
+		.def("setUsePlacementWidening", &agent::minimax::setUsePlacementWidening)
+		.def("getUsePlacementWidening", &agent::minimax::getUsePlacementWidening)
+		.def("setPlacementWideningParams", &agent::minimax::setPlacementWideningParams)
+		.def("setStunSample", &agent::minimax::setStunSample)
+		.def("getStunSample", &agent::minimax::getStunSample)
+		.def("setNullMove", &agent::minimax::setNullMove)
+		.def("getNullMove", &agent::minimax::getNullMove)
+		.def("setUsePVS", &agent::minimax::setUsePVS)
+		.def("getUsePVS", &agent::minimax::getUsePVS)
+		.def("setUseLMR", &agent::minimax::setUseLMR)
+		.def("getUseLMR", &agent::minimax::getUseLMR)
+		.def("setLMRParams", &agent::minimax::setLMRParams, py::arg("min_depth"), py::arg("min_moves"))
+		.def("setUseFutility", &agent::minimax::setUseFutility)
+		.def("getUseFutility", &agent::minimax::getUseFutility)
+		.def("setFutilityParams", &agent::minimax::setFutilityParams, py::arg("margin"), py::arg("max_depth"))
+		.def("setUseReverseFutility", &agent::minimax::setUseReverseFutility)
+		.def("getUseReverseFutility", &agent::minimax::getUseReverseFutility)
+		.def("setReverseFutilityParams", &agent::minimax::setReverseFutilityParams, py::arg("margin"), py::arg("max_depth"))
+		.def("setUseSEEPruning", &agent::minimax::setUseSEEPruning)
+		.def("getUseSEEPruning", &agent::minimax::getUseSEEPruning)
+		.def("setUseDeltaPruning", &agent::minimax::setUseDeltaPruning)
+		.def("getUseDeltaPruning", &agent::minimax::getUseDeltaPruning)
+		.def("setDeltaMargin", &agent::minimax::setDeltaMargin)
+		.def("getDeltaMargin", &agent::minimax::getDeltaMargin)
+		.def("setUseQSearchTT", &agent::minimax::setUseQSearchTT)
+		.def("getUseQSearchTT", &agent::minimax::getUseQSearchTT)
+		.def("setUseEvalCache", &agent::minimax::setUseEvalCache)
+		.def("getUseEvalCache", &agent::minimax::getUseEvalCache)
+		.def("setEvalCacheMB", &agent::minimax::setEvalCacheMB)
+		.def("getEvalCacheMB", &agent::minimax::getEvalCacheMB)
+		.def("clearEvalCache", &agent::minimax::clearEvalCache)
 		.def("reset_search_data", &agent::minimax::reset_search_data)
 		.def("setIterativeDeepening", &agent::minimax::setIterativeDeepening)
 		.def("setUseAspiration", &agent::minimax::setUseAspiration)
 		.def("setAspirationWindowBase", &agent::minimax::setAspirationWindowBase)
 		.def("setNodeSearched", &agent::minimax::setNodeSearched)
 		.def("getNodesSearched", &agent::minimax::getNodesSearched)
+		.def("getQNodesSearched", &agent::minimax::getQNodesSearched)
+		.def("getEvalProbes", &agent::minimax::getEvalProbes)
+		.def("getEvalHits", &agent::minimax::getEvalHits)
+		.def("setThreads", &agent::minimax::setThreads)
+		.def("getThreads", &agent::minimax::getThreads)
+		.def("setHashMB", &agent::minimax::setHashMB)
+		.def("getHashMB", &agent::minimax::getHashMB)
+		.def("hashfull", &agent::minimax::hashfull)
+		.def("clearHash", &agent::minimax::clearHash)
+		.def("saveHash", &agent::minimax::saveHash, py::arg("path"), py::call_guard<py::gil_scoped_release>())
+		.def("loadHash", &agent::minimax::loadHash, py::arg("path"), py::call_guard<py::gil_scoped_release>())
 		.def("eval_pos", &agent::minimax::eval_pos)
 		.def("getBestMove", &py_getBestMove)
 		.def("getBestLine", &py_getBestLine)
-		.def("getCalcInfo", &py_getCalcInfo);
+		.def("getCalcInfo", &py_getCalcInfo)
+		.def("search", &py_search, py::arg("board"), py::arg("limits"));
 
 	py::class_<agent::minimax_GPTproposed>(m, "MinimaxGPT")
 		.def(py::init<>())
 		.def(py::init<colorType>())
 		.def("setFollowTurn", &agent::minimax_GPTproposed::setFollowTurn)
 		.def("setPlacementSample", &agent::minimax_GPTproposed::setPlacementSample)
+		.def("setUsePlacementWidening", &agent::minimax_GPTproposed::setUsePlacementWidening)
+		.def("getUsePlacementWidening", &agent::minimax_GPTproposed::getUsePlacementWidening)
+		.def("setPlacementWideningParams", &agent::minimax_GPTproposed::setPlacementWideningParams)
+		.def("setStunSample", &agent::minimax_GPTproposed::setStunSample)
+		.def("getStunSample", &agent::minimax_GPTproposed::getStunSample)
+		.def("setNullMove", &agent::minimax_GPTproposed::setNullMove)
+		.def("getNullMove", &agent::minimax_GPTproposed::getNullMove)
+		.def("setUsePVS", &agent::minimax_GPTproposed::setUsePVS)
+		.def("getUsePVS", &agent::minimax_GPTproposed::getUsePVS)
+		.def("setUseLMR", &agent::minimax_GPTproposed::setUseLMR)
+		.def("getUseLMR", &agent::minimax_GPTproposed::getUseLMR)
+		.def("setLMRParams", &agent::minimax_GPTproposed::setLMRParams, py::arg("min_depth"), py::arg("min_moves"))
+		.def("setUseFutility", &agent::minimax_GPTproposed::setUseFutility)
+		.def("getUseFutility", &agent::minimax_GPTproposed::getUseFutility)
+		.def("setFutilityParams", &agent::minimax_GPTproposed::setFutilityParams, py::arg("margin"), py::arg("max_depth"))
+		.def("setUseReverseFutility", &agent::minimax_GPTproposed::setUseReverseFutility)
+		.def("getUseReverseFutility", &agent::minimax_GPTproposed::getUseReverseFutility)
+		.def("setReverseFutilityParams", &agent::minimax_GPTproposed::setReverseFutilityParams, py::arg("margin"), py::arg("max_depth"))
+		.def("setUseSEEPruning", &agent::minimax_GPTproposed::setUseSEEPruning)
+		.def("getUseSEEPruning", &agent::minimax_GPTproposed::getUseSEEPruning)
+		.def("setUseDeltaPruning", &agent::minimax_GPTproposed::setUseDeltaPruning)
+		.def("getUseDeltaPruning", &agent::minimax_GPTproposed::getUseDeltaPruning)
+		.def("setDeltaMargin", &agent::minimax_GPTproposed::setDeltaMargin)
+		.def("getDeltaMargin", &agent::minimax_GPTproposed::getDeltaMargin)
+		.def("setUseQSearchTT", &agent::minimax_GPTproposed::setUseQSearchTT)
+		.def("getUseQSearchTT", &agent::minimax_GPTproposed::getUseQSearchTT)
+		.def("setUseEvalCache", &agent::minimax_GPTproposed::setUseEvalCache)
+		.def("getUseEvalCache", &agent::minimax_GPTproposed::getUseEvalCache)
+		.def("setEvalCacheMB", &agent::minimax_GPTproposed::setEvalCacheMB)
+		.def("getEvalCacheMB", &agent::minimax_GPTproposed::getEvalCacheMB)
+		.def("clearEvalCache", &agent::minimax_GPTproposed::clearEvalCache)
 		.def("reset_search_data", &agent::minimax_GPTproposed::reset_search_data)
 		.def("setIterativeDeepening", &agent::minimax_GPTproposed::setIterativeDeepening)
 		.def("setUseAspiration", &agent::minimax_GPTproposed::setUseAspiration)
 		.def("setAspirationWindowBase", &agent::minimax_GPTproposed::setAspirationWindowBase)
 		.def("setNodesSearched", &agent::minimax_GPTproposed::setNodesSearched)
 		.def("getNodesSearched", &agent::minimax_GPTproposed::getNodesSearched)
+		.def("getQNodesSearched", &agent::minimax_GPTproposed::getQNodesSearched)
+		.def("getEvalProbes", &agent::minimax_GPTproposed::getEvalProbes)
+		.def("getEvalHits", &agent::minimax_GPTproposed::getEvalHits)
+		.def("setThreads", &agent::minimax_GPTproposed::setThreads)
+		.def("getThreads", &agent::minimax_GPTproposed::getThreads)
+		.def("setHashMB", &agent::minimax_GPTproposed::setHashMB)
+		.def("getHashMB", &agent::minimax_GPTproposed::getHashMB)
+		.def("hashfull", &agent::minimax_GPTproposed::hashfull)
+		.def("clearHash", &agent::minimax_GPTproposed::clearHash)
+		.def("saveHash", &agent::minimax_GPTproposed::saveHash, py::arg("path"), py::call_guard<py::gil_scoped_release>())
+		.def("loadHash", &agent::minimax_GPTproposed::loadHash, py::arg("path"), py::call_guard<py::gil_scoped_release>())
 		.def("eval_pos", &agent::minimax_GPTproposed::eval_pos)
 		.def("getBestMove", &py_getBestMove_gpt)
 		.def("getBestLine", &py_getBestLine_gpt)
-		.def("getCalcInfo", &py_getCalcInfo_gpt);
+		.def("getCalcInfo", &py_getCalcInfo_gpt)
+		.def("search", &py_search_gpt, py::arg("board"), py::arg("limits"));
 
 }
\ No newline at end of file
@@ -1,9 +1,15 @@
 #pragma once
 #include <chess.hpp>
 #include <limits>
-#include <unordered_map>
+#include <algorithm>
+#include <array>
 #include <cstdint>
 #include <memory>
+#include <string>
+#include <atomic>
+#include <chrono>
+#include <thread>
+#include <vector>
 
 namespace agent{
 
@@ -12,6 +18,28 @@ namespace agent{
         int eval_val = 0;
         std::vector<PGN> line;
         PGN bestMove;
+        int depth = 0;           // 끝까지 마친 마지막 반복의 깊이 (line/eval_val은 이 깊이의 결과)
+        uint64_t nodes = 0;      // 전체 스레드 노드 수 (퀴센스 노드 포함)
+        uint64_t qnodes = 0;     // 그중 퀴센스 노드 수
+        uint64_t eval_probes = 0; // 평가 캐시 조회 수 (정적 평가를 요청한 노드)
+        uint64_t eval_hits = 0;   // 그중 캐시에서 찾은 수
+        double time_ms = 0.0;    // 탐색에 쓴 벽시계 시간
+    };
+
+    // 탐색 한도. 0인 항목은 제한하지 않는다.
+    // - depth: 최대 반복 깊이
+    // - time_ms: 한 수에 쓸 시간. soft_ms/hard_ms를 따로 주지 않으면 soft = time_ms / 2, hard = time_ms
+    // - soft_ms: 이 시간이 지나면 새 반복을 시작하지 않는다 (다음 반복은 보통 지금까지보다 오래 걸린다)
+    // - hard_ms: 이 시간이 지나면 진행 중인 반복도 중단하고 마지막으로 끝난 반복의 PV를 돌려준다
+    // - nodes: 노드 예산 (메인 스레드 기준). 넘으면 hard_ms와 같이 중단한다
+    // 시간/노드 한도가 하나라도 있으면 반복 심화로 탐색하며, 깊이 1은 한도와 상관없이 끝까지 탐색한다.
+    struct SearchLimits
+    {
+        int depth = 64;
+        int64_t time_ms = 0;
+        int64_t soft_ms = 0;
+        int64_t hard_ms = 0;
+        uint64_t nodes = 0;
     };
     
 
@@ -32,25 +60,47 @@ namespace agent{
             chessboard simulate_board;
 
             // move ordering helpers
-            std::vector<std::vector<PGN>> killers; // killers[depth] holds killer moves
-            std::unordered_map<uint32_t, int> history; // history heuristic: move_key -> score
-
-            uint32_t move_key(const PGN &m) const {
-                auto f = m.getFromSquare(); auto t = m.getToSquare();
-                uint32_t key = 0;
-                key |= (static_cast<uint32_t>(f.first & 0xF) << 0);
-                key |= (static_cast<uint32_t>(f.second & 0xF) << 4);
-                key |= (static_cast<uint32_t>(t.first & 0xF) << 8);
-                key |= (static_cast<uint32_t>(t.second & 0xF) << 12);
-                key |= (static_cast<uint32_t>(static_cast<int>(m.getMoveType()) & 0xF) << 16);
-                key |= (static_cast<uint32_t>(static_cast<int>(m.getPieceType()) & 0x1F) << 20);
-                return key;
+            std::array<std::array<Move, 2>, MAX_PLY> killers{}; // killers[ply]: 최대 2개의 킬러 수 (빈 칸은 NONE)
+            std::vector<int> history; // history heuristic: history_index(move) -> score
+
+            // 히스토리 테이블 인덱스: from(6) | to(6) | moveType+1(3) | pieceType+1(5) = 20비트
+            static constexpr size_t HISTORY_SIZE = size_t(1) << 20;
+            static size_t history_index(const Move &m){
+                size_t idx = static_cast<size_t>(m.getFrom());
+                idx |= static_cast<size_t>(m.getTo()) << 6;
+                idx |= static_cast<size_t>(static_cast<int>(m.getMoveType()) + 1) << 12;
+                idx |= static_cast<size_t>(static_cast<int>(m.getPieceType()) + 1) << 15;
+                return idx;
             }
 
+            // 재귀 깊이별 수 목록 버퍼.
+            // 노드마다 벡터를 새로 만들면 매 노드가 힙 할당을 하므로, 미리 확보한 MoveList를 스택처럼 빌려 쓴다.
+            // (MoveList 하나가 수십 KB라 함수 지역 변수로 두면 재귀 시 스레드 스택을 빠르게 소모한다)
+            static constexpr int MAX_Q_DEPTH = 32;
+            std::vector<std::unique_ptr<MoveList>> move_stack;
+            size_t move_stack_top = 0;
+            struct MoveListLease {
+                minimax &owner;
+                MoveList &list;
+                explicit MoveListLease(minimax &m);
+                ~MoveListLease() { --owner.move_stack_top; }
+                MoveListLease(const MoveListLease&) = delete;
+                MoveListLease& operator=(const MoveListLease&) = delete;
+            };
+
+            // 삼각 PV 테이블: pv_table[ply]에 해당 노드 이하의 최선 수순을 저장
+            std::array<std::array<Move, MAX_PLY>, MAX_PLY + 1> pv_table{};
+            std::array<int, MAX_PLY + 1> pv_length{};
+            void update_pv(int ply, const Move &m);
+            int search_root(int depth, int alpha, int beta, std::vector<Move> &pv); // 루트 탐색 후 pv_table[0]을 pv로 복사
+
+            // 스턴 샘플링용 스크래치 버퍼 (용량을 재사용)
+            std::vector<std::pair<double, Move>> placement_scratch;
+
             /*
-             * 트랜스포지션 테이블(TT) 엔트리
+             * 트랜스포지션 테이블(TT) 엔트리 (probe/store에서 쓰는 풀어 놓은 형태)
              * - `key`: 위치의 Zobrist 해시(동등성 확인용)
-             * - `value`: 저장된 평가값(저장 시점의 착수 측 관점으로 일관성 유지)
+             * - `value`: 저장된 평가값(봇 관점). 테이블에는 백 관점으로 바꿔 저장하므로 봇 색이 바뀌어도 재사용된다
              * - `depth`: 이 엔트리가 저장될 때의 남은 탐색 깊이. 깊이가 큰 엔트리를 우선 보존함 (depth-prefer)
              * - `flag`: 값의 타입(0=EXACT, 1=LOWER, 2=UPPER) — 알파베타 윈도우 재사용에 사용
              * - `best`: 저장 시의 베스트 무브(PV)를 보관하여 이후 PV 힌트로 사용
@@ -60,70 +110,210 @@ namespace agent{
                 int value = 0;
                 int depth = 0;
                 uint8_t flag = 0; // 0=EXACT,1=LOWER,2=UPPER
-                PGN best;
+                Move best;
             };
 
-            // 고정 크기 트랜스포지션 테이블(2의 거듭제곱 크기)
+            // 테이블에 실제로 저장되는 슬롯(16바이트): 64비트 워드 두 개.
+            // data = best(25) | flag(2) << 25 | depth(7) << 27 | value(24, 부호 있음) << 34 | generation(6) << 58
+            // check = key ^ data. 여러 스레드가 락 없이 동시에 쓰다가 두 워드가 서로 다른 저장에서 섞이면
+            // check ^ data가 key와 맞지 않으므로 probe에서 빈 슬롯으로 취급된다 (XOR 검증).
+            struct TTSlot {
+                std::atomic<uint64_t> check{0};
+                std::atomic<uint64_t> data{0};
+            };
+            static constexpr int TT_CLUSTER_SIZE = 4;
+            static constexpr int TT_GENERATION_MASK = 63;
+            // 캐시 라인(64바이트) 하나에 슬롯 4개. 한 포지션의 probe/store는 한 클러스터 안에서 끝난다.
+            struct alignas(64) TTCluster {
+                TTSlot slot[TT_CLUSTER_SIZE];
+            };
+            static uint64_t tt_pack(const TTEntry &e, int generation);
+            static TTEntry tt_unpack(uint64_t key, uint64_t data);
+            static void flip_perspective(TTEntry &e);
+
+            // 클러스터형 트랜스포지션 테이블 (클러스터 수는 2의 거듭제곱, index = hash & mask)
             // 구현 메모:
-            // - 간단한 direct-mapped(직접 매핑) 테이블(index = zobrist & mask)을 사용하여
-            //   상수 시간 접근과 캐시 친화성을 보장합니다.
-            // - 대체 정책: depth-prefer. 저장 시 슬롯이 비어있거나 같은 키이거나 새 엔트리의
-            //   깊이가 더 크거나 같으면 교체합니다.
-            // - 가벼운 구현으로 예측 가능한 메모리 사용과 빠른 접근을 목표로 합니다.
-            size_t tt_size_pow = 18; // 2^18 entries by default
-            size_t tt_size = (1ULL<<tt_size_pow);
-            size_t tt_mask = (tt_size - 1);
-            std::vector<TTEntry> tt_table;
-            void init_tt(size_t pow2 = 18);
-            TTEntry* tt_probe(uint64_t key);
-            void tt_store(uint64_t key, const TTEntry &entry);
-            // Zobrist 해싱 상태
-            // - `zobrist_pieces`와 `zobrist_pockets`는 평탄화된 벡터로 저장하여 색인 비용을 낮춥니다.
-            // - `zobrist_pieces` 인덱스 레이아웃: ((pieceType*2 + color) * BOARDSIZE + file) * BOARDSIZE + rank
-            // - `zobrist_pockets` 인덱스 레이아웃: (side * NUMBER_OF_PIECEKIND + pieceKind) * MAX_POCKET_COUNT + count
-            // - `zobrist_side`는 착수 차례(side-to-move) 토글용 랜덤 값입니다.
-            std::vector<uint64_t> zobrist_pieces; // size: NUMBER_OF_PIECEKIND * 2 * BOARDSIZE * BOARDSIZE
-            std::vector<uint64_t> zobrist_pockets; // size: 2 * NUMBER_OF_PIECEKIND * MAX_POCKET_COUNT
-            uint64_t zobrist_side[2];
-            void init_zobrist();
-            uint64_t compute_zobrist(const position &pos) const;
-            uint64_t current_zobrist = 0ULL;
+            // - 같은 키가 클러스터에 있으면 그 슬롯을 덮어쓴다.
+            // - 없으면 빈 슬롯, 그다음 "깊이 - 8 x 세대 차이"가 가장 작은 슬롯을 교체한다.
+            //   오래된 탐색(세대)의 깊은 엔트리가 영원히 자리를 차지하지 않도록 세대 차이를 감점한다.
+            // - 세대(generation)는 search()마다 1씩 늘어난다 (6비트, 순환).
+            // - 테이블은 shared_ptr로 들고 있어 Lazy SMP 헬퍼 스레드가 같은 테이블을 공유합니다.
+            struct TTTable {
+                size_t mask = 0;
+                size_t mb = 0;
+                int generation = 0;
+                std::unique_ptr<TTCluster[]> clusters;
+            };
+            static constexpr size_t DEFAULT_HASH_MB = 4; // 2^16 클러스터 = 2^18 엔트리
+            std::shared_ptr<TTTable> tt;
+            void init_tt(size_t mb = DEFAULT_HASH_MB);
+            void clear_tt();
+            void tt_new_search(); // 세대 증가 (search() 시작 시)
+            // ply: 루트에서 이 노드까지의 거리 (메이트 점수를 노드 기준 거리로 바꿔 저장/복원하는 데 쓴다)
+            bool tt_probe(uint64_t key, TTEntry &out, int ply) const;
+            void tt_store(uint64_t key, const TTEntry &entry, int ply);
+            static int value_to_tt(int value, int ply);
+            static int value_from_tt(int value, int ply);
+            // 해시 키는 엔진의 chessboard::getHash()를 그대로 쓴다 (스택, 로얄, 포켓, 차례 포함)
             static constexpr int MATE_SCORE = 1000000;
-            void update_zobrist_for_move(uint64_t &h, const PGN &m, const chessboard &b, colorType player) const;
 
-            int minimax_search(int depth, colorType player, int alpha, int beta, int ply, std::vector<PGN>& pv_out);
-            std::vector<PGN> gather_moves(colorType player);
-            int valueForBot() const; // 봇 관점의 현재 포지션 값 (simulate_board 이용)
+            // allow_null: null-move 탐색의 자식(연속 패스 방지)과 검증 탐색에서는 false
+            // cut_node: 영 윈도우 노드 중 fail-high가 예상되는 노드 (PV 노드의 뒤쪽 수의 자식, 그 뒤로 CUT/ALL 번갈아)
+            int minimax_search(int depth, colorType player, int alpha, int beta, int ply, bool allow_null = true, bool cut_node = false);
+            // placement_limit: 이 노드에서 남길 착수 수 (progressive widening), tt_move: 샘플에 꼭 남길 수
+            void gather_moves(colorType player, MoveList &out, size_t placement_limit, int ply, const Move &tt_move);
+            void sample_placements(colorType player, MoveList &out, int num_placements, size_t placement_limit, int ply, const Move &tt_move);
+
+            /*
+             * 착수 사전 점수(prior): (색, 기물, 칸)마다 placement_score(백 기준)를 한 번만 계산해 두는 쪽 기준의
+             * 고정소수점 정수로 들고 있는다.
+             * 착수 샘플의 키는 히스토리(상위 비트)와 사전 점수(하위 PLACEMENT_PRIOR_BITS 비트)를 합친 값이고,
+             * 상위 k개만 partial_sort로 골라 낸다. TT/PV/킬러 수인 착수는 k와 상관없이 남긴다.
+             * placement_score는 가상 함수라 파생 클래스(GPT 평가)의 착수 점수가 그대로 사전 점수가 된다.
+             */
+            static constexpr int PLACEMENT_PRIOR_BITS = 24;
+            bool placement_prior_ready = false;
+            std::array<std::array<std::array<int32_t, bb::SQUARE_NB>, NUMBER_OF_PIECEKIND>, 2> placement_prior{};
+            void init_placement_priors();
+
+            // 스턴(규칙 10)을 탐색의 수로 생성하고, 이미 스턴된 자기 기물의 스턴을 null move(패스)로 쓴다
+            void append_stuns(colorType player, MoveList &out, bool forced);
+            bool pick_pass_stun(colorType player, Move &out) const;
+            bool pick_null_stun(colorType player, Move &out) const;
+            bool has_non_stun_moves(colorType player) const;
+            static constexpr int NULL_MOVE_MIN_DEPTH = 3;    // 이 깊이부터 null-move pruning
+            static constexpr int NULL_MOVE_VERIFY_DEPTH = 5; // 이 깊이부터 null 컷을 검증 탐색으로 확인
+            int valueForBot(); // 봇 관점의 현재 포지션 값 (simulate_board 이용, 평가 캐시를 먼저 본다)
+
+            /*
+             * 증분 평가 누산기
+             * 평가식의 항을 색 부호(백 +, 흑 -)를 붙인 정수 합으로 들고 있고, 탐색의 make_move/unmake_move에서
+             * 바뀐 칸의 기여만 빼고 더한다. eval_pos(position)도 같은 항을 처음부터 모아 같은 식(eval_combine)으로
+             * 합치므로, 증분 값과 처음부터 계산한 값은 항상 같다.
+             * - 기물 한 개의 기여(PieceTerms)는 기물, 칸, 잠재 수 개수(mobility), 잡을 수 있는 상대 기물 가치 합(threat)으로 정해진다.
+             * - mobility/threat는 보드 점유만으로 정해지므로(calc_potential), 기물이 바뀐 칸(touched)과
+             *   광선(reach)이 그 칸에 닿는 기물만 다시 생성한다. 스택만 바뀐 칸(턴 종료, 로얄 사망 스턴)은 기여만 다시 계산한다.
+             */
+        protected:
+            struct PieceTerms {
+                int64_t material = 0;   // 기물 가치
+                int64_t move = 0;       // 이동 스택
+                int64_t stun = 0;       // 스턴 스택
+                int64_t mob_x_move = 0; // 잠재 수 개수 x 이동 스택
+                int64_t mobility = 0;   // min(잠재 수 개수, EVAL_MOBILITY_CAP)
+                int64_t threat = 0;     // 잡을 수 있는 상대 기물 가치 합
+                int64_t place = 0;      // eval_place (고정소수점, EVAL_FIXED_ONE 단위)
+                PieceTerms& operator+=(const PieceTerms &o);
+                PieceTerms& operator-=(const PieceTerms &o);
+            };
+            struct EvalTerms {
+                PieceTerms board;             // 보드 위 기물 기여의 합
+                int64_t pocket_material = 0;  // 포켓 기물 가치 x 개수
+                int64_t pocket_count = 0;     // 포켓 기물 개수
+            };
+            static constexpr int EVAL_MOBILITY_CAP = 32;
+            static constexpr int64_t EVAL_FIXED_ONE = int64_t(1) << 20;
+            // 고정소수점 값을 가장 가까운 정수로 (0.5는 0에서 먼 쪽으로, std::round와 같은 규칙)
+            static int eval_round(int64_t value, int64_t one);
+            // 항을 합쳐 백 관점 평가값으로. 파생 클래스(GPT 평가)는 자기 식으로 덮어쓴다
+            virtual int eval_combine(const EvalTerms &t, colorType turn) const;
+            // 중앙 거리 가중치 같은 (기물, 칸)별 상수 항. 기본 평가는 쓰지 않는다
+            virtual int64_t eval_place(pieceType pt, int sq) const;
+        private:
+            void piece_activity(const chessboard &b, int sq, int &mobility, int &threat) const;
+            PieceTerms piece_terms(const piece &p, int sq, int mobility, int threat) const;
+
+            bool eval_ready = false; // simulate_board에 맞춰 누산기가 초기화되었는지
+            EvalTerms eval_acc;
+            bool eval_pending = false; // 마지막 make_move의 누산기 갱신을 미뤄 둔 상태 (평가 캐시 적중이면 건너뛴다)
+            std::array<PieceTerms, bb::SQUARE_NB> eval_square{}; // 칸별 현재 기여
+            std::array<int, bb::SQUARE_NB> eval_mobility{};
+            std::array<int, bb::SQUARE_NB> eval_threat{};
+            struct EvalSquareUndo { int sq; PieceTerms terms; int mobility; int threat; };
+            struct EvalFrame { EvalTerms acc; size_t first; };
+            std::vector<EvalFrame> eval_frames;          // make_move마다 하나 (unmake_move에서 되돌림)
+            std::vector<EvalSquareUndo> eval_square_log; // 프레임이 덮어쓴 칸별 캐시
+            void eval_reset();                 // simulate_board로부터 처음부터 다시 계산
+            void eval_apply();                 // 미뤄 둔 마지막 수의 누산기 갱신을 적용
+            void make_move(const Move &mv);    // simulate_board.doMove (누산기 갱신은 필요할 때까지 미룬다)
+            void unmake_move();                // simulate_board.unmakeMove + 누산기 복원
+
+            /*
+             * 평가 캐시: 포지션 해시 -> 정적 평가(백 관점). TT와 따로 두는 작은 고정 크기 테이블.
+             * 착수 순서는 서로 바꿔도 같은 포지션이 되므로(N 다음 B == B 다음 N) 같은 리프가 여러 번 평가된다.
+             * 적중하면 그 노드의 누산기 갱신(잠재 수 다시 생성)을 통째로 건너뛴다.
+             * 슬롯은 TT와 같은 XOR 검증 워드 두 개라 Lazy SMP 헬퍼와 락 없이 공유한다 (교체는 항상 덮어쓰기).
+             */
+            struct EvalCacheSlot {
+                std::atomic<uint64_t> check{0};
+                std::atomic<uint64_t> data{0};
+            };
+            struct EvalCache {
+                size_t mask = 0;
+                size_t mb = 0;
+                std::unique_ptr<EvalCacheSlot[]> slots;
+            };
+            static constexpr size_t DEFAULT_EVAL_CACHE_MB = 1; // 2^16 슬롯
+            std::shared_ptr<EvalCache> eval_cache;
+            void init_eval_cache(size_t mb = DEFAULT_EVAL_CACHE_MB);
+            bool eval_cache_probe(uint64_t key, int &value) const;
+            void eval_cache_store(uint64_t key, int value);
 
             // quiescence search (captures & promotions)
-            int quiescence(int alpha, int beta, int ply_depth, colorType player);
-            std::vector<PGN> generate_captures_and_promotions(colorType player);
+            // ply_depth: 퀴센스 안에서의 깊이, ply: 루트에서의 거리 (메이트 점수용)
+            int quiescence(int alpha, int beta, int ply_depth, colorType player, int ply);
+            void generate_captures_and_promotions(colorType player, MoveList &out);
 
             // iterative deepening / PV (mutable control)
-            std::vector<PGN> root_pv; // PV from last iterative deepening run
+            std::vector<Move> root_pv; // PV from last iterative deepening run
 
             // (moved to public section)
 
+            // Lazy SMP: 헬퍼 스레드마다 같은 평가 함수를 쓰는 minimax 인스턴스를 하나씩 두고
+            // 각자 보드 복사본, 킬러/히스토리, 수 목록 버퍼를 가진 채 같은 TT를 공유하며 탐색한다.
+            // 결과는 메인 스레드의 것만 쓰고, 헬퍼는 TT를 채워 메인 탐색의 컷오프를 앞당기는 역할만 한다.
+            int num_threads = 1;
+            std::vector<std::unique_ptr<minimax>> helpers;
+            std::atomic<bool> stop_flag{false};
+            // 중단 신호: 헬퍼는 메인의 stop_flag를, 한도가 있는 메인 탐색은 자기 stop_flag를 가리킨다 (없으면 nullptr)
+            const std::atomic<bool> *stop_signal = nullptr;
+            bool search_stopped();
+            virtual std::unique_ptr<minimax> make_helper() const; // 파생 클래스는 자기 타입의 헬퍼를 만든다
+            void run_helper(int id, int depth);
+            std::vector<std::thread> start_helpers(int depth);
+            void stop_helpers(std::vector<std::thread> &pool);
+
+            // 탐색 한도 (search()가 설정; 시간은 1024노드마다 확인)
+            bool limits_active = false;
+            uint64_t node_deadline = 0;
+            uint64_t next_limit_check = 0; // 이 노드 수에 닿으면 한도를 다시 확인한다
+            std::chrono::steady_clock::time_point hard_deadline;
+            bool limit_reached() const;
+
             // Helpers for ordering
-            int static_exchange_eval(const PGN &m, const chessboard &b) const;
-            void record_killer(int depth, const PGN &m);
-            void record_history(const PGN &m, int depth);
-            // 착수(placement) 가치 계산기: 특정 착수 PGN에 대해 플레이어 관점의 점수를 반환
+            int static_exchange_eval(const Move &m, const chessboard &b) const;
+            void record_killer(int depth, const Move &m);
+            void record_history(const Move &m, int depth);
+            void init_search_buffers();
+            // 착수(placement) 가치 계산기: 특정 착수 수에 대해 플레이어 관점의 점수를 반환
             // 새로운 수식: 착수 가치 = (착수될 피스 자체의 가치) + TURN_VALUE * ((-1*(stun_on_place/3))^(거리))
-            double placement_score(const PGN &pgn, colorType player) const;
+            virtual double placement_score(const Move &mv, colorType player) const;
 
         public:
             bool follow_turn = false;
 
             // Construct with fixed color
-            minimax(colorType ct) : cT(ct), offset_board(), killers(MAX_PLY), follow_turn(false) { history.reserve(1024); init_zobrist(); }
+            minimax(colorType ct) : cT(ct), offset_board(), follow_turn(false) { init_search_buffers(); }
             // Default construct as WHITE fixed color
-            minimax() : cT(colorType::WHITE), offset_board(), killers(MAX_PLY), follow_turn(false) { history.reserve(1024); init_zobrist(); }
+            minimax() : cT(colorType::WHITE), offset_board(), follow_turn(false) { init_search_buffers(); }
             // Control whether the bot should follow the provided position's `turn_right` at query time
             void setFollowTurn(bool v) { follow_turn = v; }
 
             // public diagnostics
             uint64_t nodes_searched = 0;
+            uint64_t qnodes_searched = 0; // nodes_searched 중 퀴센스 노드
+            uint64_t eval_probes = 0;     // 평가 캐시 조회 수
+            uint64_t eval_hits = 0;       // 평가 캐시 적중 수
 
             // iterative deepening control + utility
             bool iterative_deepening = false; // enable iterative deepening
@@ -133,6 +323,75 @@ namespace agent{
             size_t placement_sample = 5;
             void setPlacementSample(size_t k) { placement_sample = k; }
             size_t getPlacementSample() const { return placement_sample; }
+            // progressive widening: PV 노드는 placement_sample x pv_percent%, 예상 cut 노드는 x cut_percent%(최소 1)개의 착수를 남긴다
+            // 기본은 PV 노드를 125%로 조금 넓히고 cut 노드를 좁힌다. 빈 보드가 아닌 샘플 포지션에서 100/50 대비 노드 수 1.05~1.08배,
+            // widening을 끈 경우 대비 0.99~1.05배(깊이 4~6)이고 최선수는 같다. 150%부터는 1.10~1.15배, 200%는 1.2~2.3배로 늘어남 (test_search_ab)
+            bool use_placement_widening = true;
+            int placement_pv_percent = 125;
+            int placement_cut_percent = 50;
+            void setUsePlacementWidening(bool v) { use_placement_widening = v; }
+            bool getUsePlacementWidening() const { return use_placement_widening; }
+            void setPlacementWideningParams(int pv_percent, int cut_percent) { placement_pv_percent = pv_percent; placement_cut_percent = cut_percent; }
+            // stun sampling: how many opponent pieces (ready to move, most valuable first) to try stunning per node
+            size_t stun_sample = 2;
+            void setStunSample(size_t k) { stun_sample = k; }
+            size_t getStunSample() const { return stun_sample; }
+            // null-move pruning with the stun-as-pass move (verified at depth >= NULL_MOVE_VERIFY_DEPTH)
+            bool null_move = true;
+            void setNullMove(bool v) { null_move = v; }
+            bool getNullMove() const { return null_move; }
+            // principal variation search: zero-window search for every move after the first, full re-search on fail-high
+            bool use_pvs = true;
+            void setUsePVS(bool v) { use_pvs = v; }
+            bool getUsePVS() const { return use_pvs; }
+            // selective search (zero-window / non-PV nodes only, never while the royal piece is attacked)
+            // late-move reductions: quiet moves after the first lmr_min_moves searched, from depth lmr_min_depth
+            // 기본은 끔: 깊이 4에서는 줄일 노드가 없고(1.00x), 깊이 5에서 노드는 0.34x지만 빈 보드 포지션의 최선수가 바뀐다
+            // (min_moves 3~8, min_depth 4~5로 바꿔도 마찬가지. test_search_ab의 +lmr 참고)
+            bool use_lmr = false;
+            int lmr_min_depth = 3;
+            int lmr_min_moves = 3;
+            void setUseLMR(bool v) { use_lmr = v; }
+            bool getUseLMR() const { return use_lmr; }
+            // 깊이 3 미만에서 줄이면 자식이 곧바로 퀴센스가 되므로 min_depth는 3 이상, min_moves는 1 이상으로 맞춘다
+            void setLMRParams(int min_depth, int min_moves) { lmr_min_depth = std::max(3, min_depth); lmr_min_moves = std::max(1, min_moves); }
+            // futility: skip quiet moves when static eval + margin * depth cannot reach the bound (depth <= futility_depth)
+            // 착수 한 수의 평가 변동이 커서 기본은 끔 (test_search_ab의 +futility 참고)
+            bool use_futility = false;
+            int futility_margin = 200;
+            int futility_depth = 2;
+            void setUseFutility(bool v) { use_futility = v; }
+            bool getUseFutility() const { return use_futility; }
+            void setFutilityParams(int margin, int max_depth) { futility_margin = margin; futility_depth = max_depth; }
+            // reverse futility: return when static eval - margin * depth is still past the bound (depth <= reverse_futility_depth)
+            bool use_reverse_futility = true;
+            int reverse_futility_margin = 300;
+            int reverse_futility_depth = 3;
+            void setUseReverseFutility(bool v) { use_reverse_futility = v; }
+            bool getUseReverseFutility() const { return use_reverse_futility; }
+            void setReverseFutilityParams(int margin, int max_depth) { reverse_futility_margin = margin; reverse_futility_depth = max_depth; }
+            // quiescence: skip captures that lose material by SEE, and captures that cannot lift the stand pat
+            // to the window even with 2 x victim value + delta_margin; probe/store the TT with depth-0 entries
+            // (GPT 평가의 위협/위치 항이 잡기 한 번에 수천씩 움직여서 델타 여유를 넉넉히 둔다)
+            bool use_see_pruning = true;
+            void setUseSEEPruning(bool v) { use_see_pruning = v; }
+            bool getUseSEEPruning() const { return use_see_pruning; }
+            bool use_delta_pruning = true;
+            int delta_margin = 4000;
+            void setUseDeltaPruning(bool v) { use_delta_pruning = v; }
+            bool getUseDeltaPruning() const { return use_delta_pruning; }
+            void setDeltaMargin(int margin) { delta_margin = margin; }
+            int getDeltaMargin() const { return delta_margin; }
+            bool use_qsearch_tt = true;
+            void setUseQSearchTT(bool v) { use_qsearch_tt = v; }
+            bool getUseQSearchTT() const { return use_qsearch_tt; }
+            // static eval cache keyed by the position hash (kept across searches, shared with Lazy SMP helpers)
+            bool use_eval_cache = true;
+            void setUseEvalCache(bool v) { use_eval_cache = v; }
+            bool getUseEvalCache() const { return use_eval_cache; }
+            void setEvalCacheMB(size_t mb) { init_eval_cache(mb); }
+            size_t getEvalCacheMB() const { return eval_cache->mb; }
+            void clearEvalCache();
 
             // Accessors for iterative deepening / aspiration controls + nodes
             void setIterativeDeepening(bool v) { iterative_deepening = v; }
@@ -143,13 +402,37 @@ namespace agent{
             int getAspirationWindowBase() const { return aspiration_window_base; }
             void setNodeSearched(uint64_t val) {nodes_searched = val;}
             uint64_t getNodesSearched() const { return nodes_searched; }
-            void resetNodesSearched() { nodes_searched = 0; }
+            void resetNodesSearched() { nodes_searched = 0; qnodes_searched = 0; eval_probes = 0; eval_hits = 0; }
+            uint64_t getQNodesSearched() const { return qnodes_searched; }
+            uint64_t getEvalProbes() const { return eval_probes; }
+            uint64_t getEvalHits() const { return eval_hits; }
             void reset_search_data();
+            // 트랜스포지션 테이블 크기(MB). 2의 거듭제곱 클러스터 수로 내림하며 기존 내용은 버린다.
+            void setHashMB(size_t mb) { init_tt(mb); }
+            size_t getHashMB() const { return tt->mb; }
+            // 현재 세대 엔트리가 차지한 비율(천분율, 앞쪽 1000 클러스터 표본)
+            int hashfull() const;
+            // TT는 검색과 reset_search_data()를 지나도 남는다 (오래된 엔트리는 세대 차이로 먼저 교체됨).
+            // 새 게임이나 콜드 스타트 벤치마크처럼 완전히 비워야 할 때만 clearHash()를 부른다.
+            void clearHash() { clear_tt(); }
+            // TT 전체를 파일로 저장/복원 (긴 분석 세션을 이어서 하기 위함). 실패하면 false
+            // 메모리 맵이 아니라 ifstream/ofstream으로 클러스터를 4096개씩 스트리밍 복사한다: 슬롯이 Lazy SMP 스레드가
+            // 함께 쓰는 원자 변수이고 setHashMB가 테이블을 다시 만들므로 파일 매핑을 테이블로 쓰지 않는다 (POSIX 전용 헤더도 피함).
+            // loadHash는 새 테이블을 다 읽은 뒤에 바꿔 끼우므로 읽는 동안 해시 크기의 두 배를 잠시 쓰고,
+            // 헤더가 맞지 않거나 파일이 잘려 있으면 기존 테이블을 그대로 둔다.
+            bool saveHash(const std::string &path) const;
+            bool loadHash(const std::string &path);
+            // Lazy SMP 스레드 수 (1이면 기존 단일 스레드 탐색과 같다)
+            void setThreads(int n);
+            int getThreads() const { return num_threads; }
+            virtual ~minimax() = default;
 
             virtual int eval_pos(const position& pos) const override;
             virtual PGN getBestMove(position curr_pos, int depth) override;
             virtual std::vector<PGN> getBestLine(position curr_pos, int depth) override;
             virtual calcInfo getCalcInfo(position curr_pos, int depth) override;
+            // 공통 탐색 드라이버: getBestMove/getBestLine/getCalcInfo도 이 함수를 깊이 한도만으로 호출한다
+            calcInfo search(position curr_pos, const SearchLimits &limits);
     };
 
     // Alternative minimax bot that uses the GPT-proposed evaluation function.
@@ -165,14 +448,57 @@ namespace agent{
         virtual PGN getBestMove(position curr_pos, int depth) override; // delegates to internal impl
         virtual std::vector<PGN> getBestLine(position curr_pos, int depth) override;
         virtual calcInfo getCalcInfo(position curr_pos, int depth) override;
+        calcInfo search(position curr_pos, const SearchLimits &limits);
         // Control/inspection helpers forwarded to internal minimax implementation
         void setPlacementSample(size_t k);
+        void setUsePlacementWidening(bool v);
+        bool getUsePlacementWidening() const;
+        void setPlacementWideningParams(int pv_percent, int cut_percent);
+        void setStunSample(size_t k);
+        size_t getStunSample() const;
+        void setNullMove(bool v);
+        bool getNullMove() const;
+        void setUsePVS(bool v);
+        bool getUsePVS() const;
+        void setUseLMR(bool v);
+        bool getUseLMR() const;
+        void setLMRParams(int min_depth, int min_moves);
+        void setUseFutility(bool v);
+        bool getUseFutility() const;
+        void setFutilityParams(int margin, int max_depth);
+        void setUseReverseFutility(bool v);
+        bool getUseReverseFutility() const;
+        void setReverseFutilityParams(int margin, int max_depth);
+        void setUseSEEPruning(bool v);
+        bool getUseSEEPruning() const;
+        void setUseDeltaPruning(bool v);
+        bool getUseDeltaPruning() const;
+        void setDeltaMargin(int margin);
+        int getDeltaMargin() const;
+        void setUseQSearchTT(bool v);
+        bool getUseQSearchTT() const;
+        void setUseEvalCache(bool v);
+        bool getUseEvalCache() const;
+        void setEvalCacheMB(size_t mb);
+        size_t getEvalCacheMB() const;
+        void clearEvalCache();
         void reset_search_data();
         void setIterativeDeepening(bool v);
         void setUseAspiration(bool v);
         void setAspirationWindowBase(int val);
         void setNodesSearched(uint64_t val);
         uint64_t getNodesSearched() const;
+        uint64_t getQNodesSearched() const;
+        uint64_t getEvalProbes() const;
+        uint64_t getEvalHits() const;
+        void setThreads(int n);
+        int getThreads() const;
+        void setHashMB(size_t mb);
+        size_t getHashMB() const;
+        int hashfull() const;
+        void clearHash();
+        bool saveHash(const std::string &path) const;
+        bool loadHash(const std::string &path);
     private:
         struct Impl;
         std::unique_ptr<Impl> impl;
@@ -1,7 +1,10 @@
 #include "agent.hpp"
+#include "zobrist.hpp"
+#include "piece_spec.hpp"
 #include <cmath>
-#include <random>
 #include <limits>
+#include <chrono>
+#include <fstream>
 
 namespace agent{
 
@@ -28,357 +31,733 @@ namespace agent{
         }
     }
 
-    int minimax::eval_pos(const position& pos) const {
-        const double TURN_VALUE = 0.3;
-        const int STUN_ON_ROYAL_DEATH = 3; // 착수(놓기) 시에도 '스턴'으로 사용됨
+    minimax::PieceTerms& minimax::PieceTerms::operator+=(const PieceTerms &o){
+        material += o.material; move += o.move; stun += o.stun; mob_x_move += o.mob_x_move;
+        mobility += o.mobility; threat += o.threat; place += o.place;
+        return *this;
+    }
+
+    minimax::PieceTerms& minimax::PieceTerms::operator-=(const PieceTerms &o){
+        material -= o.material; move -= o.move; stun -= o.stun; mob_x_move -= o.mob_x_move;
+        mobility -= o.mobility; threat -= o.threat; place -= o.place;
+        return *this;
+    }
+
+    int minimax::eval_round(int64_t value, int64_t one){
+        const int64_t half = one / 2;
+        return static_cast<int>(value >= 0 ? (value + half) / one : -((-value + half) / one));
+    }
+
+    int64_t minimax::eval_place(pieceType, int) const {
+        return 0;
+    }
 
+    // 기물 한 개의 잠재 수 개수와, 그 수(승격 제외)가 닿는 상대 기물 가치의 합. 스택은 보지 않는다(calc_potential)
+    // 수 목록을 만들지 않고 광선을 한 번만 따라가며 둘 다 센다 (chessboard::countMobility)
+    void minimax::piece_activity(const chessboard &b, int sq, int &mobility, int &threat) const {
+        static const auto values = [](){
+            std::array<int, NUMBER_OF_PIECEKIND> v{};
+            for(int i=0;i<NUMBER_OF_PIECEKIND;++i) v[i] = piece_value(static_cast<pieceType>(i));
+            return v;
+        }();
+        const int f = bb::fileOf(sq), r = bb::rankOf(sq);
+        mobility = b.countMobility(f, r, true, values, threat);
+    }
+
+    minimax::PieceTerms minimax::piece_terms(const piece &p, int sq, int mobility, int threat) const {
+        PieceTerms t;
+        const int64_t sign = (p.getColor() == colorType::WHITE) ? 1 : -1;
+        t.material = sign * piece_value(p.getPieceType());
+        t.move = sign * p.getMove();
+        t.stun = sign * p.getStun();
+        t.mob_x_move = sign * static_cast<int64_t>(mobility) * p.getMove();
+        t.mobility = sign * std::min(mobility, EVAL_MOBILITY_CAP);
+        t.threat = sign * threat;
+        t.place = sign * eval_place(p.getPieceType(), sq);
+        return t;
+    }
+
+    // 기본 평가: 보드 기물 = 가치 + 0.3 x 잠재 수 개수 x 이동 스택 - 0.3 x 스턴 스택,
+    //           포켓 기물 = 가치 - 0.3 x 3 (착수하면 스턴 3을 받는다). 0.1 단위 정수로 더한 뒤 반올림한다.
+    int minimax::eval_combine(const EvalTerms &t, colorType) const {
+        const int64_t TURN_VALUE_TENTHS = 3;
+        const int64_t STUN_ON_PLACE = 3;
+        const int64_t tenths = 10 * (t.board.material + t.pocket_material)
+                             + TURN_VALUE_TENTHS * t.board.mob_x_move
+                             - TURN_VALUE_TENTHS * t.board.stun
+                             - TURN_VALUE_TENTHS * STUN_ON_PLACE * t.pocket_count;
+        return eval_round(tenths, 10);
+    }
+
+    int minimax::eval_pos(const position& pos) const {
         // 이동 가능한 수 계산을 위해 position으로부터 보조 체스보드 생성
-        position pos_copy = pos; // make a mutable copy
-        chessboard tmp(pos_copy);
-
-        double score = 0.0;
-
-        // 각 색상의 기본 기물 값 합과 로열(왕 등) 개수 사전 계산
-        double sum_base_white = 0.0;
-        double sum_base_black = 0.0;
-        int royal_count_white = 0;
-        int royal_count_black = 0;
-
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = pos.board[f][r];
-                if(p.getPieceType() == pieceType::NONE) continue;
-                int bv = piece_value(p.getPieceType());
-                if(p.getColor() == colorType::WHITE) sum_base_white += bv;
-                else sum_base_black += bv;
-                if(p.getIsRoyal()){
-                    if(p.getColor() == colorType::WHITE) ++royal_count_white;
-                    else ++royal_count_black;
-                }
-            }
+        chessboard tmp(pos);
+        EvalTerms t;
+
+        bitboard occupied = tmp.getOccupancy();
+        while(occupied){
+            const int sq = bb::popLsb(occupied);
+            int mobility = 0, threat = 0;
+            piece_activity(tmp, sq, mobility, threat);
+            t.board += piece_terms(tmp.at(bb::fileOf(sq), bb::rankOf(sq)), sq, mobility, threat);
         }
+        for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
+            const int64_t count = pos.whitePocket[i] - pos.blackPocket[i];
+            t.pocket_material += count * piece_value(static_cast<pieceType>(i));
+            t.pocket_count += count;
+        }
+        return eval_combine(t, pos.turn_right);
+    }
 
-        // 보드에 놓인 기물 평가
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = pos.board[f][r];
-                if(p.getPieceType() == pieceType::NONE) continue;
+    int minimax::valueForBot(){
+        int v = 0;
+        if(!eval_ready){
+            v = eval_pos(simulate_board.getPosition());
+        } else if(use_eval_cache){
+            ++eval_probes;
+            const uint64_t key = simulate_board.getHash();
+            if(eval_cache_probe(key, v)){
+                ++eval_hits;
+            } else {
+                if(eval_pending) eval_apply();
+                v = eval_combine(eval_acc, simulate_board.getTurn());
+                eval_cache_store(key, v);
+            }
+        } else {
+            if(eval_pending) eval_apply();
+            v = eval_combine(eval_acc, simulate_board.getTurn());
+        }
+        return (cT == colorType::WHITE) ? v : -v;
+    }
 
-                double base = static_cast<double>(piece_value(p.getPieceType()));
-                double factor = 1.0; // 승리 판정 함수를 사용하므로 로얄 가중치는 제거
+    void minimax::eval_reset(){
+        eval_acc = EvalTerms{};
+        eval_square.fill(PieceTerms{});
+        eval_mobility.fill(0);
+        eval_threat.fill(0);
+        eval_frames.clear();
+        eval_square_log.clear();
+        eval_pending = false;
+
+        bitboard occupied = simulate_board.getOccupancy();
+        while(occupied){
+            const int sq = bb::popLsb(occupied);
+            piece_activity(simulate_board, sq, eval_mobility[sq], eval_threat[sq]);
+            eval_square[sq] = piece_terms(simulate_board.at(bb::fileOf(sq), bb::rankOf(sq)), sq, eval_mobility[sq], eval_threat[sq]);
+            eval_acc.board += eval_square[sq];
+        }
+        const auto &white = simulate_board.getWhitePocket();
+        const auto &black = simulate_board.getBlackPocket();
+        for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
+            const int64_t count = white[i] - black[i];
+            eval_acc.pocket_material += count * piece_value(static_cast<pieceType>(i));
+            eval_acc.pocket_count += count;
+        }
+        eval_ready = true;
+    }
 
-                // 이 기물이 가질 수 있는 잠재적 행동(수) 개수
-                int num_actions = 0;
-                auto moves_for_piece = tmp.calcLegalMovesInOnePiece(p.getColor(), f, r, true);
-                num_actions += static_cast<int>(moves_for_piece.size());
+    // 리프에서 평가 캐시가 적중하면 그 수의 갱신은 필요 없으므로, 갱신은 평가나 다음 make_move 직전까지 미룬다.
+    // 미룬 동안 보드는 수를 둔 직후 그대로이므로 lastUndo()와 보드 상태로 그대로 갱신할 수 있다.
+    void minimax::make_move(const Move &mv){
+        if(eval_pending) eval_apply();
+        simulate_board.doMove(mv);
+        if(!eval_ready) return;
+        eval_frames.push_back({eval_acc, eval_square_log.size()});
+        eval_pending = true;
+    }
 
-                double placed_value = factor * base
-                                      + (TURN_VALUE * num_actions * p.getMove())
-                                      + (-TURN_VALUE * p.getStun());
+    void minimax::eval_apply(){
+        eval_pending = false;
+        const moveUndo *undo = simulate_board.lastUndo();
+
+        // 기물이 바뀐 칸, 그리고 광선이 그 칸에 닿아 잠재 수가 달라질 수 있는 기물
+        bitboard touched = 0ULL;
+        for(int i=0;i<undo->touched;++i) touched |= bb::squareBit(undo->squares[i]);
+        bitboard regenerate = touched;
+        bitboard others = simulate_board.getOccupancy() & ~touched;
+        while(others){
+            const int sq = bb::popLsb(others);
+            const piece &p = simulate_board.at(bb::fileOf(sq), bb::rankOf(sq));
+            if(specs::compiled(p.getPieceType(), p.getColor()).reach[sq] & touched) regenerate |= bb::squareBit(sq);
+        }
 
-                if(p.getColor() == colorType::WHITE) score += placed_value;
-                else score -= placed_value;
+        bitboard refresh = regenerate | undo->decayed | undo->royalStunned;
+        while(refresh){
+            const int sq = bb::popLsb(refresh);
+            eval_square_log.push_back({sq, eval_square[sq], eval_mobility[sq], eval_threat[sq]});
+            eval_acc.board -= eval_square[sq];
+            const piece &p = simulate_board.at(bb::fileOf(sq), bb::rankOf(sq));
+            if(p.isEmpty()){
+                eval_square[sq] = PieceTerms{};
+                eval_mobility[sq] = 0;
+                eval_threat[sq] = 0;
+                continue;
             }
+            if(regenerate & bb::squareBit(sq)) piece_activity(simulate_board, sq, eval_mobility[sq], eval_threat[sq]);
+            eval_square[sq] = piece_terms(p, sq, eval_mobility[sq], eval_threat[sq]);
+            eval_acc.board += eval_square[sq];
         }
 
-        // 포켓(보유) 기물 평가
-        for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
-            pieceType pt = static_cast<pieceType>(i);
-            double base = static_cast<double>(piece_value(pt));
-            double pocket_single = base + (-TURN_VALUE * STUN_ON_ROYAL_DEATH);
-            if(pos.whitePocket[i] > 0) score += pocket_single * pos.whitePocket[i];
-            if(pos.blackPocket[i] > 0) score -= pocket_single * pos.blackPocket[i];
+        if(undo->pocketColor != colorType::NONE){
+            const auto &pocket = (undo->pocketColor == colorType::WHITE) ? simulate_board.getWhitePocket() : simulate_board.getBlackPocket();
+            const int64_t sign = (undo->pocketColor == colorType::WHITE) ? 1 : -1;
+            const int64_t delta = sign * (pocket[static_cast<int>(undo->pocketType)] - undo->pocketBefore);
+            eval_acc.pocket_material += delta * piece_value(undo->pocketType);
+            eval_acc.pocket_count += delta;
         }
+    }
 
-        return static_cast<int>(std::round(score));
+    void minimax::unmake_move(){
+        simulate_board.unmakeMove();
+        if(!eval_ready || eval_frames.empty()) return;
+        if(eval_pending){
+            // 갱신하지 않은 수: 누산기와 칸별 캐시가 그대로이므로 프레임만 버린다
+            eval_pending = false;
+            eval_frames.pop_back();
+            return;
+        }
+
+        const EvalFrame &frame = eval_frames.back();
+        for(size_t i = eval_square_log.size(); i-- > frame.first;){
+            const EvalSquareUndo &e = eval_square_log[i];
+            eval_square[e.sq] = e.terms;
+            eval_mobility[e.sq] = e.mobility;
+            eval_threat[e.sq] = e.threat;
+        }
+        eval_square_log.resize(frame.first);
+        eval_acc = frame.acc;
+        eval_frames.pop_back();
     }
 
-    int minimax::valueForBot() const {
-        auto pos = simulate_board.getPosition();
-        int v = eval_pos(pos);
-        return (cT == colorType::WHITE) ? v : -v;
+    void minimax::init_search_buffers(){
+        history.assign(HISTORY_SIZE, 0);
+        // 본 탐색 최대 깊이 + 퀴센스 최대 깊이만큼 미리 확보 (더 깊어지면 MoveListLease가 늘린다)
+        move_stack.clear();
+        for(int i=0;i<MAX_PLY + MAX_Q_DEPTH + 2;++i) move_stack.push_back(std::make_unique<MoveList>());
+        move_stack_top = 0;
+        placement_scratch.reserve(MoveList::CAPACITY);
+        // 트랜스포지션 테이블 초기화 (기본 4MB = 2^18 엔트리, `setHashMB`로 크기 조정 가능)
+        init_tt(DEFAULT_HASH_MB);
+        init_eval_cache(DEFAULT_EVAL_CACHE_MB);
+    }
+
+    minimax::MoveListLease::MoveListLease(minimax &m)
+        : owner(m),
+          list((m.move_stack_top < m.move_stack.size()
+                    ? *m.move_stack[m.move_stack_top]
+                    : *m.move_stack.emplace_back(std::make_unique<MoveList>())))
+    {
+        ++owner.move_stack_top;
+        list.clear();
+    }
+
+    void minimax::update_pv(int ply, const Move &m){
+        // 자식 노드(ply+1)의 PV 앞에 m을 붙여 현재 노드의 PV로 만든다
+        auto &row = pv_table[ply];
+        row[0] = m;
+        int len = 1;
+        if(ply + 1 <= MAX_PLY){
+            const auto &child = pv_table[ply + 1];
+            int child_len = std::min(pv_length[ply + 1], MAX_PLY - 1);
+            for(int i=0;i<child_len;++i) row[len++] = child[i];
+        }
+        pv_length[ply] = len;
+    }
+
+    int minimax::search_root(int depth, int alpha, int beta, std::vector<Move> &pv){
+        int score = minimax_search(depth, cT, alpha, beta, 0);
+        pv.assign(pv_table[0].begin(), pv_table[0].begin() + pv_length[0]);
+        return score;
+    }
+
+    void minimax::setThreads(int n){
+        num_threads = std::max(1, n);
+        // 헬퍼 인스턴스(히스토리, 수 목록 버퍼)는 여기서 미리 만들어 두고 검색마다 재사용한다
+        const size_t want = static_cast<size_t>(num_threads - 1);
+        if(helpers.size() > want) helpers.resize(want);
+        while(helpers.size() < want) helpers.push_back(make_helper());
+    }
+
+    std::unique_ptr<minimax> minimax::make_helper() const {
+        return std::make_unique<minimax>(cT);
+    }
+
+    // 헬퍼 스레드 본체: 메인과 같은 루트를 반복 심화로 탐색하며 공유 TT를 채운다.
+    // 홀수 번 헬퍼는 한 수 더 깊게 탐색해 메인이 곧 필요로 할 깊이의 엔트리를 먼저 만든다.
+    void minimax::run_helper(int id, int depth){
+        root_pv.clear();
+        std::vector<Move> pv;
+        for(int d = 1; d <= depth && !search_stopped(); ++d){
+            int target = std::min(d + (id & 1), MAX_PLY - 1);
+            pv.clear();
+            pv_length[0] = 0;
+            (void)search_root(target, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), pv);
+            if(search_stopped()) break;
+            if(!pv.empty()) root_pv = pv;
+        }
+    }
+
+    // 메인 탐색 직전에 호출: simulate_board/cT가 이미 루트 포지션으로 맞춰져 있어야 한다
+    std::vector<std::thread> minimax::start_helpers(int depth){
+        std::vector<std::thread> pool;
+        if(helpers.empty()) return pool;
+
+        stop_flag.store(false, std::memory_order_relaxed);
+        pool.reserve(helpers.size());
+        for(size_t i=0;i<helpers.size();++i){
+            minimax &h = *helpers[i];
+            h.cT = cT;
+            h.follow_turn = false;
+            h.placement_sample = placement_sample;
+            h.stun_sample = stun_sample;
+            h.null_move = null_move;
+            h.use_pvs = use_pvs;
+            h.use_lmr = use_lmr;
+            h.lmr_min_depth = lmr_min_depth;
+            h.lmr_min_moves = lmr_min_moves;
+            h.use_futility = use_futility;
+            h.futility_margin = futility_margin;
+            h.futility_depth = futility_depth;
+            h.use_reverse_futility = use_reverse_futility;
+            h.reverse_futility_margin = reverse_futility_margin;
+            h.reverse_futility_depth = reverse_futility_depth;
+            h.use_see_pruning = use_see_pruning;
+            h.use_delta_pruning = use_delta_pruning;
+            h.delta_margin = delta_margin;
+            h.use_qsearch_tt = use_qsearch_tt;
+            h.use_eval_cache = use_eval_cache;
+            h.iterative_deepening = true; // 헬퍼는 항상 반복 심화 + 이전 PV 우선 정렬
+            h.use_aspiration = false;
+            h.tt = tt;
+            h.eval_cache = eval_cache;
+            h.stop_signal = &stop_flag;
+            h.limits_active = false;
+            h.simulate_board = simulate_board;
+            h.eval_reset();
+            h.offset_board = offset_board;
+            h.nodes_searched = 0;
+            h.qnodes_searched = 0;
+            h.eval_probes = 0;
+            h.eval_hits = 0;
+            pool.emplace_back(&minimax::run_helper, &h, static_cast<int>(i) + 1, depth);
+        }
+        return pool;
+    }
+
+    // 메인 탐색이 끝나면 헬퍼를 멈추고 헬퍼의 노드 수를 nodes_searched에 더한다
+    void minimax::stop_helpers(std::vector<std::thread> &pool){
+        if(pool.empty()) return;
+        stop_flag.store(true, std::memory_order_relaxed);
+        for(auto &th : pool) th.join();
+        for(size_t i=0;i<pool.size();++i){
+            nodes_searched += helpers[i]->nodes_searched;
+            qnodes_searched += helpers[i]->qnodes_searched;
+            eval_probes += helpers[i]->eval_probes;
+            eval_hits += helpers[i]->eval_hits;
+        }
+        pool.clear();
     }
 
     void minimax::reset_search_data(){
-        for(auto &k : killers) k.clear();
-        history.clear();
+        for(auto &k : killers) k.fill(Move());
+        std::fill(history.begin(), history.end(), 0);
         root_pv.clear();
         nodes_searched = 0;
-        // TT는 검색 간에 남겨두면 이후 러닝이 비정상적으로 빨라질 수 있으니 초기화
-        tt_table.assign(tt_size, TTEntry{});
-        current_zobrist = 0ULL;
-    }
-
-    int minimax::static_exchange_eval(const PGN &m, const chessboard &b) const {
-        // 단순화된 SEE: 만약 캡처라면 값 = 희생자 가치 - 공격자 가치
-        if(m.getThreatType() == threatType::NONE) return 0;
-        auto to = m.getToSquare();
-        int tf = to.first, tr = to.second;
-        const piece &victim = b.at(tf, tr);
-        if(victim.getPieceType() == pieceType::NONE) {
-            // 빈 칸으로 이동하거나 캡처가 아닌 위협일 수 있음
-            if(m.getMoveType() == moveType::PROMOTE){
-                // 승격 이득: 승격한 기물 가치 - 기본 폰 가치
-                int promoted = piece_value(m.getPieceType());
-                int pawnv = piece_value(pieceType::PWAN);
-                return promoted - pawnv;
-            }
-            return 0;
-        }
-        // 공격자: 출발 칸
-        auto from = m.getFromSquare();
-        int ff = from.first, fr = from.second;
-        const piece &att = b.at(ff, fr);
-        int val_victim = piece_value(victim.getPieceType());
-        int val_att = piece_value(att.getPieceType());
-        int score = val_victim - val_att;
-        // 낮은 가치의 공격자로 캡처하는 것을 선호하도록 공격자 패널티를 축소
-        return score;
+        qnodes_searched = 0;
+        eval_probes = 0;
+        eval_hits = 0;
+        // TT와 평가 캐시는 비우지 않는다: 다음 수의 탐색이 이전 탐색의 엔트리를 재사용하고, 오래된 엔트리는 세대 차이로 교체된다.
+        // 콜드 스타트가 필요하면 clearHash()를 따로 부른다.
+        tt_new_search();
+        // 헬퍼는 TT를 공유하므로 스레드별 정렬 데이터만 비운다
+        for(auto &h : helpers){
+            for(auto &k : h->killers) k.fill(Move());
+            std::fill(h->history.begin(), h->history.end(), 0);
+            h->root_pv.clear();
+            h->nodes_searched = 0;
+            h->qnodes_searched = 0;
+            h->eval_probes = 0;
+            h->eval_hits = 0;
+        }
     }
 
-    void minimax::init_zobrist(){
-        // sizes
-        const size_t PIECE_SLOTS = static_cast<size_t>(NUMBER_OF_PIECEKIND) * 2 * BOARDSIZE * BOARDSIZE;
-        const int MAX_POCKET_COUNT = 32;
-        const size_t POCKET_SLOTS = 2 * static_cast<size_t>(NUMBER_OF_PIECEKIND) * MAX_POCKET_COUNT;
-
-        zobrist_pieces.assign(PIECE_SLOTS, 0ULL);
-        zobrist_pockets.assign(POCKET_SLOTS, 0ULL);
-
-        std::mt19937_64 rng(0x9e3779b97f4a7c15ULL);
-        for(size_t i=0;i<PIECE_SLOTS;++i) zobrist_pieces[i] = rng();
-        for(size_t i=0;i<POCKET_SLOTS;++i) zobrist_pockets[i] = rng();
-        zobrist_side[0] = rng(); zobrist_side[1] = rng();
-        // 트랜스포지션 테이블 초기화
-        // 기본값으로 2^18 엔트리를 사용합니다. 실험/튜닝을 위해 `init_tt`로 크기 조정 가능합니다.
-        // direct-mapped(비트마스크 인덱싱) 구조를 사용하여 인덱싱 비용을 낮췄습니다.
-        init_tt(18);
-    }
-
-    uint64_t minimax::compute_zobrist(const position &pos) const {
-        uint64_t h = 0ULL;
-        // pieces
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = pos.board[f][r];
-                if(p.getPieceType() == pieceType::NONE) continue;
-                int pt = static_cast<int>(p.getPieceType());
-                int color = (p.getColor() == colorType::WHITE) ? 0 : 1;
-                size_t idx = ((pt * 2 + color) * BOARDSIZE + f) * BOARDSIZE + r;
-                if(idx < zobrist_pieces.size()) h ^= zobrist_pieces[idx];
-            }
+    // 로얄 피스를 잡으면 게임이 끝나거나(마지막 로얄) 그 색 기물 전부가 스턴 +3을 받아(규칙 13) 되잡을 수 없다.
+    // SEE에서는 교환을 끝내는 아주 큰 값으로 둔다 (정렬 키의 16비트 필드 안에 들어가도록 32767보다 작게).
+    static constexpr int SEE_ROYAL_VALUE = 10000;
+
+    static int see_value(const piece &p){
+        return p.getIsRoyal() ? SEE_ROYAL_VALUE : piece_value(p.getPieceType());
+    }
+
+    /*
+     * static_exchange_eval
+     * 한 칸에서의 잡기 교환을 스왑 리스트로 계산한다 (수를 둔 쪽 관점의 물질 이득).
+     * - TAKE/TAKEMOVE/TAKEJUMP: 잡은 기물이 그 칸으로 가므로 상대가 다시 잡을 수 있다.
+     *   잡는 데 쓴 기물을 점유에서 치워 가며 뒤의 공격자를 찾고, TAKEJUMP의 발판이 사라지거나 생기는 것도 점유로 반영된다.
+     * - CATCH: 잡은 기물이 제자리에 남아 칸이 비므로 교환이 끝난다. 되잡을 쪽도 CATCH할 수 있으면 그것을 먼저 쓴다.
+     * - SHIFT: 자리만 바꾸므로 물질 변화가 없다 (0).
+     * - 로얄을 잡으면 교환이 끝난다 (SEE_ROYAL_VALUE).
+     * 스턴이 있거나 이동 스택이 0인 기물은 공격자로 세지 않는다. 교환 도중 턴 종료로 풀리는 스턴은 보지 않는다.
+     */
+    int minimax::static_exchange_eval(const Move &m, const chessboard &b) const {
+        const moveType mT = m.getMoveType();
+        if(mT != moveType::MOVE && mT != moveType::PROMOTE) return 0;
+        const threatType tT = m.getThreatType();
+        if(tT == threatType::SHIFT || tT == threatType::NONE) return 0;
+
+        const int to = m.getTo();
+        const int from = m.getFrom();
+        const piece &victim = b.at(bb::fileOf(to), bb::rankOf(to));
+        const piece &mover = b.at(bb::fileOf(from), bb::rankOf(from));
+        const colorType side = mover.getColor();
+        const bool capture = !victim.isEmpty() && victim.getColor() != side;
+        if(!capture && mT != moveType::PROMOTE) return 0;
+
+        int gain[40];
+        gain[0] = capture ? see_value(victim) : 0;
+        int on_square = see_value(mover); // 다음에 잡힐 수 있는 칸 위 기물의 가치
+        if(mT == moveType::PROMOTE){
+            // 승격 이득: 승격한 기물 가치 - 원래 기물(폰) 가치
+            gain[0] += piece_value(m.getPieceType()) - piece_value(mover.getPieceType());
+            on_square = piece_value(m.getPieceType());
         }
-        // pockets
-        const auto &wp = pos.whitePocket;
-        const auto &bp = pos.blackPocket;
-        const int MAX_POCKET_COUNT = 32;
-        for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
-            int cnt = wp[i];
-            if(cnt < MAX_POCKET_COUNT){
-                size_t idx = (0 * NUMBER_OF_PIECEKIND + i) * MAX_POCKET_COUNT + cnt;
-                if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-            }
-            cnt = bp[i];
-            if(cnt < MAX_POCKET_COUNT){
-                size_t idx = (1 * NUMBER_OF_PIECEKIND + i) * MAX_POCKET_COUNT + cnt;
-                if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
+        if(tT == threatType::CATCH || (capture && victim.getIsRoyal())) return gain[0];
+
+        bitboard occupied = b.getOccupancy() & ~bb::squareBit(from);
+        colorType stm = (side == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+        int d = 0;
+        while(d + 1 < 40){
+            const bitboard attackers = b.attackersOf(to, stm, occupied, false);
+            if(!attackers) break;
+
+            // 되잡는 쪽은 CATCH(교환 종료, 잃을 것 없음) > 가장 싼 공격자 순으로 고른다
+            const bitboard catchers = b.catchersOf(to, stm, occupied);
+            bitboard pool = catchers ? catchers : attackers;
+            int att_sq = -1, att_value = std::numeric_limits<int>::max();
+            while(pool){
+                const int sq = bb::popLsb(pool);
+                const int v = see_value(b.at(bb::fileOf(sq), bb::rankOf(sq)));
+                if(v < att_value){ att_value = v; att_sq = sq; }
             }
+
+            ++d;
+            gain[d] = on_square - gain[d - 1];
+            if(catchers || on_square == SEE_ROYAL_VALUE) break;
+
+            occupied &= ~bb::squareBit(att_sq);
+            on_square = att_value;
+            stm = (stm == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
         }
-        return h;
+        while(d > 0){
+            gain[d - 1] = -std::max(-gain[d - 1], gain[d]);
+            --d;
+        }
+        return gain[0];
     }
 
     /*
      * init_tt
-     * 검색에서 사용하는 고정 크기 트랜스포지션 테이블을 할당하고 초기화합니다.
-     * 2의 거듭제곱 크기를 사용하면 비트마스크(`key & mask`)로 인덱스를 빠르게 계산할 수 있습니다.
-     * 엔트리는 0으로 초기화되며 `key==0`을 빈 슬롯 표시로 사용합니다(실제 해시가 0이 될 확률은 매우 낮음).
+     * 검색에서 사용하는 클러스터형 트랜스포지션 테이블을 `mb` 메가바이트 안에서 할당하고 초기화합니다.
+     * 클러스터 수는 2의 거듭제곱으로 내림하여 비트마스크(`key & mask`)로 인덱스를 빠르게 계산합니다.
+     * 슬롯은 0으로 초기화되며 data==0을 빈 슬롯 표시로 사용합니다(엔트리는 수/값/세대가 함께 들어가 사실상 0이 되지 않고,
+     * 퀴센스가 남기는 깊이 0 엔트리가 우연히 0이 되어도 빈 슬롯으로 보일 뿐입니다).
      */
 
-    void minimax::init_tt(size_t pow2){
-        tt_size_pow = pow2;
-        tt_size = (1ULL<<tt_size_pow);
-        tt_mask = tt_size - 1;
-        tt_table.clear();
-        tt_table.resize(tt_size);
+    void minimax::init_tt(size_t mb){
+        const size_t bytes = std::max<size_t>(mb, 1) * 1024 * 1024;
+        size_t clusters = 1;
+        while(clusters * 2 * sizeof(TTCluster) <= bytes) clusters *= 2;
+
+        auto table = std::make_shared<TTTable>();
+        table->mask = clusters - 1;
+        table->mb = std::max<size_t>(mb, 1);
+        table->clusters = std::make_unique<TTCluster[]>(clusters); // 값 초기화 → 모든 워드 0
+        tt = std::move(table);
     }
 
-    // probe TT: return pointer to entry if key matches; else nullptr
-    minimax::TTEntry* minimax::tt_probe(uint64_t key){
-        size_t idx = static_cast<size_t>(key & tt_mask);
-        TTEntry &e = tt_table[idx];
-        if(e.key == key) return &e;
-        return nullptr;
+    void minimax::clear_tt(){
+        for(size_t i=0;i<=tt->mask;++i){
+            for(auto &slot : tt->clusters[i].slot){
+                slot.check.store(0, std::memory_order_relaxed);
+                slot.data.store(0, std::memory_order_relaxed);
+            }
+        }
+    }
+
+    void minimax::tt_new_search(){
+        tt->generation = (tt->generation + 1) & TT_GENERATION_MASK;
+    }
+
+    // 값은 24비트 부호 있는 정수로 저장한다 (±8,388,607 — MATE_SCORE보다 충분히 크다)
+    static constexpr int TT_VALUE_LIMIT = (1 << 23) - 1;
+
+    static int tt_data_depth(uint64_t data){ return static_cast<int>((data >> 27) & 0x7F); }
+    static int tt_data_generation(uint64_t data){ return static_cast<int>(data >> 58); }
+
+    uint64_t minimax::tt_pack(const TTEntry &e, int generation){
+        int value = std::max(-TT_VALUE_LIMIT, std::min(TT_VALUE_LIMIT, e.value));
+        uint64_t depth = static_cast<uint64_t>(std::max(0, std::min(127, e.depth)));
+        uint64_t data = e.best.raw() & 0x1FFFFFFULL;
+        data |= static_cast<uint64_t>(e.flag & 0x3) << 25;
+        data |= depth << 27;
+        data |= static_cast<uint64_t>(static_cast<uint32_t>(value) & 0xFFFFFFu) << 34;
+        data |= static_cast<uint64_t>(generation & TT_GENERATION_MASK) << 58;
+        return data;
+    }
+
+    minimax::TTEntry minimax::tt_unpack(uint64_t key, uint64_t data){
+        TTEntry e;
+        e.key = key;
+        e.best = Move::fromRaw(static_cast<uint32_t>(data & 0x1FFFFFFULL));
+        e.flag = static_cast<uint8_t>((data >> 25) & 0x3);
+        e.depth = tt_data_depth(data);
+        int32_t v = static_cast<int32_t>((data >> 34) & 0xFFFFFFULL);
+        e.value = (v & 0x800000) ? v - 0x1000000 : v; // 24비트 부호 확장
+        return e;
     }
 
-    // store TT with depth-prefer replacement
-    void minimax::tt_store(uint64_t key, const TTEntry &entry){
-        size_t idx = static_cast<size_t>(key & tt_mask);
-        TTEntry &e = tt_table[idx];
-        if(e.key == 0ULL){
-            e = entry; e.key = key; return;
+    // 봇 관점 <-> 백 관점: 값의 부호를 바꾸면 하한/상한도 서로 바뀐다
+    void minimax::flip_perspective(TTEntry &e){
+        e.value = -e.value;
+        if(e.flag == 1) e.flag = 2;
+        else if(e.flag == 2) e.flag = 1;
+    }
+
+    // 메이트 점수는 루트에서 잰 거리(MATE_SCORE - ply)라서 테이블에는 이 노드에서 잰 거리로 바꿔 넣는다.
+    // 그래야 다른 ply나 다음 수의 탐색(테이블이 이어짐)에서 꺼냈을 때도 거리가 맞는다.
+    int minimax::value_to_tt(int value, int ply){
+        if(value >= MATE_SCORE - 2 * MAX_PLY) return value + ply;
+        if(value <= -MATE_SCORE + 2 * MAX_PLY) return value - ply;
+        return value;
+    }
+
+    int minimax::value_from_tt(int value, int ply){
+        if(value >= MATE_SCORE - 2 * MAX_PLY) return value - ply;
+        if(value <= -MATE_SCORE + 2 * MAX_PLY) return value + ply;
+        return value;
+    }
+
+    // probe TT: 클러스터 안에서 키가 맞는(XOR 검증을 통과한) 엔트리가 있으면 out에 풀어 넣고 true
+    bool minimax::tt_probe(uint64_t key, TTEntry &out, int ply) const {
+        const TTCluster &cluster = tt->clusters[static_cast<size_t>(key) & tt->mask];
+        for(const auto &slot : cluster.slot){
+            uint64_t data = slot.data.load(std::memory_order_relaxed);
+            uint64_t check = slot.check.load(std::memory_order_relaxed);
+            if(data != 0ULL && (check ^ data) == key){
+                out = tt_unpack(key, data);
+                if(cT == colorType::BLACK) flip_perspective(out);
+                out.value = value_from_tt(out.value, ply);
+                return true;
+            }
         }
-        // replace if same key, or deeper depth, else keep existing
-        if(e.key == key || entry.depth >= e.depth){
-            e = entry; e.key = key; return;
+        return false;
+    }
+
+    // store TT: 같은 키 > 빈 슬롯 > (깊이 - 8 x 세대 차이)가 가장 작은 슬롯 순으로 자리를 고른다
+    void minimax::tt_store(uint64_t key, const TTEntry &entry, int ply){
+        TTCluster &cluster = tt->clusters[static_cast<size_t>(key) & tt->mask];
+        const int generation = tt->generation;
+        TTSlot *victim = &cluster.slot[0];
+        int victim_worth = std::numeric_limits<int>::max();
+        for(auto &slot : cluster.slot){
+            uint64_t data = slot.data.load(std::memory_order_relaxed);
+            uint64_t check = slot.check.load(std::memory_order_relaxed);
+            if(data == 0ULL){
+                if(victim_worth > std::numeric_limits<int>::min()){
+                    victim = &slot;
+                    victim_worth = std::numeric_limits<int>::min();
+                }
+                continue;
+            }
+            if((check ^ data) == key){
+                victim = &slot;
+                break;
+            }
+            int age = (generation - tt_data_generation(data)) & TT_GENERATION_MASK;
+            int worth = tt_data_depth(data) - 8 * age;
+            if(worth < victim_worth){
+                victim = &slot;
+                victim_worth = worth;
+            }
         }
-        // otherwise, keep existing
+        TTEntry stored = entry;
+        stored.value = value_to_tt(stored.value, ply);
+        if(cT == colorType::BLACK) flip_perspective(stored); // 테이블에는 백 관점 값으로 저장
+        uint64_t data = tt_pack(stored, generation);
+        victim->check.store(key ^ data, std::memory_order_relaxed);
+        victim->data.store(data, std::memory_order_relaxed);
     }
 
     /*
-     * update_zobrist_for_move
-     * 단일 PGN 수의 증분 해시 효과를 현재 해시 `h`에 적용합니다.
-     * 사용 패턴: 수를 적용하기 전에 호출 -> `updatePiece(m)`로 보드 적용 -> 검색 후 `undoBoard()`로 복구 ->
-     * 다시 이 함수를 호출하면 xor의 역원 성질로 원래 해시가 복원됩니다. 따라서 전체 해시를 다시 계산하지 않고
-     * 빠르게 해시를 갱신/복원할 수 있습니다.
-     *
-     * 유의사항:
-     * - 이 함수는 보드 `b`의 현재 상태(수 적용 전)를 읽습니다. 호출 순서를 지켜야 해시가 올바르게 유지됩니다.
-     * - `ADD` 수는 포켓 카운트 변화를 처리하고 착수된 기물을 xor 합니다.
-     * - `MOVE`/`PROMOTE`는 출발칸의 공격자 xor 제거, 도착칸의 희생자 xor 제거, 도착칸에 들어갈 기물 xor 추가 순으로 처리합니다.
+     * 평가 캐시
+     * 슬롯 하나(16바이트)에 check = key ^ data, data = 값(32비트) | 유효 비트를 둔다. 한 칸에 한 포지션만 두고
+     * 새 값으로 항상 덮어쓴다. 정적 평가는 포지션만으로 정해지므로 검색이 바뀌어도 그대로 유효하다.
      */
+    static constexpr uint64_t EVAL_CACHE_VALID = 1ULL << 32;
+
+    void minimax::init_eval_cache(size_t mb){
+        const size_t bytes = std::max<size_t>(mb, 1) * 1024 * 1024;
+        size_t slots = 1;
+        while(slots * 2 * sizeof(EvalCacheSlot) <= bytes) slots *= 2;
+
+        auto cache = std::make_shared<EvalCache>();
+        cache->mask = slots - 1;
+        cache->mb = std::max<size_t>(mb, 1);
+        cache->slots = std::make_unique<EvalCacheSlot[]>(slots);
+        eval_cache = std::move(cache);
+    }
 
-    // helper: xor piece slot for a given board square into hash
-    static inline void xor_piece_slot(uint64_t &h, const std::vector<uint64_t> &zobrist_pieces, int f, int r, const piece &p){
-        if(p.getPieceType() == pieceType::NONE) return;
-        int pt = static_cast<int>(p.getPieceType());
-        int color = (p.getColor() == colorType::WHITE) ? 0 : 1;
-        size_t idx = ((pt * 2 + color) * BOARDSIZE + f) * BOARDSIZE + r;
-        if(idx < zobrist_pieces.size()) h ^= zobrist_pieces[idx];
-    }
-
-    void minimax::update_zobrist_for_move(uint64_t &h, const PGN &m, const chessboard &b, colorType player) const {
-        const int MAX_POCKET_COUNT = 32;
-        auto mT = m.getMoveType();
-        auto from = m.getFromSquare();
-        auto to = m.getToSquare();
-        auto pT = m.getPieceType();
-        auto cT = m.getColorType();
-
-        // flip side: remove current side constant and add opponent side constant
-        int curSide = (player == colorType::WHITE) ? 0 : 1;
-        int oppSide = (player == colorType::WHITE) ? 1 : 0;
-        h ^= zobrist_side[curSide]; // remove current
-        h ^= zobrist_side[oppSide]; // add opponent
-
-        // snapshot pockets for potential capture handling
-        const auto &wp_before = b.getWhitePocket();
-        const auto &bp_before = b.getBlackPocket();
-
-        if(mT == moveType::MOVE || mT == moveType::PROMOTE){
-            // attacker at from
-            const piece &att = b.at(from.first, from.second);
-            xor_piece_slot(h, zobrist_pieces, from.first, from.second, att); // remove attacker from from
-
-            // victim at to (if any) -- may be empty
-            const piece &vict = b.at(to.first, to.second);
-            if(!vict.isEmpty()) {
-                xor_piece_slot(h, zobrist_pieces, to.first, to.second, vict); // remove victim
-                // if victim will be captured, the capturer's pocket increases by 1 -> update pocket hash
-                pieceType vpt = vict.getPieceType();
-                if(vpt != pieceType::NONE){
-                    if(player == colorType::WHITE){
-                        int oldc = wp_before[static_cast<int>(vpt)];
-                        if(oldc < MAX_POCKET_COUNT){
-                            size_t idx = (0 * NUMBER_OF_PIECEKIND + static_cast<int>(vpt)) * MAX_POCKET_COUNT + oldc;
-                            if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                        }
-                        int newc = std::min(MAX_POCKET_COUNT-1, oldc + 1);
-                        if(newc < MAX_POCKET_COUNT){
-                            size_t idx = (0 * NUMBER_OF_PIECEKIND + static_cast<int>(vpt)) * MAX_POCKET_COUNT + newc;
-                            if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                        }
-                    } else {
-                        int oldc = bp_before[static_cast<int>(vpt)];
-                        if(oldc < MAX_POCKET_COUNT){
-                            size_t idx = (1 * NUMBER_OF_PIECEKIND + static_cast<int>(vpt)) * MAX_POCKET_COUNT + oldc;
-                            if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                        }
-                        int newc = std::min(MAX_POCKET_COUNT-1, oldc + 1);
-                        if(newc < MAX_POCKET_COUNT){
-                            size_t idx = (1 * NUMBER_OF_PIECEKIND + static_cast<int>(vpt)) * MAX_POCKET_COUNT + newc;
-                            if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                        }
-                    }
-                }
+    void minimax::clearEvalCache(){
+        for(size_t i=0;i<=eval_cache->mask;++i){
+            eval_cache->slots[i].check.store(0, std::memory_order_relaxed);
+            eval_cache->slots[i].data.store(0, std::memory_order_relaxed);
+        }
+    }
+
+    bool minimax::eval_cache_probe(uint64_t key, int &value) const {
+        const EvalCacheSlot &slot = eval_cache->slots[static_cast<size_t>(key) & eval_cache->mask];
+        uint64_t data = slot.data.load(std::memory_order_relaxed);
+        uint64_t check = slot.check.load(std::memory_order_relaxed);
+        if(data == 0ULL || (check ^ data) != key) return false;
+        value = static_cast<int32_t>(static_cast<uint32_t>(data));
+        return true;
+    }
+
+    void minimax::eval_cache_store(uint64_t key, int value){
+        EvalCacheSlot &slot = eval_cache->slots[static_cast<size_t>(key) & eval_cache->mask];
+        uint64_t data = static_cast<uint64_t>(static_cast<uint32_t>(value)) | EVAL_CACHE_VALID;
+        slot.check.store(key ^ data, std::memory_order_relaxed);
+        slot.data.store(data, std::memory_order_relaxed);
+    }
+
+    int minimax::hashfull() const {
+        const size_t sample = std::min<size_t>(1000, tt->mask + 1);
+        size_t used = 0;
+        for(size_t i=0;i<sample;++i){
+            for(const auto &slot : tt->clusters[i].slot){
+                uint64_t data = slot.data.load(std::memory_order_relaxed);
+                if(data != 0ULL && tt_data_generation(data) == tt->generation) ++used;
             }
+        }
+        return static_cast<int>(used * 1000 / (sample * TT_CLUSTER_SIZE));
+    }
 
-            // insert attacker at to (if promotion, use promoted type)
-            if(mT == moveType::PROMOTE){
-                // promoted piece type is in m.getPieceType()
-                piece promoted(att.getColor(), pT);
-                xor_piece_slot(h, zobrist_pieces, to.first, to.second, promoted);
-            } else {
-                xor_piece_slot(h, zobrist_pieces, to.first, to.second, att);
+    /*
+     * saveHash / loadHash
+     * 파일 형식: 헤더(매직, 버전, Zobrist 지문, 클러스터 수, 세대) + 슬롯마다 (check, data) 64비트 워드 두 개.
+     * 워드는 실행 중인 기계의 바이트 순서 그대로 쓴다. Zobrist 키가 바뀌면 지문이 달라져 로드를 거부한다.
+     * 값은 백 관점으로 저장되어 있으므로 봇 색과 상관없이 불러 쓸 수 있다.
+     */
+    namespace {
+        struct HashFileHeader {
+            char magic[8];
+            uint32_t version;
+            uint32_t cluster_size;
+            uint64_t zobrist_fingerprint;
+            uint64_t clusters;
+            uint64_t mb;
+            uint32_t generation;
+            uint32_t reserved;
+        };
+        constexpr char HASH_FILE_MAGIC[8] = {'C','S','T','K','H','A','S','H'};
+        constexpr uint32_t HASH_FILE_VERSION = 1;
+
+        uint64_t zobrist_fingerprint(){
+            return zobrist::side(colorType::BLACK) ^ zobrist::pocket(colorType::WHITE, pieceType::KING, 1);
+        }
+    }
+
+    bool minimax::saveHash(const std::string &path) const {
+        std::ofstream out(path, std::ios::binary | std::ios::trunc);
+        if(!out) return false;
+
+        HashFileHeader header{};
+        std::copy(std::begin(HASH_FILE_MAGIC), std::end(HASH_FILE_MAGIC), header.magic);
+        header.version = HASH_FILE_VERSION;
+        header.cluster_size = TT_CLUSTER_SIZE;
+        header.zobrist_fingerprint = zobrist_fingerprint();
+        header.clusters = tt->mask + 1;
+        header.mb = tt->mb;
+        header.generation = static_cast<uint32_t>(tt->generation);
+        out.write(reinterpret_cast<const char*>(&header), sizeof(header));
+
+        // 클러스터 단위로 워드를 모아 쓴다 (원자 변수를 직접 쓰지 않도록 한 번 load)
+        std::vector<uint64_t> words;
+        words.reserve(TT_CLUSTER_SIZE * 2 * 4096);
+        for(size_t i=0;i<=tt->mask;++i){
+            for(const auto &slot : tt->clusters[i].slot){
+                words.push_back(slot.check.load(std::memory_order_relaxed));
+                words.push_back(slot.data.load(std::memory_order_relaxed));
             }
-        } else if(mT == moveType::ADD){
-            // pocket count change and placed piece
-            int ptidx = static_cast<int>(pT);
-            const auto &wp = b.getWhitePocket();
-            const auto &bp = b.getBlackPocket();
-            if(cT == colorType::WHITE){
-                int oldc = wp[ptidx];
-                if(oldc < MAX_POCKET_COUNT) {
-                    size_t idx = (0 * NUMBER_OF_PIECEKIND + ptidx) * MAX_POCKET_COUNT + oldc;
-                    if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                }
-                int newc = std::max(0, oldc-1);
-                if(newc < MAX_POCKET_COUNT){
-                    size_t idx = (0 * NUMBER_OF_PIECEKIND + ptidx) * MAX_POCKET_COUNT + newc;
-                    if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                }
-            } else {
-                int oldc = bp[ptidx];
-                if(oldc < MAX_POCKET_COUNT) {
-                    size_t idx = (1 * NUMBER_OF_PIECEKIND + ptidx) * MAX_POCKET_COUNT + oldc;
-                    if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
-                }
-                int newc = std::max(0, oldc-1);
-                if(newc < MAX_POCKET_COUNT){
-                    size_t idx = (1 * NUMBER_OF_PIECEKIND + ptidx) * MAX_POCKET_COUNT + newc;
-                    if(idx < zobrist_pockets.size()) h ^= zobrist_pockets[idx];
+            if(words.size() == words.capacity() || i == tt->mask){
+                out.write(reinterpret_cast<const char*>(words.data()), static_cast<std::streamsize>(words.size() * sizeof(uint64_t)));
+                words.clear();
+            }
+        }
+        return static_cast<bool>(out);
+    }
+
+    bool minimax::loadHash(const std::string &path){
+        std::ifstream in(path, std::ios::binary);
+        if(!in) return false;
+
+        HashFileHeader header{};
+        in.read(reinterpret_cast<char*>(&header), sizeof(header));
+        if(!in) return false;
+        if(!std::equal(std::begin(HASH_FILE_MAGIC), std::end(HASH_FILE_MAGIC), header.magic)) return false;
+        if(header.version != HASH_FILE_VERSION || header.cluster_size != TT_CLUSTER_SIZE) return false;
+        if(header.zobrist_fingerprint != zobrist_fingerprint()) return false;
+        if(header.clusters == 0 || (header.clusters & (header.clusters - 1)) != 0) return false;
+
+        auto table = std::make_shared<TTTable>();
+        table->mask = static_cast<size_t>(header.clusters) - 1;
+        table->mb = static_cast<size_t>(header.mb);
+        table->generation = static_cast<int>(header.generation) & TT_GENERATION_MASK;
+        table->clusters = std::make_unique<TTCluster[]>(static_cast<size_t>(header.clusters));
+
+        std::vector<uint64_t> words(TT_CLUSTER_SIZE * 2 * 4096);
+        size_t cluster = 0;
+        while(cluster < header.clusters){
+            size_t count = std::min<size_t>(4096, static_cast<size_t>(header.clusters) - cluster);
+            in.read(reinterpret_cast<char*>(words.data()), static_cast<std::streamsize>(count * TT_CLUSTER_SIZE * 2 * sizeof(uint64_t)));
+            if(!in) return false; // 잘린 파일: 기존 테이블을 그대로 둔다
+            for(size_t c=0;c<count;++c){
+                for(int k=0;k<TT_CLUSTER_SIZE;++k){
+                    TTSlot &slot = table->clusters[cluster + c].slot[k];
+                    slot.check.store(words[(c * TT_CLUSTER_SIZE + k) * 2], std::memory_order_relaxed);
+                    slot.data.store(words[(c * TT_CLUSTER_SIZE + k) * 2 + 1], std::memory_order_relaxed);
                 }
             }
-            // placed piece at from coords
-            piece placed(cT, pT);
-            xor_piece_slot(h, zobrist_pieces, from.first, from.second, placed);
-        } else if(mT == moveType::SUCCESION){
-            // no zobrist effect (we don't track royalty)
-        } else if(mT == moveType::DISGUISE){
-            // disguise: same square, same color, piece type changes
-            const piece &oldp = b.at(from.first, from.second);
-            xor_piece_slot(h, zobrist_pieces, from.first, from.second, oldp); // remove old type
-            piece disguised(oldp.getColor(), pT);
-            xor_piece_slot(h, zobrist_pieces, from.first, from.second, disguised); // add new type
+            cluster += count;
         }
+        tt = std::move(table);
+        return true;
     }
 
-    void minimax::record_killer(int depth, const PGN &m){
+    void minimax::record_killer(int depth, const Move &m){
         if(depth < 0 || depth >= static_cast<int>(killers.size())) return;
-        auto &vec = killers[depth];
+        auto &slot = killers[depth];
         // 최대 2개의 킬러 수 저장
-        if(vec.empty()) { vec.push_back(m); return; }
-        if(vec.size() == 1){ if(!(vec[0] == m)) vec.push_back(m); return; }
-        // 크기==2
-        if(vec[0] == m || vec[1] == m) return; // 이미 존재함
-        // 두 번째 엔트리 교체
-        vec[1] = m;
+        if(slot[0] == m || slot[1] == m) return; // 이미 존재함
+        if(slot[0].isNone()) { slot[0] = m; return; }
+        // 두 번째 엔트리 채우기/교체
+        slot[1] = m;
     }
 
-    void minimax::record_history(const PGN &m, int depth){
-        uint32_t key = move_key(m);
+    void minimax::record_history(const Move &m, int depth){
         // reward by depth squared so shallower cutoffs get smaller reward
-        history[key] += (depth * depth + 1);
+        history[history_index(m)] += (depth * depth + 1);
     }
 
-    // 착수(placement) PGN의 가치 계산 (플레이어 관점). gather_moves에서 사용됨.
+    // 착수(placement) 수의 가치 계산 (플레이어 관점). gather_moves에서 사용됨.
     // 새 수식: 착수 가치 = (착수될 피스 자체의 가치) + TURN_VALUE * ((-1 * (stun_on_place / 3)) ^ 거리)
     // 구현 주의: 음수 밑수의 비정수 제곱은 실수가 아니므로 안전하게 음수 밑수일 때는 절댓값의 제곱에 음의 부호를 붙여 반환합니다.
-    double minimax::placement_score(const PGN &pgn, colorType player) const {
+    double minimax::placement_score(const Move &mv, colorType player) const {
         const double TURN_VALUE = 0.3;
         const double STUN_ON_PLACE = 3.0;
-        auto from = pgn.getFromSquare();
+        auto from = mv.getFromSquare();
         int pf = from.first, pr = from.second;
-        pieceType pt = pgn.getPieceType();
+        pieceType pt = mv.getPieceType();
 
         double base = static_cast<double>(piece_value(pt));
 
@@ -401,95 +780,183 @@ namespace agent{
         return (player == colorType::WHITE) ? placement_value : -placement_value;
     }
 
-    std::vector<PGN> minimax::gather_moves(colorType player){
-        std::vector<PGN> res;
-
-        // 착수(드롭) 가능한 수 먼저 수집 (포켓이 비어 있으면 건너뜀)
-        auto placements = simulate_board.calcLegalPlacePiece(player);
-        if(!placements.empty()){
-            int log_size = simulate_board.getLogSize();
-            bool custom_pos = simulate_board.getThisPositionIsCustom();
-            bool restrict_to_king = (!custom_pos && log_size < 2); // 기본 포지션 초반에는 킹 착수만 허용
-            if(restrict_to_king){
-                std::vector<PGN> filtered;
-                filtered.reserve(placements.size());
-                for(const auto &pgn : placements){
-                    if(pgn.getPieceType() == pieceType::KING) filtered.push_back(pgn);
+    // (색, 기물, 칸)별 사전 점수. placement_score(sqrt/pow)를 노드마다 부르지 않도록 처음 한 번만 계산한다.
+    // placement_score는 평가와 같은 백 기준 값(흑이면 음수)이고, 사전 점수는 두는 쪽에게 좋은 착수가 앞에 오도록
+    // 두는 쪽 기준으로 바꿔 저장한다 (흑 값을 그대로 쓰면 흑은 가장 싼 착수부터 고르게 된다)
+    void minimax::init_placement_priors(){
+        const int64_t one = int64_t(1) << 8; // 1/256 단위
+        const int64_t limit = (int64_t(1) << (PLACEMENT_PRIOR_BITS - 1)) - 1;
+        for(colorType c : {colorType::WHITE, colorType::BLACK}){
+            auto &table = placement_prior[c == colorType::WHITE ? 0 : 1];
+            for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
+                for(int sq=0; sq<bb::SQUARE_NB; ++sq){
+                    const Move mv(c, moveType::ADD, threatType::NONE, static_cast<pieceType>(i), sq, 0);
+                    const double relative = (c == colorType::WHITE) ? placement_score(mv, c) : -placement_score(mv, c);
+                    const int64_t v = std::llround(relative * static_cast<double>(one));
+                    table[i][sq] = static_cast<int32_t>(std::max(-limit, std::min(limit, v)));
                 }
-                placements = std::move(filtered);
             }
+        }
+        placement_prior_ready = true;
+    }
 
-            // 착수(placements) 우선순위 계산 및 샘플링
-            std::vector<std::pair<double, PGN>> scored;
-            scored.reserve(placements.size());
-            for(const auto &pgn : placements){
-                if(restrict_to_king && pgn.getPieceType() != pieceType::KING) continue; // 초기 수면 킹 착수만 허용
-                double score = placement_score(pgn, player);
-                scored.emplace_back(score, pgn);
-            }
+    void minimax::gather_moves(colorType player, MoveList &out, size_t placement_limit, int ply, const Move &tt_move){
+        // 엔진이 착수 → 기물 이동/승격 → 계승 → 위장 순으로 한 번에 채운다
+        out.clear();
+        simulate_board.generateAll(player, out);
 
-            // 점수 내림차순 정렬 (플레이어에 유리한 순서)
-            std::sort(scored.begin(), scored.end(), [](const auto &a, const auto &b){ return a.first > b.first; });
+        // 착수(드롭) 수는 목록 앞쪽에 모여 있다 (포켓이 비어 있으면 0개)
+        int num_placements = 0;
+        while(num_placements < out.size() && out[num_placements].move.getMoveType() == moveType::ADD) ++num_placements;
+        if(num_placements > 0) sample_placements(player, out, num_placements, placement_limit, ply, tt_move);
 
-            // 샘플링: 상위 K개만 사용(너무 많은 착수로 브랜치 폭 증가 방지)
-            size_t take = std::min(scored.size(), static_cast<size_t>(placement_sample));
-            for(size_t i=0;i<take;++i) res.push_back(scored[i].second);
-        }
+        // 규칙 10: 스턴은 generateAll에 들어 있지 않다.
+        // 다른 수가 하나도 없으면(모든 기물이 스턴/이동 스택 0이고 포켓도 비어 있음) 스턴만이 둘 수 있는 수이다.
+        append_stuns(player, out, out.size() == 0);
+    }
 
-        // 전부의 칸에서 합법 수를 수집 (보드 API에 맞춰 호출)
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                if(simulate_board.at(f, r).isEmpty()) continue;
-                // 수집하려는 기물은 player의 소유여야 함
-                if(simulate_board.at(f, r).getColor() != player) continue;
-                auto moves = simulate_board.calcLegalMovesInOnePiece(player, f, r, false); //이동 & 승격
-                if(!moves.empty()){
-                    for(auto &m : moves){
-                        if(m.getColorType() == player) res.push_back(m);
-                    }
-                }
-                // 계승: 법적 계승 수만 추가 (calcLegalSuccesion 사용)
+    void minimax::sample_placements(colorType player, MoveList &out, int num_placements, size_t placement_limit, int ply, const Move &tt_move){
+        if(!placement_prior_ready) init_placement_priors();
+
+        int game_ply = simulate_board.getPly();
+        bool custom_pos = simulate_board.getThisPositionIsCustom();
+        bool restrict_to_king = (!custom_pos && game_ply < 2); // 기본 포지션 초반에는 킹 착수만 허용
+
+        // 착수 키 = 강제(TT/PV/킬러 수) | 히스토리 | 사전 점수 + 오프셋. 앞쪽으로 모으면서 키를 매긴다
+        const auto &prior = placement_prior[player == colorType::WHITE ? 0 : 1];
+        const Move *pv_move = (ply < static_cast<int>(root_pv.size())) ? &root_pv[ply] : nullptr;
+        int kept = 0;
+        int forced = 0;
+        for(int i=0;i<num_placements;++i){
+            const Move mv = out[i].move;
+            if(restrict_to_king && mv.getPieceType() != pieceType::KING) continue; // 초기 수면 킹 착수만 허용
+            int64_t key = static_cast<int64_t>(prior[static_cast<int>(mv.getPieceType())][mv.getFrom()]) + (int64_t(1) << (PLACEMENT_PRIOR_BITS - 1));
+            key |= static_cast<int64_t>(history[history_index(mv)]) << PLACEMENT_PRIOR_BITS;
+            if(mv == tt_move || (pv_move && mv == *pv_move) || killers[ply][0] == mv || killers[ply][1] == mv){
+                key |= int64_t(1) << 62;
+                ++forced;
             }
+            out[kept++] = ScoredMove{mv, key};
+        }
+
+        // 샘플링: 상위 K개만 사용(너무 많은 착수로 브랜치 폭 증가 방지). 전체 정렬 대신 앞쪽 K개만 고른다
+        int take = static_cast<int>(std::min(static_cast<size_t>(kept), placement_limit));
+        take = std::max(take, std::min(forced, kept));
+        std::partial_sort(out.begin(), out.begin() + take, out.begin() + kept, [](const ScoredMove &a, const ScoredMove &b){
+            return a.score > b.score;
+        });
+
+        // 나머지 수를 샘플 바로 뒤로 당긴다
+        int w = take;
+        for(int i=num_placements;i<out.size();++i) out[w++] = out[i];
+        out.resize(w);
+    }
+
+    // 다음 턴에 움직일 수 있는 기물(스턴 0, 이동 스택 > 0)
+    static bool is_ready(const piece &p){
+        return p.getStun() == 0 && p.getMove() > 0;
+    }
+
+    // 스턴 한 번은 "기물 하나에 스턴 +1, 그리고 턴 종료"라 부수효과가 있는 패스다.
+    // - 상대의 움직일 수 있는 기물을 스턴하면 그 기물은 상대의 다음 턴에 묶인다 (가치가 큰 순으로 stun_sample개)
+    // - 자기 기물을 스턴하면 턴 종료 처리(규칙 7, 9)로 곧바로 상쇄되므로 사실상 순수한 패스다 (pick_pass_stun)
+    // forced면(다른 수가 없음) 패스도 함께 넣는다. 스턴은 보드 위에 기물이 하나라도 있으면 항상 둘 수 있다.
+    void minimax::append_stuns(colorType player, MoveList &out, bool forced){
+        if(stun_sample == 0 && !forced) return;
+        const colorType opp = (player == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+
+        auto &scored = placement_scratch;
+        scored.clear();
+        bitboard theirs = simulate_board.getColorBitboard(opp);
+        while(theirs){
+            int sq = bb::popLsb(theirs);
+            const piece &p = simulate_board.at(bb::fileOf(sq), bb::rankOf(sq));
+            if(!is_ready(p)) continue;
+            scored.emplace_back(static_cast<double>(piece_value(p.getPieceType())),
+                                Move(player, moveType::STUN, threatType::NONE, pieceType::NONE, sq, 0));
         }
+        std::sort(scored.begin(), scored.end(), [](const auto &a, const auto &b){ return a.first > b.first; });
+
+        const size_t take = std::min(scored.size(), std::max<size_t>(stun_sample, forced ? 1 : 0));
+        for(size_t i=0;i<take;++i) out.push(scored[i].second, 0);
+
+        Move pass;
+        if(forced && pick_pass_stun(player, pass)) out.push(pass, 0);
+    }
 
-        // collect legal succesion PGNs and append those matching player
-        auto succs = simulate_board.calcLegalSuccesion(player);
-        if(!succs.empty()){
-            for(const auto &pgn : succs){
-                res.push_back(pgn);
+    // 패스로 쓸 스턴: 자기 기물 중 스턴이 없는 것(스턴 +1 → 턴 종료에 -1, 이동 스택 +1).
+    // 자기 기물이 모두 스턴 상태면 아무 기물이나, 보드가 비어 있으면 false.
+    bool minimax::pick_pass_stun(colorType player, Move &out) const {
+        const bitboard mine = simulate_board.getColorBitboard(player);
+        bitboard candidates = mine;
+        while(candidates){
+            int sq = bb::popLsb(candidates);
+            if(simulate_board.at(bb::fileOf(sq), bb::rankOf(sq)).getStun() == 0){
+                out = Move(player, moveType::STUN, threatType::NONE, pieceType::NONE, sq, 0);
+                return true;
             }
         }
+        const bitboard any = mine ? mine : simulate_board.getOccupancy();
+        if(!any) return false;
+        out = Move(player, moveType::STUN, threatType::NONE, pieceType::NONE, bb::lsb(any), 0);
+        return true;
+    }
 
-        // collect legal disguise PGNs and append
-        auto disguises = simulate_board.calcLegalDisguise(player);
-        if(!disguises.empty()){
-            for(const auto &pgn : disguises){
-                res.push_back(pgn);
+    // null move로 쓸 스턴: 이미 스턴된 자기 기물 중 스턴이 가장 많은 것.
+    // 턴 종료만 하는 진짜 패스와 비교하면 스턴 0인 기물의 스턴은 이동 스택 +1이 남아 두는 쪽에 유리하다
+    // (null 컷이 낙관적이 됨). 스턴된 기물의 스턴은 그 기물의 스턴 감소가 한 턴 늦어지는 것만 다르고
+    // 이는 두는 쪽에 불리하므로 null 탐색 값은 진짜 패스보다 보수적인 한계가 된다. 스턴이 가장 많은
+    // 기물은 줄인 깊이 안에서 어차피 움직일 수 없을 가능성이 커서 그 차이도 가장 작다.
+    // 그런 기물이 없으면(자기 기물이 모두 스턴 0) null move를 하지 않는다.
+    bool minimax::pick_null_stun(colorType player, Move &out) const {
+        bitboard mine = simulate_board.getColorBitboard(player);
+        int best_sq = -1;
+        int best_stun = 0;
+        while(mine){
+            int sq = bb::popLsb(mine);
+            const int stun = simulate_board.at(bb::fileOf(sq), bb::rankOf(sq)).getStun();
+            if(stun > best_stun){
+                best_stun = stun;
+                best_sq = sq;
             }
         }
+        if(best_sq < 0) return false;
+        out = Move(player, moveType::STUN, threatType::NONE, pieceType::NONE, best_sq, 0);
+        return true;
+    }
 
-        return res;
+    // 자기 차례에 스턴 말고 둘 수 있는 수가 있는지 (움직일 수 있는 기물 또는 포켓의 기물)
+    bool minimax::has_non_stun_moves(colorType player) const {
+        bitboard mine = simulate_board.getColorBitboard(player);
+        while(mine){
+            int sq = bb::popLsb(mine);
+            if(is_ready(simulate_board.at(bb::fileOf(sq), bb::rankOf(sq)))) return true;
+        }
+        const auto &pocket = (player == colorType::WHITE) ? simulate_board.getWhitePocket() : simulate_board.getBlackPocket();
+        return std::any_of(pocket.begin(), pocket.end(), [](int n){ return n > 0; });
     }
 
-    int minimax::minimax_search(int depth, colorType player, int alpha, int beta, int ply, std::vector<PGN>& pv_out)
+    int minimax::minimax_search(int depth, colorType player, int alpha, int beta, int ply, bool allow_null, bool cut_node)
     {
         nodes_searched++;
-        if (depth == 0) return quiescence(alpha, beta, 0, player);
+        if (search_stopped()) return 0;
+        if (depth == 0) return quiescence(alpha, beta, 0, player, ply);
 
         // Transposition table lookup
-        // use the incremental current_zobrist which is kept in sync by update_zobrist_for_move
-        uint64_t h = current_zobrist;
+        // 엔진이 doMove/unmakeMove마다 증분 갱신하는 포지션 해시를 그대로 키로 쓴다
+        uint64_t h = simulate_board.getHash();
         int original_alpha = alpha;
         int original_beta = beta;
+        Move tt_move; // 이전 탐색(이전 반복 또는 이전 수)이 남긴 최선수: 정렬에서 PV 수와 같은 우선순위
         {
-            TTEntry *te_ptr = tt_probe(h);
-            if(te_ptr != nullptr){
-                const TTEntry &te = *te_ptr;
-                if(te.depth >= depth){
+            TTEntry te;
+            if(tt_probe(h, te, ply)){
+                tt_move = te.best;
+                if(ply > 0 && te.depth >= depth){ // 루트는 PV를 만들어야 하므로 TT 컷오프를 쓰지 않는다
                     if(te.flag == 0) {
                         if(te.best.getMoveType() != moveType::NONE){
-                            pv_out.clear();
-                            pv_out.push_back(te.best);
+                            pv_table[ply][0] = te.best;
+                            pv_length[ply] = 1;
                         }
                         return te.value; // exact
                     }
@@ -500,133 +967,218 @@ namespace agent{
             }
         }
 
-        auto moves = gather_moves(player);
-        // filter out explicit NONE moves (safety)
-        moves.erase(std::remove_if(moves.begin(), moves.end(), [](const PGN &m){ return m.getMoveType() == moveType::NONE; }), moves.end());
-        // diagnostic: print basic info to find corrupt entries before sorting
+        bool maximizing = (player == cT);
+        const colorType other = (player == colorType::WHITE ? colorType::BLACK : colorType::WHITE);
+
+        // Null-move pruning: 이미 스턴된 자기 기물의 스턴(패스보다 조금 불리한 수, pick_null_stun)을 두고
+        // R만큼 줄인 깊이로 탐색했는데도 윈도우 밖이면 컷.
+        // 스턴은 실제로 둘 수 있는 수라서 그 값은 이 노드 값의 한계가 되고, 남는 위험은 줄인 깊이뿐이다.
+        // - 체크(로얄 공격) 중, 연속 패스, 스턴 말고 둘 수가 없는 노드(패스가 곧 전체 탐색)에서는 하지 않는다
+        // - 깊은 노드에서는 null 컷을 같은 쪽의 줄인 깊이 탐색(null 금지)으로 한 번 더 확인한다 (스택 때문에
+        //   기물을 움직이면 손해인 zugzwang 비슷한 상황에서 패스가 과대평가되는 것을 막음)
+        // 메이트 점수(또는 아직 열린 무한대 윈도우)는 줄인 깊이의 null 탐색으로 증명할 수 없다
+        auto is_mate_bound = [](int v){ return v <= -MATE_SCORE + 2 * MAX_PLY || v >= MATE_SCORE - 2 * MAX_PLY; };
+        const int null_bound = maximizing ? beta : alpha;
+        // PV 노드(윈도우 폭 > 1)는 정확한 값과 수순을 내야 하므로 가지치기는 영 윈도우 노드에서만 한다.
+        // 윈도우만 보고 정한다: PVS를 끄면 모든 노드가 넓은 윈도우라 가지치기 없이 순수 알파베타가 된다
+        const bool pv_node = static_cast<int64_t>(beta) - alpha > 1;
+        const bool in_check = simulate_board.isRoyalAttacked(player);
+        const bool selective = !pv_node && !in_check && ply > 0;
+
+        // 정적 평가(eval_pos)는 비싸므로 가지치기 조건이 실제로 필요할 때 한 번만 계산한다
+        int static_eval = 0;
+        bool have_static_eval = false;
+        auto stand = [&](){
+            if(!have_static_eval){ static_eval = valueForBot(); have_static_eval = true; }
+            return static_eval;
+        };
+
+        // Reverse futility (static null move): 잎 근처에서 정적 평가가 깊이당 여유만큼 빼고도 윈도우 밖이면
+        // 상대가 남은 몇 수로 그 차이를 뒤집기 어렵다고 보고 바로 돌려준다.
+        // 착수 한 번이 평가를 크게 흔들 수 있으므로 상대 포켓에서 가장 비싼 기물의 가치만큼 여유를 더 둔다.
+        if(use_reverse_futility && selective && depth <= reverse_futility_depth && !is_mate_bound(null_bound)){
+            const auto &their_pocket = (other == colorType::WHITE) ? simulate_board.getWhitePocket() : simulate_board.getBlackPocket();
+            int drop_swing = 0;
+            for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
+                if(their_pocket[i] > 0) drop_swing = std::max(drop_swing, piece_value(static_cast<pieceType>(i)));
+            }
+            const int margin = reverse_futility_margin * depth + drop_swing;
+            if(maximizing ? stand() - margin >= beta : stand() + margin <= alpha) return null_bound;
+        }
+
+        if(allow_null && null_move && selective && depth >= NULL_MOVE_MIN_DEPTH
+           && !is_mate_bound(null_bound)
+           && has_non_stun_moves(player)){
+            Move pass;
+            if((maximizing ? stand() >= beta : stand() <= alpha) && pick_null_stun(player, pass)){
+                const int R = (depth >= 6) ? 3 : 2;
+                const int null_alpha = maximizing ? beta - 1 : alpha;
+                const int null_beta = maximizing ? beta : alpha + 1;
+                make_move(pass);
+                int null_score = minimax_search(depth - 1 - R, other, null_alpha, null_beta, ply + 1, false, !cut_node);
+                unmake_move();
+                if(search_stopped()) return 0;
+
+                if((maximizing ? null_score >= beta : null_score <= alpha) && !is_mate_bound(null_score)){
+                    if(depth < NULL_MOVE_VERIFY_DEPTH) return null_bound;
+                    // 검증 탐색은 같은 ply에서 돌기 때문에 이 ply의 킬러와 PV 줄을 덮어쓴다. 끝나면 되돌린다
+                    const std::array<Move, 2> saved_killers = killers[ply];
+                    int verified = minimax_search(depth - R, player, null_alpha, null_beta, ply, false, cut_node);
+                    killers[ply] = saved_killers;
+                    pv_length[ply] = 0;
+                    if(search_stopped()) return 0;
+                    if(maximizing ? verified >= beta : verified <= alpha) return null_bound;
+                }
+            }
+        }
+
+        // Progressive widening: 착수 후보 수를 노드 종류에 따라 늘리거나 줄인다 (PV 노드는 넓게, 예상 cut 노드는 좁게)
+        size_t placement_limit = placement_sample;
+        if(use_placement_widening){
+            if(pv_node || ply == 0) placement_limit = placement_sample * static_cast<size_t>(std::max(0, placement_pv_percent)) / 100;
+            else if(cut_node) placement_limit = std::max<size_t>(1, placement_sample * static_cast<size_t>(std::max(0, placement_cut_percent)) / 100);
+        }
+
+        MoveListLease lease(*this);
+        MoveList &moves = lease.list;
+        gather_moves(player, moves, placement_limit, ply, tt_move);
         if (moves.empty()) return valueForBot();
 
         // 수순 정렬: PV 우선(있을 경우), 캡처/승격(SEE), 킬러 수, 히스토리 휴리스틱
-        PGN pv_move;
+        Move pv_move;
         bool have_pv_move = false;
-        if(iterative_deepening && ply < static_cast<int>(root_pv.size())){
+        if(ply < static_cast<int>(root_pv.size())){ // root_pv는 반복 심화 중에만 채워진다
             pv_move = root_pv[ply];
             have_pv_move = true;
         }
 
-        // 안정성: 정렬 중 comparator가 외부 상태(simulate_board, killers, history)를 직접 조회하면
-        // 재귀/이동으로 인한 댕글링 참조/타이밍 문제로 메모리 손상이 발생할 수 있다.
-        // 따라서 먼저 각 수에 대해 SEE, 히스토리, 킬러 플래그를 계산해 래핑한 뒤 정렬한다.
-        struct MoveWrapper { PGN m; int see; int hist; bool is_killer; bool is_pv; };
-        std::vector<MoveWrapper> wrapped;
-        wrapped.reserve(moves.size());
-        for(size_t i=0;i<moves.size();++i){
-            MoveWrapper w;
-            w.m = moves[i];
-            w.see = static_exchange_eval(moves[i], simulate_board);
-            uint32_t key = move_key(moves[i]);
-            w.hist = history.count(key) ? history.at(key) : 0;
-            w.is_killer = false;
-            for(const auto &k : killers[ply]){ if(k == moves[i]) { w.is_killer = true; break; } }
-            w.is_pv = (have_pv_move && moves[i] == pv_move);
-            wrapped.push_back(std::move(w));
-        }
-
-        std::sort(wrapped.begin(), wrapped.end(), [](const MoveWrapper &a, const MoveWrapper &b){
-            if(a.is_pv != b.is_pv) return a.is_pv; // pv 우선
-            if(a.see != b.see) return a.see > b.see; // SEE 우선
-            if(a.is_killer != b.is_killer) return a.is_killer; // 킬러 우선
-            if(a.hist != b.hist) return a.hist > b.hist; // 히스토리 휴리스틱
-            return false;
+        // 안정성: 정렬 중 comparator가 외부 상태(simulate_board, killers, history)를 직접 조회하지 않도록
+        // 먼저 각 수의 정렬 키를 score에 계산해 둔 뒤 정렬한다.
+        // 키는 (PV, SEE, 킬러, 히스토리, 생성 순서) 사전식 비교와 같은 순서가 되도록 비트 필드로 합친다:
+        //   bit 62 = PV, bit 46..61 = SEE + 2^15, bit 45 = 킬러, bit 11..44 = 히스토리, bit 0..10 = 앞쪽일수록 큰 순번
+        // 생성 순서를 마지막 키로 두어 동점인 착수는 sample_placements가 고른 순서(사전 점수)대로 탐색한다
+        for(int i = 0; i < moves.size(); ++i){
+            ScoredMove &sm = moves[i];
+            const Move &m = sm.move;
+            int see = static_exchange_eval(m, simulate_board);
+            int hist = history[history_index(m)];
+            bool is_killer = (killers[ply][0] == m || killers[ply][1] == m);
+            bool is_pv = (have_pv_move && m == pv_move) || (!tt_move.isNone() && m == tt_move);
+            int64_t key = 0;
+            key |= static_cast<int64_t>(is_pv) << 62;
+            key |= static_cast<int64_t>(see + (1 << 15)) << 46;
+            key |= static_cast<int64_t>(is_killer) << 45;
+            key |= static_cast<int64_t>(hist) << 11;
+            key |= static_cast<int64_t>(MoveList::CAPACITY - 1 - i);
+            sm.score = key;
+        }
+
+        std::sort(moves.begin(), moves.end(), [](const ScoredMove &a, const ScoredMove &b){
+            return a.score > b.score;
         });
 
-        // 정렬된 결과를 원래 moves 벡터에 복사
-        for(size_t i=0;i<wrapped.size();++i) moves[i] = std::move(wrapped[i].m);
-    
         int best = 0;
         bool has_best = false;
-        bool maximizing = (player == cT);
-        auto base = simulate_board.getPosition();
 
         // PV 출력용 변수 준비
-        PGN best_move;
-        std::vector<PGN> best_child_pv;
-
-        if (maximizing) {
-            for (auto &mv : moves) {
-                std::vector<PGN> child_pv;
-                // update hash incrementally, apply move
-                update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                simulate_board.updatePiece(mv);
-                // 엔진의 승리판정 사용
-                victoryType vt = simulate_board.getWhoIsVictory();
-                int score;
-                if(vt == victoryType::WHITE){
-                    score = (cT == colorType::WHITE) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player); // revert
-                } else if(vt == victoryType::BLACK){
-                    score = (cT == colorType::BLACK) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player); // revert
-                } else {
-                    // recurse
-                    score = minimax_search(depth - 1, (player == colorType::WHITE ? colorType::BLACK : colorType::WHITE), alpha, beta, ply+1, child_pv);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player); // revert
-                }
-                if (!has_best || score > best) {
-                    best = score;
-                    best_move = mv;
-                    best_child_pv = child_pv;
-                    has_best = true;
-                }
-                if (has_best && best > alpha) alpha = best;
-                if (has_best && alpha >= beta) {
-                    // record killer & history
-                    record_killer(ply, mv);
-                    record_history(mv, ply);
-                    break;
+        Move best_move;
+
+        // 최대화/최소화 두 갈래를 한 루프로 합친 negamax 형태: better()와 fail-high 조건만 쪽에 따라 뒤집는다.
+        // 값은 계속 봇 관점이라 TT, 퀴센스, 호출자는 그대로다.
+        // PVS(use_pvs): 첫 수만 전체 윈도우로, 나머지는 자기 경계에 붙은 영 윈도우로 탐색하고
+        // 영 윈도우가 경계를 넘으면(더 좋은 수일 수 있음) 전체 윈도우로 다시 탐색한다.
+        auto better = [maximizing](int a, int b){ return maximizing ? a > b : a < b; };
+        // 경계를 넘었는지(최대화 쪽은 alpha 초과, 최소화 쪽은 beta 미만): 줄인/영 윈도우 탐색 뒤 재탐색 조건
+        auto beats_bound = [&](int score){ return maximizing ? score > alpha : score < beta; };
+
+        // Futility: 잎 바로 위에서 정적 평가에 깊이당 여유와 그 수가 낼 수 있는 이득을 더해도 경계에 못 미치면
+        // 조용한 수는 값을 끌어올릴 수 없다고 보고 건너뛴다. 잡기/승격은 그대로 탐색한다.
+        // 착수는 놓인 기물이 바로 위협/중앙 보너스를 만들어 평가가 크게 움직이므로 그 기물 가치만큼,
+        // 스턴은 묶이는 기물 가치만큼 이득을 더 열어 둔다 (조용한 이동은 여유만).
+        const bitboard enemy = simulate_board.getColorBitboard(other);
+        const bool futility_node = use_futility && selective && depth <= futility_depth && !is_mate_bound(null_bound);
+        auto futile = [&](const Move &mv){
+            int gain = futility_margin * depth;
+            if(mv.getMoveType() == moveType::ADD){
+                // 놓인 기물 자체(중앙/이동성 보너스)와 그 기물이 막힘 없이 닿는 상대 기물 전부를 위협한다고 본 상한
+                gain += piece_value(mv.getPieceType());
+                bitboard targets = specs::compiled(mv.getPieceType(), player).reach[mv.getFrom()] & enemy;
+                while(targets){
+                    int sq = bb::popLsb(targets);
+                    gain += piece_value(simulate_board.at(bb::fileOf(sq), bb::rankOf(sq)).getPieceType());
                 }
             }
-        } else {
-            for (auto &mv : moves) {
-                std::vector<PGN> child_pv;
-                update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                simulate_board.updatePiece(mv);
-                victoryType vt = simulate_board.getWhoIsVictory();
-                int score;
-                if(vt == victoryType::WHITE){
-                    score = (cT == colorType::WHITE) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else if(vt == victoryType::BLACK){
-                    score = (cT == colorType::BLACK) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else {
-                    score = minimax_search(depth - 1, (player == colorType::WHITE ? colorType::BLACK : colorType::WHITE), alpha, beta, ply+1, child_pv);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                }
-                if (!has_best || score < best) {
-                    best = score;
-                    best_move = mv;
-                    best_child_pv = child_pv;
-                    has_best = true;
+            else if(mv.getMoveType() == moveType::STUN) gain += piece_value(simulate_board.at(bb::fileOf(mv.getFrom()), bb::rankOf(mv.getFrom())).getPieceType());
+            return maximizing ? stand() + gain <= alpha : stand() - gain >= beta;
+        };
+
+        // 자식 노드 종류: 첫 수의 자식은 PV 노드(PV에서) 또는 반대 종류, 뒤쪽 수의 영 윈도우 자식은 PV 노드에서 cut
+        int searched = 0;
+        for (const auto &sm : moves) {
+            const Move &mv = sm.move;
+            const bool tactical = (mv.getMoveType() == moveType::PROMOTE)
+                || ((mv.getMoveType() == moveType::MOVE) && mv.getThreatType() != threatType::SHIFT && (enemy & bb::squareBit(mv.getTo())));
+            const bool quiet = !tactical && !(killers[ply][0] == mv || killers[ply][1] == mv)
+                && !(have_pv_move && mv == pv_move) && !(mv == tt_move);
+            if(futility_node && searched > 0 && quiet && futile(mv)) continue;
+
+            pv_length[ply + 1] = 0;
+            make_move(mv);
+            // 엔진의 승리판정 사용
+            victoryType vt = simulate_board.getWhoIsVictory();
+            int score;
+            if(vt == victoryType::WHITE){
+                score = (cT == colorType::WHITE) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
+                unmake_move();
+            } else if(vt == victoryType::BLACK){
+                score = (cT == colorType::BLACK) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
+                unmake_move();
+            } else {
+                // LMR: 정렬 뒤쪽의 조용한 수(킬러/PV/TT 수 제외, 체크를 거는 수 제외)는 깊이를 줄여 먼저 탐색하고
+                // 경계를 넘을 때만 원래 깊이로 다시 탐색한다. 착수가 대부분인 노드에서 뒤쪽 착수들이 주로 줄어든다.
+                int reduction = 0;
+                if(use_lmr && selective && quiet && depth >= lmr_min_depth && searched >= lmr_min_moves
+                   && !simulate_board.isRoyalAttacked(other)){
+                    reduction = (searched >= 3 * lmr_min_moves && depth >= lmr_min_depth + 2) ? 2 : 1;
+                    reduction = std::max(0, std::min(reduction, depth - 2)); // 줄인 뒤에도 최소 1수는 본 탐색
                 }
-                if (has_best && best < beta) beta = best;
-                if (has_best && alpha >= beta) {
-                    // record killer & history
-                    record_killer(ply, mv);
-                    record_history(mv, ply);
-                    break;
+
+                if(searched == 0 || (!use_pvs && reduction == 0)){
+                    score = minimax_search(depth - 1, other, alpha, beta, ply+1, true, !pv_node && !cut_node);
+                } else {
+                    const int lo = use_pvs ? (maximizing ? alpha : beta - 1) : alpha;
+                    const int hi = use_pvs ? (maximizing ? alpha + 1 : beta) : beta;
+                    score = minimax_search(depth - 1 - reduction, other, lo, hi, ply+1, true, pv_node || !cut_node);
+                    if(reduction > 0 && !search_stopped() && beats_bound(score)){
+                        pv_length[ply + 1] = 0;
+                        score = minimax_search(depth - 1, other, lo, hi, ply+1, true, pv_node || !cut_node);
+                    }
+                    if(use_pvs && !search_stopped() && score > alpha && score < beta){
+                        pv_length[ply + 1] = 0;
+                        score = minimax_search(depth - 1, other, alpha, beta, ply+1);
+                    }
                 }
+                unmake_move();
+                if(search_stopped()) return 0; // 중단된 하위 탐색의 값은 쓰지도, TT에 저장하지도 않는다
+            }
+            ++searched;
+            if (!has_best || better(score, best)) {
+                best = score;
+                best_move = mv;
+                update_pv(ply, mv);
+                has_best = true;
+            }
+            if (maximizing) { if (best > alpha) alpha = best; }
+            else { if (best < beta) beta = best; }
+            if (alpha >= beta) {
+                // record killer & history
+                record_killer(ply, mv);
+                record_history(mv, ply);
+                break;
             }
         }
-
         if(!has_best){
-            pv_out.clear();
+            pv_length[ply] = 0;
             return valueForBot();
         }
 
@@ -638,15 +1190,8 @@ namespace agent{
         else if(best >= original_beta) e.flag = 1; // lowerbound
         else e.flag = 0; // exact
         e.best = best_move;
-        tt_store(current_zobrist, e);
+        tt_store(h, e, ply);
 
-        // pv_out 조립
-        pv_out.clear();
-        if(best_move.getMoveType() != moveType::NONE){
-            pv_out.push_back(best_move);
-            pv_out.insert(pv_out.end(), best_child_pv.begin(), best_child_pv.end());
-        }
-    
         if ((maximizing && best == std::numeric_limits<int>::min()) || (!maximizing && best == std::numeric_limits<int>::max())) {
             // 모든 후보 적용 실패 시 안전 복구(fallback)로 현재 시뮬레이션 보드 기준 값 반환
             return valueForBot();
@@ -654,283 +1199,287 @@ namespace agent{
         return best;
     }
 
-    std::vector<PGN> minimax::generate_captures_and_promotions(colorType player) {
-        std::vector<PGN> res;
-        // 보드에서 캡처/승격 수집
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = simulate_board.at(f, r);
-                if(p.getPieceType() == pieceType::NONE) continue;
-                if(p.getColor() != player) continue;
-                    auto moves = simulate_board.calcLegalMovesInOnePiece(player, f, r, false); // 이동 & 승격 (합법수만)
-                for(const auto &m : moves){
-                    // 대상 칸이 상대 기물로 점유되어 캡처가 되는 수 혹은 승격 수를 포함
-                    auto to = m.getToSquare();
-                    const piece &dest = simulate_board.at(to.first, to.second);
-                    if(dest.getPieceType() != pieceType::NONE && dest.getColor() != player) res.push_back(m);
-                    else if(m.getMoveType() == moveType::PROMOTE) res.push_back(m);
-                }
-            }
+    void minimax::generate_captures_and_promotions(colorType player, MoveList &out) {
+        // 보드에서 캡처/승격 수집 (player 기물만 비트보드로 순회)
+        out.clear();
+        const bitboard enemy = simulate_board.getOccupancy() & ~simulate_board.getColorBitboard(player);
+        bitboard mine = simulate_board.getColorBitboard(player);
+        while(mine){
+            int sq = bb::popLsb(mine);
+            simulate_board.generatePieceMoves(player, bb::fileOf(sq), bb::rankOf(sq), false, out); // 이동 & 승격 (합법수만)
         }
-        return res;
+        // 대상 칸이 상대 기물로 점유되어 캡처가 되는 수 혹은 승격 수만 제자리에서 남긴다
+        int kept = 0;
+        for(int i=0;i<out.size();++i){
+            const Move &m = out[i].move;
+            // SHIFT는 상대 기물과 자리만 바꾸므로 잡기가 아니다
+            const bool capture = (enemy & bb::squareBit(m.getTo())) && m.getThreatType() != threatType::SHIFT;
+            if(capture || m.getMoveType() == moveType::PROMOTE) out[kept++] = out[i];
+        }
+        out.resize(kept);
     }
 
-    int minimax::quiescence(int alpha, int beta, int ply_depth, colorType player){
+    /*
+     * quiescence
+     * 잡기/승격만 따라가며 정적 평가가 안정될 때까지 본다.
+     * - TT: 퀴센스 결과는 깊이 0 엔트리로 저장한다. 메인 탐색은 depth >= 1 엔트리로만 컷하므로 영향이 없고,
+     *       퀴센스는 깊이와 상관없이 아무 엔트리나 쓴다. 메인 탐색이 남긴 더 깊은 엔트리는 덮어쓰지 않는다.
+     * - SEE 가지치기: 교환 결과가 손해(SEE < 0)인 잡기는 보지 않는다.
+     * - 델타 가지치기: 잡기로 움직일 수 있는 물질(잡힌 기물 가치 x 2 + 승격 이득) + delta_margin을 더해도
+     *   윈도우에 못 미치는 잡기는 보지 않는다.
+     */
+    int minimax::quiescence(int alpha, int beta, int ply_depth, colorType player, int ply){
         // 퀴센스는 root_pv를 수정하지 않으며 현재 simulate_board 상태를 사용
 
         nodes_searched++;
-        const int MAX_Q_DEPTH = 32;
+        qnodes_searched++;
+        if(search_stopped()) return 0;
         if(ply_depth > MAX_Q_DEPTH) return valueForBot();
 
+        const bool maximizing = (player == cT);
+        const uint64_t h = simulate_board.getHash();
+        const int original_alpha = alpha;
+        const int original_beta = beta;
+        Move tt_move;
+        bool keep_entry = false; // 메인 탐색의 엔트리(깊이 >= 1)가 있으면 퀴센스 결과로 덮어쓰지 않는다
+        if(use_qsearch_tt){
+            TTEntry te;
+            if(tt_probe(h, te, ply)){
+                tt_move = te.best;
+                keep_entry = te.depth > 0;
+                if(te.flag == 0) return te.value;
+                if(te.flag == 1 && te.value >= beta) return te.value;
+                if(te.flag == 2 && te.value <= alpha) return te.value;
+            }
+        }
+        auto store = [&](int value, const Move &best){
+            if(!use_qsearch_tt || keep_entry || search_stopped()) return;
+            TTEntry ne;
+            ne.key = h;
+            ne.value = value;
+            ne.depth = 0;
+            ne.best = best;
+            if(value <= original_alpha) ne.flag = 2;
+            else if(value >= original_beta) ne.flag = 1;
+            else ne.flag = 0;
+            tt_store(h, ne, ply);
+        };
+
         int stand_pat = valueForBot();
-        bool maximizing = (player == cT);
 
         if(maximizing){
-            if(stand_pat >= beta) return stand_pat;
+            if(stand_pat >= beta){ store(stand_pat, Move()); return stand_pat; }
             if(alpha < stand_pat) alpha = stand_pat;
         } else {
-            if(stand_pat <= alpha) return stand_pat;
+            if(stand_pat <= alpha){ store(stand_pat, Move()); return stand_pat; }
             if(beta > stand_pat) beta = stand_pat;
         }
 
-        auto moves = generate_captures_and_promotions(player);
+        MoveListLease lease(*this);
+        MoveList &moves = lease.list;
+        generate_captures_and_promotions(player, moves);
         if(moves.empty()){
+            store(stand_pat, Move());
             return stand_pat;
         }
 
-        // SEE 기준 — 계산을 미리 해서 정렬 시 중복 호출을 피함
-        struct QMoveWrap { PGN m; int see; };
-        std::vector<QMoveWrap> qwrap;
-        qwrap.reserve(moves.size());
-        for(const auto &mv : moves){
-            qwrap.push_back({mv, static_exchange_eval(mv, simulate_board)});
+        // SEE 기준 — 계산을 미리 해서 정렬 시 중복 호출을 피함. TT 수는 맨 앞으로
+        for(auto &sm : moves){
+            const int see = static_exchange_eval(sm.move, simulate_board);
+            sm.score = (tt_move.getMoveType() != moveType::NONE && sm.move == tt_move) ? std::numeric_limits<int>::max() : see;
         }
-        std::sort(qwrap.begin(), qwrap.end(), [](const QMoveWrap &a, const QMoveWrap &b){
-            return a.see > b.see;
+        std::sort(moves.begin(), moves.end(), [](const ScoredMove &a, const ScoredMove &b){
+            return a.score > b.score;
         });
-        // 정렬 결과를 moves로 복원
-        moves.clear();
-        moves.reserve(qwrap.size());
-        for(auto &w : qwrap) moves.push_back(std::move(w.m));
 
-        auto base = simulate_board.getPosition();
         colorType other = (player == colorType::WHITE ? colorType::BLACK : colorType::WHITE);
+        const bitboard enemy = simulate_board.getColorBitboard(other);
+
+        // 잡는 기물 가치 x 2 + 승격 이득: 잡힌 기물은 보드에서 빠지고 잡은 쪽 포켓으로 들어가므로(규칙 11)
+        // 평가의 물질 항이 기물 가치의 두 배만큼 움직인다
+        auto capture_gain = [&](const Move &mv){
+            int gain = 0;
+            if(enemy & bb::squareBit(mv.getTo())) gain += 2 * see_value(simulate_board.at(bb::fileOf(mv.getTo()), bb::rankOf(mv.getTo())));
+            if(mv.getMoveType() == moveType::PROMOTE){
+                gain += piece_value(mv.getPieceType()) - piece_value(simulate_board.at(bb::fileOf(mv.getFrom()), bb::rankOf(mv.getFrom())).getPieceType());
+            }
+            return gain;
+        };
+
+        Move best_move;
+        for(const auto &sm : moves){
+            const Move &mv = sm.move;
+            const bool is_tt_move = sm.score == std::numeric_limits<int>::max();
+            if(use_see_pruning && !is_tt_move && sm.score < 0) continue;
+            if(use_delta_pruning){
+                const int reach = capture_gain(mv) + delta_margin;
+                if(maximizing ? stand_pat + reach <= alpha : stand_pat - reach >= beta) continue;
+            }
 
-        if(maximizing){
-            for(const auto &mv : moves){
-                // update zobrist + apply move
-                update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                simulate_board.updatePiece(mv);
-                victoryType vt = simulate_board.getWhoIsVictory();
-                int score_q;
-                if(vt == victoryType::WHITE){
-                    score_q = (cT == colorType::WHITE) ? (MATE_SCORE - ply_depth) : (-MATE_SCORE + ply_depth);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else if(vt == victoryType::BLACK){
-                    score_q = (cT == colorType::BLACK) ? (MATE_SCORE - ply_depth) : (-MATE_SCORE + ply_depth);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else {
-                    score_q = quiescence(alpha, beta, ply_depth+1, other);
-                    // undo
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                }
-
-                if(score_q > alpha) alpha = score_q;
-                if(alpha >= beta){
-                    record_killer(ply_depth, mv);
-                    record_history(mv, ply_depth);
-                    return alpha;
-                }
+            // apply move
+            make_move(mv);
+            victoryType vt = simulate_board.getWhoIsVictory();
+            int score_q;
+            if(vt == victoryType::WHITE){
+                score_q = (cT == colorType::WHITE) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
+            } else if(vt == victoryType::BLACK){
+                score_q = (cT == colorType::BLACK) ? (MATE_SCORE - ply) : (-MATE_SCORE + ply);
+            } else {
+                score_q = quiescence(alpha, beta, ply_depth+1, other, ply+1);
             }
-            return alpha;
-        } else {
-            for(const auto &mv : moves){
-                update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                simulate_board.updatePiece(mv);
-                victoryType vt = simulate_board.getWhoIsVictory();
-                int score_q;
-                if(vt == victoryType::WHITE){
-                    score_q = (cT == colorType::WHITE) ? (MATE_SCORE - ply_depth) : (-MATE_SCORE + ply_depth);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else if(vt == victoryType::BLACK){
-                    score_q = (cT == colorType::BLACK) ? (MATE_SCORE - ply_depth) : (-MATE_SCORE + ply_depth);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                } else {
-                    score_q = quiescence(alpha, beta, ply_depth+1, other);
-                    simulate_board.undoBoard();
-                    update_zobrist_for_move(current_zobrist, mv, simulate_board, player);
-                }
+            // undo
+            unmake_move();
 
-                if(score_q < beta) beta = score_q;
-                if(alpha >= beta){
-                    record_killer(ply_depth, mv);
-                    record_history(mv, ply_depth);
-                    return beta;
-                }
+            if(maximizing ? score_q > alpha : score_q < beta){
+                if(maximizing) alpha = score_q;
+                else beta = score_q;
+                best_move = mv;
+            }
+            if(alpha >= beta){
+                record_killer(ply_depth, mv);
+                record_history(mv, ply_depth);
+                const int bound = maximizing ? alpha : beta;
+                store(bound, mv);
+                return bound;
             }
-            return beta;
         }
+        const int result = maximizing ? alpha : beta;
+        store(result, best_move);
+        return result;
     }
-    PGN minimax::getBestMove(position curr_pos, int depth){
+    bool minimax::limit_reached() const {
+        if(node_deadline != 0 && nodes_searched >= node_deadline) return true;
+        return std::chrono::steady_clock::now() >= hard_deadline;
+    }
+
+    bool minimax::search_stopped(){
+        if(stop_signal == nullptr) return false;
+        if(stop_signal->load(std::memory_order_relaxed)) return true; // 한 번 걸리면 그대로 유지된다 (시계를 다시 보지 않음)
+        // 시계 확인은 비싸므로 노드 수가 1024 경계를 새로 넘었을 때만 한다.
+        // (nodes % 1024 == 0으로 거르면 카운터가 경계에 머무는 동안 부르는 호출마다 시계를 본다)
+        if(!limits_active || nodes_searched < next_limit_check) return false;
+        next_limit_check = (nodes_searched | 1023) + 1;
+        if(!limit_reached()) return false;
+        stop_flag.store(true, std::memory_order_relaxed);
+        return true;
+    }
+
+    /*
+     * search
+     * 반복 심화(+선택적 aspiration window) 루프를 한 곳에 모은 탐색 드라이버.
+     * - iterative_deepening이 꺼져 있고 시간/노드 한도가 없으면 limits.depth로 한 번만 탐색한다.
+     * - hard 한도에 걸리면 진행 중인 반복을 버리고 마지막으로 끝난 반복의 PV/평가치를 돌려준다.
+     * - soft 한도가 지나면 다음 반복을 시작하지 않는다.
+     */
+    calcInfo minimax::search(position curr_pos, const SearchLimits &limits){
+        calcInfo info{};
+        const auto t_start = std::chrono::steady_clock::now();
+        const uint64_t nodes_at_start = nodes_searched;
+        const uint64_t qnodes_at_start = qnodes_searched;
+        const uint64_t eval_probes_at_start = eval_probes;
+        const uint64_t eval_hits_at_start = eval_hits;
+
+        // prepare simulate board and PV storage
         simulate_board = chessboard(curr_pos);
+        eval_reset();
         offset_board = curr_pos;
-
         root_pv.clear();
+        pv_length[0] = 0;
 
         // follow_turn mode: adapt to position.turn_right; otherwise require match
         if(follow_turn){
             cT = curr_pos.turn_right;
         } else {
-            if(curr_pos.turn_right != cT) return PGN();
-        }
-
-        // initialize incremental zobrist (includes side-to-move constant for the root player)
-        current_zobrist = compute_zobrist(simulate_board.getPosition()) ^ zobrist_side[(cT == colorType::WHITE) ? 0 : 1];
-
-        if(!iterative_deepening){
-            // 단발 검색(한 번에 전체 깊이 탐색)
-            std::vector<PGN> pv;
-            (void)minimax_search(depth, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-            if(!pv.empty()) return pv[0];
-            return PGN();
+            if(curr_pos.turn_right != cT) return info;
         }
 
-        // iterative deepening with PV-first
-        std::vector<PGN> pv;
-        PGN bestMove;
+        const int max_depth = std::max(1, std::min(limits.depth, MAX_PLY - 1));
+        const bool limited = limits.time_ms > 0 || limits.soft_ms > 0 || limits.hard_ms > 0 || limits.nodes > 0;
+        const int64_t soft_ms = (limits.soft_ms > 0) ? limits.soft_ms : limits.time_ms / 2;
+        const int64_t hard_ms = (limits.hard_ms > 0) ? limits.hard_ms : limits.time_ms;
+        hard_deadline = (hard_ms > 0) ? t_start + std::chrono::milliseconds(hard_ms)
+                                      : std::chrono::steady_clock::time_point::max();
+        node_deadline = (limits.nodes > 0) ? nodes_at_start + limits.nodes : 0;
+        next_limit_check = 0;
+        limits_active = false; // 깊이 1은 한도와 상관없이 끝까지 탐색해 돌려줄 수를 확보한다
+        stop_flag.store(false, std::memory_order_relaxed);
+        stop_signal = limited ? &stop_flag : nullptr;
+
+        tt_new_search();
+        std::vector<std::thread> pool = start_helpers(max_depth);
+
+        std::vector<Move> pv;
+        std::vector<Move> best_pv;
         int last_score = 0;
-        for(int d = 1; d <= depth; ++d){
+        const int first_depth = (iterative_deepening || limited) ? 1 : max_depth;
+        for(int d = first_depth; d <= max_depth; ++d){
             pv.clear();
+            pv_length[0] = 0;
             int score;
-            if(!use_aspiration || d == 1){
-                score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
+            if(!use_aspiration || d == first_depth){
+                score = search_root(d, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), pv);
             } else {
                 // aspiration window around last_score
                 int window = aspiration_window_base;
                 int alpha = last_score - window;
                 int beta  = last_score + window;
-                score = minimax_search(d, cT, alpha, beta, 0, pv);
-                if(score <= alpha || score >= beta){
+                score = search_root(d, alpha, beta, pv);
+                if((score <= alpha || score >= beta) && !search_stopped()){
                     // failed aspiration - full re-search
-                    score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
+                    score = search_root(d, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), pv);
                 }
             }
+            if(search_stopped()) break; // 중단된 반복의 값과 PV는 버린다
+
             last_score = score;
-            if(!pv.empty()) {
+            info.depth = d;
+            if(!pv.empty()){
                 root_pv = pv; // update root pv for next iteration
-                bestMove = pv[0];
+                best_pv = pv;
             }
-        }
-
-        return bestMove;
-    }
 
-    std::vector<PGN> minimax::getBestLine(position curr_pos, int depth){
-        // prepare simulate board and PV storage
-        simulate_board = chessboard(curr_pos);
-        offset_board = curr_pos;
-        root_pv.clear();
-
-        std::vector<PGN> pv;
-
-        // follow_turn mode: adapt to position.turn_right; otherwise require match
-        if(follow_turn){
-            cT = curr_pos.turn_right;
-        } else {
-            if(curr_pos.turn_right != cT) return {};
+            if(!limited) continue;
+            limits_active = true;
+            double elapsed = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - t_start).count();
+            if((soft_ms > 0 && elapsed >= static_cast<double>(soft_ms)) || limit_reached()) break;
         }
+        stop_helpers(pool);
+        limits_active = false;
+        stop_signal = nullptr;
 
-        // initialize zobrist for PV generation
-        current_zobrist = compute_zobrist(simulate_board.getPosition()) ^ zobrist_side[(cT == colorType::WHITE) ? 0 : 1];
-
-        if(!iterative_deepening){
-            (void)minimax_search(depth, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-        } else {
-            int last_score = 0;
-            for(int d = 1; d <= depth; ++d){
-                pv.clear();
-                int score;
-                if(!use_aspiration || d == 1){
-                    score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-                } else {
-                    int window = aspiration_window_base;
-                    int alpha = last_score - window;
-                    int beta  = last_score + window;
-                    score = minimax_search(d, cT, alpha, beta, 0, pv);
-                    if(score <= alpha || score >= beta){
-                        score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-                    }
-                }
-                last_score = score;
-                if(!pv.empty()) root_pv = pv;
-            }
-        }
+        // convert to the same convention as eval_pos(): + = white better, - = black better
+        info.eval_val = (cT == colorType::WHITE) ? last_score : -last_score;
+        if(!best_pv.empty()) info.bestMove = best_pv[0].toPGN();
 
         // PV only (no prefix log)
-        return pv;
+        info.line.reserve(best_pv.size());
+        for(const auto &mv : best_pv) info.line.push_back(mv.toPGN());
+
+        info.nodes = nodes_searched - nodes_at_start;
+        info.qnodes = qnodes_searched - qnodes_at_start;
+        info.eval_probes = eval_probes - eval_probes_at_start;
+        info.eval_hits = eval_hits - eval_hits_at_start;
+        info.time_ms = std::chrono::duration<double, std::milli>(std::chrono::steady_clock::now() - t_start).count();
+        return info;
     }
 
-    calcInfo minimax::getCalcInfo(position curr_pos, int depth)
-    {
-        calcInfo info{};
-
-        // prepare simulate board and PV storage
-        simulate_board = chessboard(curr_pos);
-        offset_board = curr_pos;
-        root_pv.clear();
-
-        std::vector<PGN> pv;
-
-        // follow_turn mode: adapt to position.turn_right; otherwise require match
-        if(follow_turn){
-            cT = curr_pos.turn_right;
-        } else {
-            if(curr_pos.turn_right != cT) return info;
-        }
-
-        // initialize zobrist for PV generation
-        current_zobrist = compute_zobrist(simulate_board.getPosition()) ^ zobrist_side[(cT == colorType::WHITE) ? 0 : 1];
-
-        int final_score_bot = 0;
-        if(!iterative_deepening){
-            final_score_bot = minimax_search(depth, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-        } else {
-            int last_score = 0;
-            for(int d = 1; d <= depth; ++d){
-                pv.clear();
-                int score;
-                if(!use_aspiration || d == 1){
-                    score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-                } else {
-                    int window = aspiration_window_base;
-                    int alpha = last_score - window;
-                    int beta  = last_score + window;
-                    score = minimax_search(d, cT, alpha, beta, 0, pv);
-                    if(score <= alpha || score >= beta){
-                        score = minimax_search(d, cT, std::numeric_limits<int>::min(), std::numeric_limits<int>::max(), 0, pv);
-                    }
-                }
-                last_score = score;
-                if(!pv.empty()) root_pv = pv;
-            }
-            final_score_bot = last_score;
-        }
-
-        // convert to the same convention as eval_pos(): + = white better, - = black better
-        info.eval_val = (cT == colorType::WHITE) ? final_score_bot : -final_score_bot;
-
-        if(!pv.empty()) info.bestMove = pv[0];
-        else info.bestMove = PGN();
+    PGN minimax::getBestMove(position curr_pos, int depth){
+        SearchLimits limits;
+        limits.depth = depth;
+        return search(curr_pos, limits).bestMove;
+    }
 
-        // PV only (no prefix log)
-        info.line = pv;
+    std::vector<PGN> minimax::getBestLine(position curr_pos, int depth){
+        SearchLimits limits;
+        limits.depth = depth;
+        return search(curr_pos, limits).line;
+    }
 
-        return info;
+    calcInfo minimax::getCalcInfo(position curr_pos, int depth)
+    {
+        SearchLimits limits;
+        limits.depth = depth;
+        return search(curr_pos, limits);
     }
 } // namespace agent
 
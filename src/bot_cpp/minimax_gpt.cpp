@@ -1,4 +1,5 @@
 #include "agent.hpp"
+#include <array>
 #include <cmath>
 
 namespace agent {
@@ -35,107 +36,48 @@ static double placement_decay(double base_value, int f, int r){
     return base_value * std::exp(-lambda * dist);
 }
 
-// Internal minimax subclass that overrides eval_pos/placement_score
+// Internal minimax subclass that overrides the evaluation terms/placement_score
 struct minimax_gpt_impl : public minimax {
     minimax_gpt_impl(colorType ct) : minimax(ct) {}
     minimax_gpt_impl() : minimax() {}
-    virtual int eval_pos(const position& pos) const override {
-        // Weighted sum of components (centipawn-ish scale)
-        const double w_M = 1.0;        // 기물 자체 가치
-        const double w_Mob = 1.0;     // 이동성
-        const double w_Res = 1.0;     // 스택 가치 (move/stun stacks)
-        const double w_Place = 1.0;   // 착수 위치의 중앙 거리 대비 가중치
-        const double w_Thr = 1.0;     // threat/capture potential 기물 공격 가중치
-        const double w_Turn = 10.0;    // side-to-move bonus 템포 가중치
-
-        chessboard tmp(pos);
-        double Mat = 0.0;
-        double Mob = 0.0;
-        double Res = 0.0;
-        double Place = 0.0;
-        double Thr = 0.0;
-
-        // material & resource & basic counts
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = pos.board[f][r];
-                if(p.getPieceType() == pieceType::NONE) continue;
-                int val = g_piece_value(p.getPieceType());
-                if(p.getColor() == colorType::WHITE) Mat += val;
-                else Mat -= val;
-
-                int mvstk = p.getMove();
-                int stnstk = p.getStun();
-                double res_contrib = static_cast<double>(mvstk) - 0.5 * static_cast<double>(stnstk);
-                if(p.getColor() == colorType::WHITE) Res += res_contrib; else Res -= res_contrib;
-            }
-        }
-
-        // pockets: add pocket material contribution (approx)
-        for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
-            int wcnt = pos.whitePocket[i];
-            int bcnt = pos.blackPocket[i];
-            int pv = g_piece_value(static_cast<pieceType>(i));
-            Mat += pv * wcnt;
-            Mat -= pv * bcnt;
-        }
-
-        // Mobility and threat: approximate by sampling legal moves per piece
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = tmp.at(f,r);
-                if(p.getPieceType() == pieceType::NONE) continue;
-                auto moves = tmp.calcLegalMovesInOnePiece(p.getColor(), f, r, true);
-                int mvcount = static_cast<int>(moves.size());
-                int capped = std::min(mvcount, 32);
-                double mob_contrib = static_cast<double>(capped);
-                if(p.getColor() == colorType::WHITE) Mob += mob_contrib; else Mob -= mob_contrib;
-
-                for(const auto &m : moves){
-                    if(m.getMoveType() == moveType::PROMOTE) continue;
-                    auto to = m.getToSquare();
-                    const piece &vict = tmp.at(to.first, to.second);
-                    if(!vict.isEmpty() && vict.getColor() != p.getColor()){
-                        int v = g_piece_value(vict.getPieceType());
-                        if(p.getColor() == colorType::WHITE) Thr += v; else Thr -= v;
-                    }
+    // Weighted sum of components (centipawn-ish scale), all weights 1 except the side-to-move bonus:
+    // Mat(board + pockets) + Mob(moves per piece, capped at 32) + Res(move - 0.5 stun stacks)
+    // + Place(center decay) + Thr(value of attacked enemy pieces) + 10 x Turn.
+    // 항은 minimax가 make/unmake마다 증분으로 모아 두고, 여기서는 고정소수점으로 합치기만 한다.
+    int eval_combine(const EvalTerms &t, colorType turn) const override {
+        const int64_t one = EVAL_FIXED_ONE;
+        const int64_t w_Turn = 10; // side-to-move bonus 템포 가중치
+        int64_t eval = one * (t.board.material + t.pocket_material + t.board.mobility + t.board.threat);
+        eval += one * t.board.move - (one / 2) * t.board.stun;
+        eval += t.board.place;
+        eval += one * w_Turn * ((turn == colorType::WHITE) ? 1 : -1);
+        return eval_round(eval, one);
+    }
+
+    // Placement bias: small bonus for central placements currently on board (EVAL_FIXED_ONE 단위로 미리 계산)
+    int64_t eval_place(pieceType pt, int sq) const override {
+        static const auto table = [](){
+            std::array<std::array<int64_t, bb::SQUARE_NB>, NUMBER_OF_PIECEKIND> t{};
+            for(int i=0;i<NUMBER_OF_PIECEKIND;++i){
+                const double base = static_cast<double>(g_piece_value(static_cast<pieceType>(i)));
+                for(int sq=0; sq<bb::SQUARE_NB; ++sq){
+                    t[i][sq] = std::llround(placement_decay(base, bb::fileOf(sq), bb::rankOf(sq)) * static_cast<double>(EVAL_FIXED_ONE));
                 }
             }
-        }
-
-        // Placement bias: small bonus for central placements currently on board
-        for(int f=0; f<BOARDSIZE; ++f){
-            for(int r=0; r<BOARDSIZE; ++r){
-                const piece &p = pos.board[f][r];
-                if(p.getPieceType() == pieceType::NONE) continue;
-                double base = static_cast<double>(g_piece_value(p.getPieceType()));
-                double dx = 4.5 - static_cast<double>(f);
-                double dy = 4.5 - static_cast<double>(r);
-                double dist = std::sqrt(dx*dx + dy*dy);
-                const double lambda = 0.35;
-                double dec = base * std::exp(-lambda * dist);
-                if(p.getColor() == colorType::WHITE) Place += dec; else Place -= dec;
-            }
-        }
-
-        // infer side-to-move from explicit flag `turn_right` in position
-        double Turn = (pos.turn_right == colorType::WHITE) ? 1.0 : -1.0;
-
-        double eval = 0.0;
-        eval += w_M * Mat;
-        eval += w_Mob * Mob;
-        eval += w_Res * Res;
-        eval += w_Place * Place;
-        eval += w_Thr * Thr;
-        eval += w_Turn * Turn;
+            return t;
+        }();
+        return table[static_cast<int>(pt)][sq];
+    }
 
-        return static_cast<int>(std::round(eval));
+    // Lazy SMP 헬퍼도 같은 평가 함수를 쓰도록 자기 타입으로 만든다
+    std::unique_ptr<minimax> make_helper() const override {
+        return std::make_unique<minimax_gpt_impl>();
     }
 
-    double placement_score(const PGN &pgn, colorType player) const {
-        auto from = pgn.getFromSquare();
+    double placement_score(const Move &mv, colorType player) const override {
+        auto from = mv.getFromSquare();
         int f = from.first, r = from.second;
-        int pv = g_piece_value(pgn.getPieceType());
+        int pv = g_piece_value(mv.getPieceType());
         double base = static_cast<double>(pv);
         double dec = placement_decay(base, f, r);
         return (player == colorType::WHITE) ? dec : -dec;
@@ -174,13 +116,60 @@ calcInfo minimax_GPTproposed::getCalcInfo(position curr_pos, int depth)
     return impl->mptr->getCalcInfo(curr_pos, depth);
 }
 
+calcInfo minimax_GPTproposed::search(position curr_pos, const SearchLimits &limits)
+{
+    return impl->mptr->search(curr_pos, limits);
+}
+
 // Forwarding control/inspection helpers
 void minimax_GPTproposed::setPlacementSample(size_t k){ impl->mptr->setPlacementSample(k); }
+void minimax_GPTproposed::setUsePlacementWidening(bool v){ impl->mptr->setUsePlacementWidening(v); }
+bool minimax_GPTproposed::getUsePlacementWidening() const { return impl->mptr->getUsePlacementWidening(); }
+void minimax_GPTproposed::setPlacementWideningParams(int pv_percent, int cut_percent){ impl->mptr->setPlacementWideningParams(pv_percent, cut_percent); }
+void minimax_GPTproposed::setStunSample(size_t k){ impl->mptr->setStunSample(k); }
+size_t minimax_GPTproposed::getStunSample() const { return impl->mptr->getStunSample(); }
+void minimax_GPTproposed::setNullMove(bool v){ impl->mptr->setNullMove(v); }
+bool minimax_GPTproposed::getNullMove() const { return impl->mptr->getNullMove(); }
+void minimax_GPTproposed::setUsePVS(bool v){ impl->mptr->setUsePVS(v); }
+bool minimax_GPTproposed::getUsePVS() const { return impl->mptr->getUsePVS(); }
+void minimax_GPTproposed::setUseLMR(bool v){ impl->mptr->setUseLMR(v); }
+bool minimax_GPTproposed::getUseLMR() const { return impl->mptr->getUseLMR(); }
+void minimax_GPTproposed::setLMRParams(int min_depth, int min_moves){ impl->mptr->setLMRParams(min_depth, min_moves); }
+void minimax_GPTproposed::setUseFutility(bool v){ impl->mptr->setUseFutility(v); }
+bool minimax_GPTproposed::getUseFutility() const { return impl->mptr->getUseFutility(); }
+void minimax_GPTproposed::setFutilityParams(int margin, int max_depth){ impl->mptr->setFutilityParams(margin, max_depth); }
+void minimax_GPTproposed::setUseReverseFutility(bool v){ impl->mptr->setUseReverseFutility(v); }
+bool minimax_GPTproposed::getUseReverseFutility() const { return impl->mptr->getUseReverseFutility(); }
+void minimax_GPTproposed::setReverseFutilityParams(int margin, int max_depth){ impl->mptr->setReverseFutilityParams(margin, max_depth); }
+void minimax_GPTproposed::setUseSEEPruning(bool v){ impl->mptr->setUseSEEPruning(v); }
+bool minimax_GPTproposed::getUseSEEPruning() const { return impl->mptr->getUseSEEPruning(); }
+void minimax_GPTproposed::setUseDeltaPruning(bool v){ impl->mptr->setUseDeltaPruning(v); }
+bool minimax_GPTproposed::getUseDeltaPruning() const { return impl->mptr->getUseDeltaPruning(); }
+void minimax_GPTproposed::setDeltaMargin(int margin){ impl->mptr->setDeltaMargin(margin); }
+int minimax_GPTproposed::getDeltaMargin() const { return impl->mptr->getDeltaMargin(); }
+void minimax_GPTproposed::setUseQSearchTT(bool v){ impl->mptr->setUseQSearchTT(v); }
+bool minimax_GPTproposed::getUseQSearchTT() const { return impl->mptr->getUseQSearchTT(); }
+void minimax_GPTproposed::setUseEvalCache(bool v){ impl->mptr->setUseEvalCache(v); }
+bool minimax_GPTproposed::getUseEvalCache() const { return impl->mptr->getUseEvalCache(); }
+void minimax_GPTproposed::setEvalCacheMB(size_t mb){ impl->mptr->setEvalCacheMB(mb); }
+size_t minimax_GPTproposed::getEvalCacheMB() const { return impl->mptr->getEvalCacheMB(); }
+void minimax_GPTproposed::clearEvalCache(){ impl->mptr->clearEvalCache(); }
 void minimax_GPTproposed::reset_search_data(){ impl->mptr->reset_search_data(); }
 void minimax_GPTproposed::setIterativeDeepening(bool v){ impl->mptr->iterative_deepening = v; }
 void minimax_GPTproposed::setUseAspiration(bool v){ impl->mptr->use_aspiration = v; }
 void minimax_GPTproposed::setAspirationWindowBase(int val){ impl->mptr->aspiration_window_base = val; }
 void minimax_GPTproposed::setNodesSearched(uint64_t val){ impl->mptr->nodes_searched = val;}
 uint64_t minimax_GPTproposed::getNodesSearched() const { return impl->mptr->nodes_searched; }
+uint64_t minimax_GPTproposed::getQNodesSearched() const { return impl->mptr->qnodes_searched; }
+uint64_t minimax_GPTproposed::getEvalProbes() const { return impl->mptr->eval_probes; }
+uint64_t minimax_GPTproposed::getEvalHits() const { return impl->mptr->eval_hits; }
+void minimax_GPTproposed::setThreads(int n){ impl->mptr->setThreads(n); }
+int minimax_GPTproposed::getThreads() const { return impl->mptr->getThreads(); }
+void minimax_GPTproposed::setHashMB(size_t mb){ impl->mptr->setHashMB(mb); }
+size_t minimax_GPTproposed::getHashMB() const { return impl->mptr->getHashMB(); }
+int minimax_GPTproposed::hashfull() const { return impl->mptr->hashfull(); }
+void minimax_GPTproposed::clearHash(){ impl->mptr->clearHash(); }
+bool minimax_GPTproposed::saveHash(const std::string &path) const { return impl->mptr->saveHash(path); }
+bool minimax_GPTproposed::loadHash(const std::string &path){ return impl->mptr->loadHash(path); }
 
 } // namespace agent
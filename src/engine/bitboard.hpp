@@ -0,0 +1,48 @@
+#pragma once
+#include <cstdint>
+#if defined(_MSC_VER)
+#include <intrin.h>
+#endif
+
+// 64칸 점유 상태를 비트 하나씩으로 표현하는 비트보드.
+// 칸 인덱스는 board[file][rank] 메모리 배치와 같게 file*8 + rank 를 사용한다.
+// 따라서 낮은 비트부터 순회하면 기존의 for(file) for(rank) 이중 루프와 같은 순서가 된다.
+using bitboard = uint64_t;
+
+namespace bb {
+
+constexpr int SQUARE_NB = 64;
+
+constexpr int squareOf(int file, int rank){ return file * 8 + rank; }
+constexpr int fileOf(int sq){ return sq >> 3; }
+constexpr int rankOf(int sq){ return sq & 7; }
+constexpr bitboard squareBit(int sq){ return 1ULL << sq; }
+constexpr bitboard squareBit(int file, int rank){ return 1ULL << squareOf(file, rank); }
+
+inline int popcount(bitboard b){
+#if defined(_MSC_VER)
+    return static_cast<int>(__popcnt64(b));
+#else
+    return __builtin_popcountll(b);
+#endif
+}
+
+// 가장 낮은 세트 비트의 인덱스 (b != 0 이어야 함)
+inline int lsb(bitboard b){
+#if defined(_MSC_VER)
+    unsigned long idx;
+    _BitScanForward64(&idx, b);
+    return static_cast<int>(idx);
+#else
+    return __builtin_ctzll(b);
+#endif
+}
+
+// 가장 낮은 세트 비트를 꺼내고 그 인덱스를 반환
+inline int popLsb(bitboard& b){
+    int sq = lsb(b);
+    b &= b - 1;
+    return sq;
+}
+
+} // namespace bb
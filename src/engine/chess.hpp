@@ -1,5 +1,6 @@
 #pragma once
 #include <enum.hpp>
+#include <bitboard.hpp>
 #include <iostream>
 #include <vector>
 #include <array>
@@ -8,9 +9,14 @@
 #include <string>
 #include <cctype>
 #include <stdexcept>
+#include <cstdint>
+#include <functional>
+#include <new>
+#include <type_traits>
 
 constexpr int BOARDSIZE = 8;
 constexpr int NUMBER_OF_PIECEKIND = 17;
+constexpr int ROYAL_DEATH_STUN = 3; //규칙 13: 로얄 피스가 잡히면 같은 색 모든 기물에 부여되는 스턴 스택
 
 // Forward declarations for spec registry (placed after moveChunk definition)
 
@@ -37,10 +43,10 @@ struct moveChunk{ //piece class의 부속 구조체로써만 동작해야 한다
         tT(t), origin_of_directions(origin_of_dirs), diraction(dirs), maxDistanse(maxDist) {}
 
         //getter
-        threatType getThreatType(){ return tT; }
-        std::pair<int, int> getOrigin(){ return origin_of_directions; }
-        std::vector<std::pair<int, int>> getDirs(){ return diraction; }
-        int getMaxDistanse(){ return maxDistanse; }
+        threatType getThreatType() const { return tT; }
+        const std::pair<int, int>& getOrigin() const { return origin_of_directions; }
+        const std::vector<std::pair<int, int>>& getDirs() const { return diraction; }
+        int getMaxDistanse() const { return maxDistanse; }
 };
 
 // Now that moveChunk is declared, declare spec registry accessors.
@@ -52,99 +58,98 @@ namespace specs {
 }
 
 
+// 기물 한 칸을 32비트 하나로 압축한다 (보드 64칸 = 256바이트, 캐시 라인 4개).
+//   bit 0..4   : pieceType + 1 (0 = NONE)
+//   bit 5..6   : colorType + 1 (0 = NONE)
+//   bit 7      : 로얄 여부
+//   bit 8..19  : 스턴 스택 (0..STACK_MAX, 넘치면 STACK_MAX에서 멈춤)
+//   bit 20..31 : 이동 스택 (0..STACK_MAX, 넘치면 STACK_MAX에서 멈춤)
+// 접근은 전부 getter/setter로만 하므로 바깥에서는 예전 구조체와 똑같이 쓸 수 있다.
 struct piece{
+    public:
+        static constexpr int STACK_MAX = (1 << 12) - 1;
     private:
-        colorType cT;
-        pieceType pT;
-        int stun_stack;
-        int move_stack;
+        static constexpr uint32_t TYPE_SHIFT = 0,  TYPE_MASK = 0x1Fu;
+        static constexpr uint32_t COLOR_SHIFT = 5, COLOR_MASK = 0x3u;
+        static constexpr uint32_t ROYAL_BIT = 1u << 7;
+        static constexpr uint32_t STUN_SHIFT = 8,  MOVE_SHIFT = 20, STACK_MASK = 0xFFFu;
 
-        // 인스턴스가 가지는 동적 상태
-        bool isRoyal;
+        uint32_t bits = 0;
+
+        uint32_t field(uint32_t shift, uint32_t mask) const { return (bits >> shift) & mask; }
+        void setField(uint32_t shift, uint32_t mask, uint32_t v){ bits = (bits & ~(mask << shift)) | ((v & mask) << shift); }
+        static uint32_t saturate(int v){ return static_cast<uint32_t>(v > STACK_MAX ? STACK_MAX : v); }
 
         void setupRoyal(); //pieceType에 따라 그에 맞는 설정값을 부여
         void setupStunStack();
     public:
-        piece(){
-            cT = colorType::NONE;
-            pT = pieceType::NONE;
-            stun_stack = 0;
-            move_stack = 0;
-            isRoyal = false;
-        }
-        piece(colorType c, pieceType p) : cT(c), pT(p) {
-            move_stack = 0;
+        piece() = default;
+        piece(colorType c, pieceType p) {
+            setColor(c);
+            setPieceType(p);
             setupStunStack();
             setupRoyal();
         }
-        piece(colorType c, pieceType p, int stun) : cT(c), pT(p), stun_stack(stun) {
-            move_stack = 0;
+        piece(colorType c, pieceType p, int stun) {
+            setColor(c);
+            setPieceType(p);
+            setStun(stun);
             setupStunStack();
             setupRoyal();
         }
-        piece(colorType c, pieceType p, int stun, int move) : cT(c), pT(p), stun_stack(stun), move_stack(move){
+        piece(colorType c, pieceType p, int stun, int move) {
+            setColor(c);
+            setPieceType(p);
+            setStun(stun);
+            setMove(move);
             setupRoyal();
         }
 
         void setupStunStackWithPosition(int file, int rank); //프로모션하는 기물을 위한 착수 위치를 고려한 스턴 스택 설정
 
         //getter
-        colorType getColor() const { return cT; }
-        pieceType getPieceType() const { return pT; }
-        int getStun() const { return stun_stack; }
-        int getMove() const { return move_stack; }
-        std::vector<moveChunk> getMoveChunk() const { return specs::moves(pT, cT); }
-        bool getIsRoyal() const { return isRoyal; }
-        bool getIsPromotable() const { return specs::isPromotable(pT); }
-        std::vector<pieceType> getPromotePool() const { return specs::promotePool(pT); }
-        std::vector<std::pair<int, int>> getPromotableSquare() const { return specs::promotableSquares(pT, cT); }
+        colorType getColor() const { return static_cast<colorType>(static_cast<int>(field(COLOR_SHIFT, COLOR_MASK)) - 1); }
+        pieceType getPieceType() const { return static_cast<pieceType>(static_cast<int>(field(TYPE_SHIFT, TYPE_MASK)) - 1); }
+        int getStun() const { return static_cast<int>(field(STUN_SHIFT, STACK_MASK)); }
+        int getMove() const { return static_cast<int>(field(MOVE_SHIFT, STACK_MASK)); }
+        const std::vector<moveChunk>& getMoveChunk() const { return specs::moves(getPieceType(), getColor()); }
+        bool getIsRoyal() const { return (bits & ROYAL_BIT) != 0; }
+        bool getIsPromotable() const { return specs::isPromotable(getPieceType()); }
+        const std::vector<pieceType>& getPromotePool() const { return specs::promotePool(getPieceType()); }
+        const std::vector<std::pair<int, int>>& getPromotableSquare() const { return specs::promotableSquares(getPieceType(), getColor()); }
 
         //setter
         void setStun(int s){
             if(s < 0) return;
-            stun_stack = s; 
+            setField(STUN_SHIFT, STACK_MASK, saturate(s));
         }
         void setMove(int m){
             if(m < 0) return;
-            move_stack = m; 
+            setField(MOVE_SHIFT, STACK_MASK, saturate(m));
         }
-        void setColor(colorType ct){ cT = ct; }
-        void setPieceType(pieceType pt){ pT = pt; }
-        void setRoyal(bool royalty){ isRoyal = royalty; }
+        void setColor(colorType ct){ setField(COLOR_SHIFT, COLOR_MASK, static_cast<uint32_t>(static_cast<int>(ct) + 1)); }
+        void setPieceType(pieceType pt){ setField(TYPE_SHIFT, TYPE_MASK, static_cast<uint32_t>(static_cast<int>(pt) + 1)); }
+        void setRoyal(bool royalty){ bits = royalty ? (bits | ROYAL_BIT) : (bits & ~ROYAL_BIT); }
 
         //스택 조작 핼퍼 함수
-        void addStun(int ds){ 
-            if(stun_stack + ds < 0) return;
-            stun_stack += ds; 
-        }
-        void addOneStun() { stun_stack += 1; }
-        void minusOneStun() { 
-            if(stun_stack-1 < 0) return;
-            stun_stack -= 1; 
-        }
+        void addStun(int ds){ setStun(getStun() + ds); }
+        void addOneStun() { addStun(1); }
+        void minusOneStun() { addStun(-1); }
 
-        void addMove(int dm){ 
-            if(move_stack+dm < 0) return;
-            move_stack += dm; 
-        }
-        void addOneMove() { move_stack += 1; }
-        void minusOneMove() { 
-            if(move_stack-1 < 0) return;
-            move_stack -= 1; 
-        }
+        void addMove(int dm){ setMove(getMove() + dm); }
+        void addOneMove() { addMove(1); }
+        void minusOneMove() { addMove(-1); }
 
         //기타 편의성 함수
-        bool isEmpty() const {
-            if(pT == pieceType::NONE) return true;
-            else return false;
-        }
+        bool isEmpty() const { return field(TYPE_SHIFT, TYPE_MASK) == 0; }
 
         void clear(){
-            cT = colorType::NONE;
-            pT = pieceType::NONE;
-            isRoyal = false;
+            setColor(colorType::NONE);
+            setPieceType(pieceType::NONE);
+            setRoyal(false);
         }
 };
+static_assert(sizeof(piece) == 4, "piece must stay packed into 32 bits");
 
 struct PGN{
     private:
@@ -180,7 +185,7 @@ struct PGN{
         }
 
         PGN(colorType ct, int fF, int fR, moveType mt) :
-        mT(mt), fromFile(fF), fromRank(fR), tT(threatType::NONE), toFile(0), toRank(0), cT(ct), pT(pieceType::NONE) { //계승 표현
+        mT(mt), fromFile(fF), fromRank(fR), tT(threatType::NONE), toFile(0), toRank(0), cT(ct), pT(pieceType::NONE) { //계승/스턴 표현
         }
 
         PGN(colorType ct, int fF, int fR, pieceType pt) :
@@ -213,15 +218,139 @@ struct PGN{
         colorType getColorType() const {return cT;}
 };
 
-// Lightweight full-board snapshot using now-slim piece
+// PGN을 32비트 정수 하나로 압축한 수 표현.
+// 수 생성기, 검색 내부(수 목록, PV, 킬러, TT)는 Move를 쓰고 PGN 변환은 API/파이썬 경계에서만 한다.
+// 비트 배치: [0,6) from 칸, [6,12) to 칸, [12,15) moveType+1, [15,18) threatType+1, [18,23) pieceType+1, [23,25) colorType+1
+// 모든 enum은 NONE=-1이므로 +1로 저장하고, 기본값 0은 PGN()과 같은 "수 없음"이 된다.
+struct Move{
+    private:
+        uint32_t data;
+
+        static constexpr uint32_t pack(int v, int shift){ return static_cast<uint32_t>(v) << shift; }
+        constexpr int field(int shift, uint32_t mask) const { return static_cast<int>((data >> shift) & mask); }
+    public:
+        constexpr Move() : data(0) {}
+
+        // from/to는 bb::squareOf 칸 인덱스. 착수/계승/위장/스턴 수는 to = 0
+        constexpr Move(colorType ct, moveType mt, threatType tt, pieceType pt, int from, int to) :
+        data(pack(from, 0) | pack(to, 6)
+            | pack(static_cast<int>(mt) + 1, 12)
+            | pack(static_cast<int>(tt) + 1, 15)
+            | pack(static_cast<int>(pt) + 1, 18)
+            | pack(static_cast<int>(ct) + 1, 23)) {}
+
+        // PGN의 칸 좌표는 보드 안이어야 한다 (착수/계승/위장은 to가 (0,0))
+        explicit Move(const PGN& pgn) :
+        Move(pgn.getColorType(), pgn.getMoveType(), pgn.getThreatType(), pgn.getPieceType(),
+             bb::squareOf(pgn.getFromSquare().first, pgn.getFromSquare().second),
+             bb::squareOf(pgn.getToSquare().first, pgn.getToSquare().second)) {}
+
+        PGN toPGN() const {
+            const int ff = bb::fileOf(getFrom()), fr = bb::rankOf(getFrom());
+            const int tf = bb::fileOf(getTo()), tr = bb::rankOf(getTo());
+            switch(getMoveType()){
+                case moveType::MOVE: return PGN(getColorType(), getThreatType(), ff, fr, tf, tr);
+                case moveType::PROMOTE: return PGN(getColorType(), getThreatType(), ff, fr, tf, tr, getPieceType());
+                case moveType::ADD: return PGN(getColorType(), ff, fr, getPieceType());
+                case moveType::SUCCESION: return PGN(getColorType(), ff, fr, moveType::SUCCESION);
+                case moveType::DISGUISE: return PGN(getColorType(), ff, fr, getPieceType(), moveType::DISGUISE);
+                case moveType::STUN: return PGN(getColorType(), ff, fr, moveType::STUN);
+                default: return PGN();
+            }
+        }
+
+        //getter
+        constexpr int getFrom() const { return field(0, 0x3F); }
+        constexpr int getTo() const { return field(6, 0x3F); }
+        std::pair<int, int> getFromSquare() const { return {bb::fileOf(getFrom()), bb::rankOf(getFrom())}; }
+        std::pair<int, int> getToSquare() const { return {bb::fileOf(getTo()), bb::rankOf(getTo())}; }
+        constexpr moveType getMoveType() const { return static_cast<moveType>(field(12, 0x7) - 1); }
+        constexpr threatType getThreatType() const { return static_cast<threatType>(field(15, 0x7) - 1); }
+        constexpr pieceType getPieceType() const { return static_cast<pieceType>(field(18, 0x1F) - 1); }
+        constexpr colorType getColorType() const { return static_cast<colorType>(field(23, 0x3) - 1); }
+        constexpr uint32_t raw() const { return data; }
+        static constexpr Move fromRaw(uint32_t bits){ Move m; m.data = bits; return m; } // raw()의 역 (TT 등 압축 저장용)
+        constexpr bool isNone() const { return getMoveType() == moveType::NONE; }
+
+        constexpr bool operator==(const Move& other) const { return data == other.data; }
+        constexpr bool operator!=(const Move& other) const { return data != other.data; }
+};
+
+static_assert(sizeof(Move) == sizeof(uint32_t), "Move must stay a single 32-bit word");
+
+namespace std {
+    template<> struct hash<Move> {
+        size_t operator()(const Move& m) const noexcept { return std::hash<uint32_t>()(m.raw()); }
+    };
+}
+
+// 정렬 점수를 함께 가진 수. 검색이 수 순서를 정할 때 score 내림차순으로 쓴다.
+struct ScoredMove{
+    Move move;
+    int64_t score;
+};
+
+// 고정 용량 수 목록. 저장 공간을 초기화하지 않으므로 스택/멤버로 만들어도 비용이 없고,
+// push는 힙 할당을 하지 않는다. 용량은 한 포지션에서 나올 수 있는 수(착수 17종 x 64칸 + 이동)를 넉넉히 덮는다.
+struct MoveList{
+    public:
+        static constexpr int CAPACITY = 2048;
+
+        MoveList() : count(0) {}
+        MoveList(const MoveList&) = delete;
+        MoveList& operator=(const MoveList&) = delete;
+
+        void push(Move m, int64_t score = 0){
+            if(count >= CAPACITY) return; // 용량을 넘는 수는 버린다 (실전 포지션에서는 도달하지 않음)
+            new (&items()[count]) ScoredMove{m, score};
+            ++count;
+        }
+        void clear(){ count = 0; }
+        void resize(int n){ if(n >= 0 && n < count) count = n; } // 줄이기만 한다
+        int size() const { return count; }
+        bool empty() const { return count == 0; }
+
+        ScoredMove& operator[](int i){ return items()[i]; }
+        const ScoredMove& operator[](int i) const { return items()[i]; }
+        ScoredMove* begin(){ return items(); }
+        ScoredMove* end(){ return items() + count; }
+        const ScoredMove* begin() const { return items(); }
+        const ScoredMove* end() const { return items() + count; }
+    private:
+        alignas(ScoredMove) unsigned char storage[CAPACITY * sizeof(ScoredMove)];
+        int count;
+
+        ScoredMove* items(){ return std::launder(reinterpret_cast<ScoredMove*>(storage)); }
+        const ScoredMove* items() const { return std::launder(reinterpret_cast<const ScoredMove*>(storage)); }
+};
+
+// 수 하나를 되돌리는 데 필요한 최소 정보.
+// 전체 보드를 복사하는 대신 바뀐 칸(최대 2칸)의 이전 기물(스택, 로얄 포함),
+// 바뀐 포켓 칸의 이전 값, 수를 두기 전의 차례만 기록한다.
+struct moveUndo{
+    int touched = 0;                        // 기록된 칸 수
+    std::array<int, 2> squares{};           // bb::squareOf 칸 인덱스
+    std::array<piece, 2> before{};          // 바뀌기 전 기물
+    colorType pocketColor = colorType::NONE; // 포켓이 바뀌었다면 그 색 (NONE이면 변화 없음)
+    pieceType pocketType = pieceType::NONE;
+    int pocketBefore = 0;
+    colorType turn = colorType::NONE;       // 수를 두기 전 차례
+    bitboard decayed = 0ULL;                // 턴 종료 처리로 스턴 -1/이동 +1 된 칸 (규칙 7, 9)
+    bitboard royalStunned = 0ULL;           // 로얄 피스가 잡혀 스턴 +3 된 칸 (규칙 13)
+};
+
+// 고정 크기 포지션 스냅샷. 힙 메모리를 가지지 않으므로 복사는 memcpy 한 번이다.
+// 수순 기록(log)은 chessboard가 따로 들고 있고, 스냅샷에는 지금까지 둔 수의 개수(ply)만 남긴다.
 struct position{
     std::array<std::array<piece, BOARDSIZE>, BOARDSIZE> board;
     std::array<int, NUMBER_OF_PIECEKIND> whitePocket;
     std::array<int, NUMBER_OF_PIECEKIND> blackPocket;
-    colorType turn_right;
-    std::vector<PGN> log;
-    bool is_custom;
+    colorType turn_right = colorType::WHITE;
+    uint64_t hash = 0ULL; // getPosition 시점의 getHash() 값. 복원할 때는 board로부터 다시 계산하므로 직접 고친 포지션도 안전하다
+    int ply = 0;          // 이 포지션까지 둔 수의 개수 (승리 판정, 초반 킹 착수 규칙에 사용)
+    bool is_custom = false;
 };
+static_assert(std::is_trivially_copyable<position>::value, "position must stay trivially copyable");
 
 class chessboard{
     private:
@@ -229,10 +358,37 @@ class chessboard{
         std::array<int, NUMBER_OF_PIECEKIND> whitePocket; //pieceType값을 인덱스로 사용함. 예시로 pieceType::KING == 0이니까 whitePocket[0] == 1이면 킹이 포켓에 1개 존재하는 거
         std::array<int, NUMBER_OF_PIECEKIND> blackPocket;
         colorType turn_right;
-        std::vector<PGN> log;
-        // position 기반 스냅샷 스택 (정확한 undo를 위해 사용)
-        std::vector<position> snapshots;
+        // 이 보드에서 둔 수의 기록. position 스냅샷에는 들어가지 않으며 base_ply가 그 이전 수의 개수를 대신한다.
+        std::vector<Move> log;
+        int base_ply = 0;
+        // 수마다 쌓이는 undo 기록 스택 (unmakeMove가 역순으로 되돌림)
+        std::vector<moveUndo> undo_stack;
         bool custom_position;
+
+        // 점유 비트보드: board 배열과 항상 같은 상태를 유지한다.
+        // colorBB[색] = 그 색 기물이 있는 칸, typeBB[기물종류] = 그 종류 기물(색 무관)이 있는 칸
+        std::array<bitboard, 2> colorBB{};
+        std::array<bitboard, NUMBER_OF_PIECEKIND> typeBB{};
+        // royalBB[색] = 그 색 로얄 기물이 있는 칸. 색별 기물 목록은 colorBB 비트 순회로 대신한다.
+        // 승리 판정은 64칸을 훑지 않고 royalBB가 비었는지만 본다.
+        std::array<bitboard, 2> royalBB{};
+
+        // Zobrist 해시: 칸(기물, 스택, 로얄), 포켓 개수, 차례를 모두 반영한다.
+        // 보드 조작 함수들이 바뀐 부분만 xor로 갱신하고, operator()로 참조가 나간 뒤에는
+        // 외부에서 스택이 바뀌었을 수 있으므로 다음 getHash() 때 전체를 다시 계산한다.
+        mutable uint64_t hash_key = 0ULL;
+        mutable bool hash_dirty = false;
+
+        static int colorIndex(colorType cT){ return (cT == colorType::WHITE) ? 0 : 1; }
+        void rebuildBitboards(); //board 배열로부터 비트보드와 해시를 다시 계산
+        uint64_t computeHash() const; //현재 상태 전체로부터 해시를 계산
+        void setSquare(int file, int rank, const piece& p); //칸 내용을 바꾸면서 비트보드와 해시도 함께 갱신
+        void changeStacks(int file, int rank, int d_stun, int d_move); //칸 기물의 스택을 더하면서 해시 갱신
+        void setPocket(colorType cT, pieceType pT, int count); //포켓 개수를 바꾸면서 해시 갱신
+        void setTurn(colorType cT); //차례를 바꾸면서 해시 갱신
+        void rememberSquare(moveUndo& undo, int file, int rank) const; //칸의 현재 기물을 undo 기록에 저장
+        void applyMove(Move mv, moveUndo& undo); //검증이 끝난 수를 보드에 적용하고 되돌릴 정보를 기록
+        void endTurn(colorType mover, moveUndo& undo); //규칙 7, 9: mover 기물 중 스턴이 있는 기물은 스턴 -1, 이동 +1
     public:
         chessboard() : turn_right(colorType::WHITE), custom_position(false) {
             whitePocket = {1, 1, 2, 2, 2, 8, //king queen bishop knight rook pwan
@@ -261,6 +417,7 @@ class chessboard{
                 0, //tempest rook
                 0  //samurai
             };
+            rebuildBitboards();
         }
 
         chessboard(position& pos){
@@ -269,7 +426,8 @@ class chessboard{
             blackPocket = pos.blackPocket;
             turn_right = pos.turn_right;
             custom_position = pos.is_custom;
-            log = pos.log;
+            base_ply = pos.ply;
+            rebuildBitboards();
         }
 
         chessboard(const position& pos){
@@ -278,10 +436,14 @@ class chessboard{
             blackPocket = pos.blackPocket;
             turn_right = pos.turn_right;
             custom_position = pos.is_custom;
-            log = pos.log;
+            base_ply = pos.ply;
+            rebuildBitboards();
         }
 
+        // 주의: 반환된 참조로 스택(stun/move)은 자유롭게 바꿔도 되지만,
+        // 기물 종류나 색, 로얄 여부를 바꾸면 비트보드와 어긋난다. 그런 변경은 보드 조작 함수를 사용할 것.
         piece& operator()(int file, int rank){
+            hash_dirty = true;
             return board[file][rank];
         }
 
@@ -289,6 +451,24 @@ class chessboard{
             return board[file][rank];
         }
 
+        //비트보드 접근자
+        bitboard getColorBitboard(colorType cT) const {
+            if(cT == colorType::NONE) return 0ULL;
+            return colorBB[colorIndex(cT)];
+        }
+        bitboard getTypeBitboard(pieceType pT) const {
+            if(pT == pieceType::NONE) return 0ULL;
+            return typeBB[static_cast<int>(pT)];
+        }
+        bitboard getPieceBitboard(colorType cT, pieceType pT) const { return getColorBitboard(cT) & getTypeBitboard(pT); }
+        bitboard getRoyalBitboard(colorType cT) const {
+            if(cT == colorType::NONE) return 0ULL;
+            return royalBB[colorIndex(cT)];
+        }
+        int getRoyalCount(colorType cT) const { return bb::popcount(getRoyalBitboard(cT)); }
+        bitboard getOccupancy() const { return colorBB[0] | colorBB[1]; }
+        bitboard getEmptySquares() const { return ~getOccupancy(); }
+
         //보드 조작 핼퍼 함수들
         bool isInBounds(int file, int rank) const; //보드 경계 체크
         void placePiece(colorType cT, pieceType pT, int file, int rank);
@@ -325,17 +505,58 @@ class chessboard{
                 1, //tempest rook
                 1  //samurai
             };
+            hash_dirty = true;
         }
         void setThisIsCustom(bool t){ custom_position = t; }
 
+        //수 생성기 (Move를 out 뒤에 덧붙이며 힙 할당을 하지 않는다). calcLegal* 함수들은 이 결과를 PGN으로 바꿔 돌려주는 API용 래퍼다.
+        void generateAll(colorType cT, MoveList& out) const; //착수 -> 이동 & 승격 -> 계승 -> 위장 순서로 전부
+        void generatePieceMoves(colorType cT, int file, int rank, bool calc_potential, MoveList& out) const; //이동 & 승격
+        void generatePlacements(colorType cT, MoveList& out) const; //착수
+        void generateSuccesions(colorType cT, MoveList& out) const; //계승 (로얄 피스가 체크된 경우에만)
+        void generateDisguises(colorType cT, MoveList& out) const; //위장
+        void generateStuns(colorType cT, MoveList& out) const; //스턴 (generateAll에는 포함되지 않음)
+
+        //공격 검사. attackersOf는 sq에 상대 기물이 있다고 보고 그것을 잡을 수 있는 by 색 기물의 칸을 돌려준다.
+        //calc_potential이 false면 지금 움직일 수 있는(스턴 0, 이동 스택 > 0) 기물만 센다.
+        bitboard attackersOf(int sq, colorType by, bool calc_potential = false) const;
+        //occupied에 없는 칸은 빈 칸으로 보고 검사한다. SEE에서 잡기에 쓴 기물을 치워 가며 뒤에 숨은 공격자(와 TAKEJUMP 발판 변화)를 드러낼 때 쓴다.
+        bitboard attackersOf(int sq, colorType by, bitboard occupied, bool calc_potential) const;
+        //그중 CATCH 광선으로 sq를 잡는(자기 칸에 그대로 남는) 기물만
+        bitboard catchersOf(int sq, colorType by, bitboard occupied, bool calc_potential = false) const;
+        bool isRoyalAttacked(colorType cT) const; //cT의 로얄 피스 중 하나라도 체크된 상태인지 (규칙 12, 계승 조건)
+        //수 목록 없이 세기. countMobility는 generatePieceMoves가 만들 수(이동 & 승격)의 개수,
+        //threatenedValue는 그 수 중 승격이 아닌 수가 도착하는 상대 기물의 values 합이다(스택 무시, 수마다 한 번씩 더한다).
+        int countMobility(int file, int rank, bool calc_potential) const;
+        int threatenedValue(int file, int rank, const std::array<int, NUMBER_OF_PIECEKIND>& values) const;
+        //둘을 한 번에 (평가 함수용). calc_potential이 false이고 움직일 수 없는 기물이면 위협도 0이다
+        int countMobility(int file, int rank, bool calc_potential, const std::array<int, NUMBER_OF_PIECEKIND>& values, int& threatened_value) const;
+
         std::vector<PGN> calcLegalMovesInOnePiece(colorType cT, int file, int rank, bool calc_potential); //포지션에 따라 특정 기물의 합법 수를 계산 (이동 & 승격 PGN반환)
         //calc_potential은 스택을 무시하고 이 기물이 잠재적으로 할 수 있는 행위를 계산하겠다는 뜻이다.
         std::vector<PGN> calcLegalPlacePiece(colorType cT);//특정 색상의 플레이어가 기물을 놓을 수 있는 착수 지점을 계산 (착수 PGN 반환)
-        std::vector<PGN> calcLegalSuccesion(colorType cT);//승격 가능한 상태인지, 그리고 어떤 기물을 승격시킬 수 있는지를 계산 (계승 PGN반환)
+        std::vector<PGN> calcLegalSuccesion(colorType cT);//로얄 피스가 체크된 상황이면 로얄로 만들 수 있는 아군 기물을 계산 (계승 PGN반환)
         std::vector<PGN> calcLegalDisguise(colorType cT);//로얄 피스 위장 (위장 PGN 반환)
+        std::vector<PGN> calcLegalStun(colorType cT);//보드 위 기물 중 스턴을 걸 수 있는 칸 (스턴 PGN 반환)
 
         //행마법에 따라 보드를 조작하는 함수
-        void updatePiece(PGN pgn); //기물의 threatType에 따라 보드 상태를 업데이트
+        //수 하나가 한 턴 전체를 처리한다: 행마 -> 잡기(규칙 11, 잡힌 기물은 잡은 쪽 포켓 +1) -> 이동 스택 -1(규칙 8)
+        //-> 로얄이 잡혔다면 그 색 전체 스턴 +3(규칙 13) -> 턴 종료(규칙 7, 9: 둔 쪽 기물 스턴 -1, 이동 +1) -> 차례 넘김
+        void updatePiece(PGN pgn); //기물의 threatType에 따라 보드 상태를 업데이트 (makeMove와 같음)
+        void makeMove(const PGN& pgn); //isLegal로 검사한 뒤 doMove로 적용한다. 불법이면 예외
+        void doMove(Move mv); //검증 없이 수를 적용하고 undo 기록을 쌓는다 (방금 생성한 수만 넘길 것)
+        void doMove(const PGN& pgn) { doMove(Move(pgn)); }
+        void unmakeMove(); //마지막 makeMove/doMove를 되돌린다
+        //마지막 doMove의 undo 기록 (없으면 nullptr). 바뀐 칸(touched, decayed, royalStunned)과 포켓 변화를 알려 주므로
+        //평가 누산기처럼 수마다 바뀐 부분만 다시 계산하는 쪽에서 쓴다.
+        const moveUndo* lastUndo() const { return undo_stack.empty() ? nullptr : &undo_stack.back(); }
+        bool isLegal(Move mv) const; //수 목록을 만들지 않고 현재 포지션에서 이 수가 합법인지 검사
+        bool isLegal(const PGN& pgn) const; //PGN 좌표가 보드 밖이면 false, 아니면 Move로 바꿔 검사
+
+        //perft: 현재 차례부터 depth 수 동안 가능한 수순(리프)의 개수. 승패와 상관없이 수 생성기만 센다.
+        //include_stuns면 스턴 수도 포함, threads > 1이면 루트 수를 여러 스레드에 나눠 센다. 보드는 호출 전 상태로 돌아온다.
+        uint64_t perft(int depth, bool include_stuns = false, int threads = 1);
+        std::vector<std::pair<PGN, uint64_t>> perftDivide(int depth, bool include_stuns = false, int threads = 1); //루트 수별 노드 수
 
         //디버그/테스트 함수들
         void displayBoard() const; //보드 상태 출력
@@ -350,18 +571,15 @@ class chessboard{
 		const std::array<int, NUMBER_OF_PIECEKIND>& getWhitePocket() const { return whitePocket; }
 		const std::array<int, NUMBER_OF_PIECEKIND>& getBlackPocket() const { return blackPocket; }
         colorType getTurn() const { return turn_right; }
-        void swapTurn() { turn_right = (turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE; }
+        void swapTurn() { setTurn((turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE); }
 
         void controllPocketValue(colorType cT, pieceType pT, int amount) {
-            if(cT == colorType::WHITE){
-                int idx = static_cast<int>(pT);
-                whitePocket[idx] = amount;
-            }else{
-                int idx = static_cast<int>(pT);
-                blackPocket[idx] = amount;
-            }
+            setPocket((cT == colorType::WHITE) ? colorType::WHITE : colorType::BLACK, pT, amount);
         }
 
+        // 현재 포지션의 Zobrist 해시. 같은 포지션(스택, 로얄, 포켓, 차례까지 같음)이면 같은 값.
+        uint64_t getHash() const;
+
         // Snapshot and restore helpers
         position getPosition() const {
             position pos;
@@ -369,7 +587,8 @@ class chessboard{
             pos.whitePocket = whitePocket;
             pos.blackPocket = blackPocket;
             pos.turn_right = turn_right;
-            pos.log = log; 
+            pos.hash = getHash();
+            pos.ply = getPly();
             pos.is_custom = custom_position;
             return pos;
         }
@@ -380,18 +599,27 @@ class chessboard{
             board = pos.board;
             whitePocket = pos.whitePocket;
             blackPocket = pos.blackPocket;
-            log = pos.log; 
             turn_right = pos.turn_right;
             custom_position = pos.is_custom;
+            log.clear(); // 수순 기록과 undo 기록은 다른 포지션의 것이므로 더 이상 유효하지 않음
+            base_ply = pos.ply;
+            undo_stack.clear();
+            rebuildBitboards();
         }
 
         // 빠른 검사: 로그 크기(cheap)
-        std::vector<PGN> getLog() const {return log;}
-        int getLogSize() const { return static_cast<int>(log.size()); }
+        std::vector<PGN> getLog() const {
+            std::vector<PGN> result;
+            result.reserve(log.size());
+            for(const auto& mv : log) result.push_back(mv.toPGN());
+            return result;
+        }
+        int getLogSize() const { return static_cast<int>(log.size()); } //이 보드에서 기록된 수의 개수
+        int getPly() const { return base_ply + getLogSize(); } //스냅샷 이전까지 포함해 지금까지 둔 수의 개수
 
-        // undo using position snapshots
+        // undo the last move (unmakeMove와 같음)
         void undoBoard();
 
-        //승리판정함수.
-        victoryType getWhoIsVictory();
+        //승리판정함수. 한쪽만 로얄이 남으면 그쪽 승리, 양쪽 다 없으면 DRAW, 둔 수가 2수 미만이면 NONE.
+        victoryType getWhoIsVictory() const;
 };
@@ -140,13 +140,13 @@ void chessboard::displayPieceInfo(int file, int rank) const {
         std::cout << "  로얄 피스: " << (p.getIsRoyal() ? "예" : "아니오") << std::endl;
         std::cout << "  프로모션 가능: " << (p.getIsPromotable() ? "예" : "아니오") << std::endl;
         
-        auto moveChunks = p.getMoveChunk();
+        const auto& moveChunks = p.getMoveChunk();
         std::cout << "  행마 청크 개수: " << moveChunks.size() << std::endl;
         
         for(size_t i = 0; i < moveChunks.size(); i++) {
             std::cout << "    청크 #" << (i + 1) << ":" << std::endl;
             std::cout << "      최대 거리: " << moveChunks[i].getMaxDistanse() << std::endl;
-            auto dirs = moveChunks[i].getDirs();
+            const auto& dirs = moveChunks[i].getDirs();
             std::cout << "      방향 개수: " << dirs.size() << std::endl;
         }
     }
@@ -55,7 +55,8 @@ enum class moveType{
     ADD,
     SUCCESION,
     PROMOTE,
-    DISGUISE
+    DISGUISE,
+    STUN //규칙 10: 보드 위 아무 기물에 스턴 스택 +1, 턴 종료
 };
 
 enum class victoryType{
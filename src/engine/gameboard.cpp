@@ -1,10 +1,98 @@
 #include "chess.hpp"
+#include "piece_spec.hpp"
+#include "zobrist.hpp"
 
 bool chessboard::isInBounds(int file, int rank) const
 {
     return (file >= 0 && file < BOARDSIZE && rank >= 0 && rank < BOARDSIZE);
 }
 
+void chessboard::rebuildBitboards()
+{
+    colorBB.fill(0ULL);
+    typeBB.fill(0ULL);
+    royalBB.fill(0ULL);
+    for(int file = 0; file < BOARDSIZE; ++file){
+        for(int rank = 0; rank < BOARDSIZE; ++rank){
+            const piece& p = board[file][rank];
+            if(p.isEmpty()) continue;
+            bitboard bit = bb::squareBit(file, rank);
+            colorBB[colorIndex(p.getColor())] |= bit;
+            typeBB[static_cast<int>(p.getPieceType())] |= bit;
+            if(p.getIsRoyal()) royalBB[colorIndex(p.getColor())] |= bit;
+        }
+    }
+    hash_key = computeHash();
+    hash_dirty = false;
+}
+
+uint64_t chessboard::computeHash() const
+{
+    uint64_t h = zobrist::side(turn_right);
+    for(int file = 0; file < BOARDSIZE; ++file){
+        for(int rank = 0; rank < BOARDSIZE; ++rank){
+            h ^= zobrist::square(bb::squareOf(file, rank), board[file][rank]);
+        }
+    }
+    for(int i = 0; i < NUMBER_OF_PIECEKIND; ++i){
+        h ^= zobrist::pocket(colorType::WHITE, static_cast<pieceType>(i), whitePocket[i]);
+        h ^= zobrist::pocket(colorType::BLACK, static_cast<pieceType>(i), blackPocket[i]);
+    }
+    return h;
+}
+
+uint64_t chessboard::getHash() const
+{
+    if(hash_dirty){
+        hash_key = computeHash();
+        hash_dirty = false;
+    }
+    return hash_key;
+}
+
+void chessboard::setSquare(int file, int rank, const piece& p)
+{
+    bitboard bit = bb::squareBit(file, rank);
+    const piece& old = board[file][rank];
+    const int sq = bb::squareOf(file, rank);
+    hash_key ^= zobrist::square(sq, old) ^ zobrist::square(sq, p);
+    if(!old.isEmpty()){
+        colorBB[colorIndex(old.getColor())] &= ~bit;
+        typeBB[static_cast<int>(old.getPieceType())] &= ~bit;
+        royalBB[colorIndex(old.getColor())] &= ~bit;
+    }
+
+    board[file][rank] = p;
+
+    if(!p.isEmpty()){
+        colorBB[colorIndex(p.getColor())] |= bit;
+        typeBB[static_cast<int>(p.getPieceType())] |= bit;
+        if(p.getIsRoyal()) royalBB[colorIndex(p.getColor())] |= bit;
+    }
+}
+
+void chessboard::changeStacks(int file, int rank, int d_stun, int d_move)
+{
+    piece p = board[file][rank];
+    p.addStun(d_stun);
+    p.addMove(d_move);
+    setSquare(file, rank, p);
+}
+
+void chessboard::setPocket(colorType cT, pieceType pT, int count)
+{
+    auto& pocket = (cT == colorType::WHITE) ? whitePocket : blackPocket;
+    const int idx = static_cast<int>(pT);
+    hash_key ^= zobrist::pocket(cT, pT, pocket[idx]) ^ zobrist::pocket(cT, pT, count);
+    pocket[idx] = count;
+}
+
+void chessboard::setTurn(colorType cT)
+{
+    hash_key ^= zobrist::side(turn_right) ^ zobrist::side(cT);
+    turn_right = cT;
+}
+
 void chessboard::placePiece(colorType cT, pieceType pT, int file, int rank)
 {
     if(board[file][rank].isEmpty() == false){
@@ -27,10 +115,11 @@ void chessboard::placePiece(colorType cT, pieceType pT, int file, int rank)
                 }
             }
 
-            whitePocket[static_cast<int>(pT)] -= 1;
-            board[file][rank] = piece(cT, pT);
+            setPocket(cT, pT, whitePocket[static_cast<int>(pT)] - 1);
+            piece placed(cT, pT);
             // 착수 위치를 고려한 스턴 스택 설정 (폰 등 프로모션 가능 기물)
-            board[file][rank].setupStunStackWithPosition(file, rank);
+            placed.setupStunStackWithPosition(file, rank);
+            setSquare(file, rank, placed);
         }
     }else{ //colorType::BLACK
         if(blackPocket[static_cast<int>(pT)] <= 0){
@@ -47,10 +136,11 @@ void chessboard::placePiece(colorType cT, pieceType pT, int file, int rank)
                 }
             }
 
-            blackPocket[static_cast<int>(pT)] -= 1;
-            board[file][rank] = piece(cT, pT);
+            setPocket(cT, pT, blackPocket[static_cast<int>(pT)] - 1);
+            piece placed(cT, pT);
             // 착수 위치를 고려한 스턴 스택 설정 (폰 등 프로모션 가능 기물)
-            board[file][rank].setupStunStackWithPosition(file, rank);
+            placed.setupStunStackWithPosition(file, rank);
+            setSquare(file, rank, placed);
         }
     }
 }
@@ -62,25 +152,30 @@ void chessboard::movePiece(int start_file, int start_rank, int end_file, int end
         return;
     }
 
-    board[end_file][end_rank] = board[start_file][start_rank];
-    board[start_file][start_rank].clear();
+    piece mover = board[start_file][start_rank];
+    setSquare(start_file, start_rank, piece());
+    setSquare(end_file, end_rank, mover);
 }
 
 void chessboard::removePiece(int file, int rank)
 {
-    board[file][rank].clear();
+    setSquare(file, rank, piece());
 }
 
 void chessboard::succesionPiece(int file, int rank)
 {
-    board[file][rank].setRoyal(true);
+    piece heir = board[file][rank];
+    heir.setRoyal(true);
+    setSquare(file, rank, heir);
 }
 
 void chessboard::disguisePiece(int file, int rank, pieceType targetType)
 {
-    board[file][rank].setPieceType(targetType);
+    piece disguised = board[file][rank];
+    disguised.setPieceType(targetType);
     // 위장 후에도 로얄 속성은 유지되어야 함
-    board[file][rank].setRoyal(true);
+    disguised.setRoyal(true);
+    setSquare(file, rank, disguised);
 }
 
 void chessboard::shiftPiece(int p1_file, int p1_rank, int p2_file, int p2_rank)
@@ -97,8 +192,8 @@ void chessboard::shiftPiece(int p1_file, int p1_rank, int p2_file, int p2_rank)
     piece buffur;
 
     buffur = board[p2_file][p2_rank];
-    board[p2_file][p2_rank] = board[p1_file][p1_rank];
-    board[p1_file][p1_rank] = buffur;
+    setSquare(p2_file, p2_rank, board[p1_file][p1_rank]);
+    setSquare(p1_file, p1_rank, buffur);
 }
 
 void chessboard::promotePiece(colorType cT, int file, int rank, pieceType promote)
@@ -110,449 +205,679 @@ void chessboard::promotePiece(colorType cT, int file, int rank, pieceType promot
 
     for(auto& promotable_square : board[file][rank].getPromotableSquare()){
         if(promotable_square.first == file && promotable_square.second == rank){
-            board[file][rank] = piece(cT, promote);
+            setSquare(file, rank, piece(cT, promote));
         }
     }
 }
 
-std::vector<PGN> chessboard::calcLegalMovesInOnePiece(colorType cT, int file, int rank, bool calc_potential)
+// 컴파일된 광선 하나를 threatType 규칙대로 따라가며 도착 가능한 칸을 visit(칸 인덱스)에 넘긴다.
+// 수 생성(calcLegalMovesInOnePiece)과 합법성 검사(isLegal)가 같은 규칙을 공유한다.
+template<typename Visit>
+static void scanRay(const specs::CompiledRay& ray, bitboard own, bitboard occupied, Visit&& visit)
 {
-    std::vector<PGN> result;
-    result.clear();
+    switch (ray.tT){
+        case threatType::CATCH:
+            for(int i = 0; i < ray.scan; i++){
+                const bitboard next_square = bb::squareBit(ray.sq[i]);
+                if(!(occupied & next_square)) continue; //칸이 비어있다면
+                if(own & next_square) break; //칸에 아군이 있다면
+                visit(ray.sq[i]); // 칸에 적 기물이 있다면
+                break;
+            }
+            break;
+        case threatType::TAKEMOVE:
+            for(int i = 0; i < ray.scan; i++){
+                const bitboard next_square = bb::squareBit(ray.sq[i]);
+                if(!(occupied & next_square)){
+                    visit(ray.sq[i]); //칸이 비어있다면
+                    continue;
+                }
+                if(own & next_square) break; //칸에 아군이 있다면
+                visit(ray.sq[i]); // 칸에 적 기물이 있다면
+                break;
+            }
+            break;
+        case threatType::MOVE:
+            for(int i = 0; i < ray.scan; i++){
+                const bitboard next_square = bb::squareBit(ray.sq[i]);
+                if(occupied & next_square) break; //칸에 기물이 있다면
+                visit(ray.sq[i]); //칸이 비어있다면
+            }
+            break;
+        case threatType::SHIFT:
+            for(int i = 0; i < ray.scan; i++){
+                const bitboard next_square = bb::squareBit(ray.sq[i]);
+                if(!(occupied & next_square)) continue; //칸이 비어있다면
+                visit(ray.sq[i]); //칸에 아군이나 적이 있다면
+                break;
+            }
+            break;
+        case threatType::TAKE:
+            for(int i = 0; i < ray.scan; i++){
+                const bitboard next_square = bb::squareBit(ray.sq[i]);
+                if(own & next_square) break; //칸에 아군이 있다면
+                if(!(occupied & next_square)) continue; //칸이 비어있다면
+                visit(ray.sq[i]); // 칸에 적 기물이 있다면
+                break;
+            }
+            break;
+        case threatType::TAKEJUMP:
+            for(int i = 0; i < ray.scan; i++){
+                if(!(occupied & bb::squareBit(ray.sq[i]))) continue; //칸이 비어있다면
+
+                //칸이 비어있지 않는다면(기물이 존재한다면) 그 다음 칸에 착지한다
+                if(i + 1 >= ray.len) break; //뛰어넘을 칸이 보드 경계를 벗어났다면
+                const int final_destination = ray.sq[i + 1];
+                if(!(own & bb::squareBit(final_destination))){ //뛰어넘을 칸이 비어있거나 적이 있다면
+                    visit(final_destination);
+                }
+                break;
+            }
+            break;
+        default:
+            break;
+    }
+}
+
+bitboard chessboard::attackersOf(int sq, colorType by, bool calc_potential) const
+{
+    return attackersOf(sq, by, getOccupancy(), calc_potential);
+}
+
+// 잡기 광선 중 wanted(ray.tT)가 참인 것만으로 sq를 잡을 수 있는 by 색 기물을 찾는다.
+template<typename Wanted>
+static bitboard attackersMasked(const chessboard& b, int sq, colorType by, bitboard occupied, bool calc_potential, Wanted&& wanted)
+{
+    if(by != colorType::WHITE && by != colorType::BLACK) return 0ULL;
+
+    // sq에 상대 기물이 서 있다고 보고 검사한다 (빈 칸이어도 잡기 광선이 멈추도록)
+    const bitboard target = bb::squareBit(sq);
+    const bitboard own = b.getColorBitboard(by) & occupied & ~target;
+    occupied |= target;
+
+    bitboard attackers = 0ULL;
+    for(int idx = 0; idx < NUMBER_OF_PIECEKIND; ++idx){
+        const pieceType pT = static_cast<pieceType>(idx);
+        const specs::CompiledSpec& spec = specs::compiled(pT, by);
+        // 역방향 표로 sq에 닿을 수 있는 출발 칸만 남긴 뒤, 실제 광선으로 막힘 여부를 확인한다
+        bitboard candidates = own & b.getTypeBitboard(pT) & spec.attackFrom[sq];
+        while(candidates){
+            const int from = bb::popLsb(candidates);
+            const piece& p = b.at(bb::fileOf(from), bb::rankOf(from));
+            if(!calc_potential && (p.getStun() > 0 || p.getMove() == 0)) continue;
+
+            bool hit = false;
+            for(int ri = spec.rayBegin[from]; ri < spec.rayBegin[from + 1] && !hit; ++ri){
+                const specs::CompiledRay& ray = spec.rays[ri];
+                if(ray.tT == threatType::MOVE || ray.tT == threatType::SHIFT) continue; //잡기가 아닌 행마
+                if(!wanted(ray.tT)) continue;
+                scanRay(ray, own, occupied, [&](int to){ if(to == sq) hit = true; });
+            }
+            if(hit) attackers |= bb::squareBit(from);
+        }
+    }
+    return attackers;
+}
 
+bitboard chessboard::attackersOf(int sq, colorType by, bitboard occupied, bool calc_potential) const
+{
+    return attackersMasked(*this, sq, by, occupied, calc_potential, [](threatType){ return true; });
+}
+
+bitboard chessboard::catchersOf(int sq, colorType by, bitboard occupied, bool calc_potential) const
+{
+    return attackersMasked(*this, sq, by, occupied, calc_potential, [](threatType tT){ return tT == threatType::CATCH; });
+}
+
+bool chessboard::isRoyalAttacked(colorType cT) const
+{
+    if(cT != colorType::WHITE && cT != colorType::BLACK) return false;
+    const colorType enemy = (cT == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+    bitboard royals = royalBB[colorIndex(cT)];
+    while(royals){
+        if(attackersOf(bb::popLsb(royals), enemy) != 0ULL) return true;
+    }
+    return false;
+}
+
+void chessboard::generatePieceMoves(colorType cT, int file, int rank, bool calc_potential, MoveList& out) const
+{
     if(board[file][rank].isEmpty()){
         //std::cout << "there has no pieces." << std::endl;
-        return std::vector<PGN>();
+        return;
     }
 
-    auto current_piece = board[file][rank];
-    auto pieceColor = current_piece.getColor();
+    const piece& current_piece = board[file][rank];
 
     if(!calc_potential && current_piece.getStun() > 0){
         //std::cout << "that piece is stunned." << std::endl;
-        return std::vector<PGN>();
+        return;
     }
 
     if(!calc_potential && current_piece.getMove() == 0){
         //std::cout << "that piece has no move stack." << std::endl;
-        return std::vector<PGN>();
+        return;
     }
 
     if(current_piece.getColor() != cT){
-        return std::vector<PGN>();
+        return;
     }
 
-    for(auto& mC : current_piece.getMoveChunk()){
-        auto origin = mC.getOrigin();
-        auto dirs = mC.getDirs();
-        int maxDist = mC.getMaxDistanse();
-        auto threat_type = mC.getThreatType();
+    // 칸 검사는 board 배열의 기물 복사 대신 비트보드 비트 검사로 한다.
+    const bitboard own = colorBB[colorIndex(current_piece.getColor())];
+    const bitboard occupied = getOccupancy();
+
+    // 행마는 시작 시 컴파일된 칸별 광선 테이블을 그대로 따라간다.
+    // 광선에는 원점 오프셋, 보드 경계, 최대 거리가 이미 반영되어 있다.
+    const specs::CompiledSpec& spec = specs::compiled(current_piece.getPieceType(), current_piece.getColor());
+    const int from = bb::squareOf(file, rank);
+    const int first = out.size();
+
+    for(int ri = spec.rayBegin[from]; ri < spec.rayBegin[from + 1]; ++ri){
+        const specs::CompiledRay& ray = spec.rays[ri];
+        scanRay(ray, own, occupied, [&](int to){
+            out.push(Move(cT, moveType::MOVE, ray.tT, pieceType::NONE, from, to));
+        });
+    }
 
-        int origin_file = file+origin.first;
-        int origin_rank = rank+origin.second; 
+    if(spec.promotableMask != 0ULL){
+        // 프로모션 칸에 도착하는 수는 승격 풀의 각 기물로 바꿔서 이 기물의 수 목록 뒤에 붙인다.
+        std::array<Move, bb::SQUARE_NB> promote_from;
+        int promote_count = 0;
+        int kept = first;
+        for(int i = first; i < out.size(); i++){
+            if(spec.promotableMask & bb::squareBit(out[i].move.getTo())){
+                if(promote_count < bb::SQUARE_NB) promote_from[promote_count++] = out[i].move;
+            }else{
+                out[kept++] = out[i];
+            }
+        }
+        out.resize(kept);
 
-        switch (threat_type){
-            case threatType::CATCH:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.isEmpty()) continue; //칸이 비어있다면
-                        if(next_square.getColor() == current_piece.getColor()) break; //칸에 아군이 있다면
-                        if(next_square.getColor() != current_piece.getColor()) {
-                            result.push_back(PGN(cT, threatType::CATCH, file, rank, next_square_file, next_square_rank)); // 칸에 적 기물이 있다면
-                            break;
-                        }
-                    }
-                }
-                break;
-            case threatType::TAKEMOVE:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.isEmpty()){
-                            result.push_back(PGN(cT, threatType::TAKEMOVE, file, rank, next_square_file, next_square_rank)); //칸이 비어있다면
-                            continue;
-                        }
-                        if(next_square.getColor() == current_piece.getColor()) break; //칸에 아군이 있다면
-                        if(next_square.getColor() != current_piece.getColor()) {
-                            result.push_back(PGN(cT, threatType::TAKEMOVE, file, rank, next_square_file, next_square_rank)); // 칸에 적 기물이 있다면
-                            break;
-                        }
-                    }
-                }
-                break;
-            case threatType::MOVE:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.getColor() == current_piece.getColor()) break; //칸에 아군이 있다면
-                        if(next_square.isEmpty()){
-                            result.push_back(PGN(cT, threatType::MOVE, file, rank, next_square_file, next_square_rank)); //칸이 비어있다면
-                            continue;
-                        }
-                        if(next_square.getColor() != current_piece.getColor()) {
-                            break; // 칸에 적 기물이 있다면
-                        }
-                    }
-                }
-                break;
-            case threatType::SHIFT:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.getColor() == current_piece.getColor()) {
-                            result.push_back(PGN(cT, threatType::SHIFT, file, rank, next_square_file, next_square_rank));//칸에 아군이 있다면
-                            break;
-                        }
-                        if(next_square.isEmpty()){
-                            continue; //칸이 비어있다면
-                        }
-                        if(next_square.getColor() != current_piece.getColor()) {
-                            result.push_back(PGN(cT, threatType::SHIFT, file, rank, next_square_file, next_square_rank));// 칸에 적 기물이 있다면
-                            break;
-                        }
-                    }
-                }
-                break;
-            case threatType::TAKE:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.getColor() == current_piece.getColor()) {
-                            break;//칸에 아군이 있다면
-                        }
-                        if(next_square.isEmpty()){
-                            continue; //칸이 비어있다면
-                        }
-                        if(next_square.getColor() != current_piece.getColor()) {// 칸에 적 기물이 있다면
-                            result.push_back(PGN(cT, threatType::TAKE, file, rank, next_square_file, next_square_rank));
-                            break;
-                        }
-                    }
-                }
-                break;
-            case threatType::TAKEJUMP:
-                for(auto& dir : dirs){
-                    for(int i = 1; i <= maxDist; i++){
-                        int next_square_file = origin_file+(dir.first*i);
-                        int next_square_rank = origin_rank+(dir.second*i);
-
-                        if(isInBounds(next_square_file, next_square_rank) == false) break; //이 칸이 보드 경계를 벗어났다면
-
-                        piece next_square = board[next_square_file][next_square_rank];
-                        if(next_square.isEmpty()){ //칸이 비어있다면
-                            continue;
-                        }
-                        else{ //칸이 비어있지 않는다면(기물이 존재한다면)
-                            int final_destination_file = origin_file+(dir.first*(i+1));
-                            int final_destination_rank = origin_rank+(dir.second*(i+1));
-
-                            if(isInBounds(final_destination_file, final_destination_rank) == false) break; //뛰어넘을 칸이 보드 경계를 벗어났다면
-
-                            piece final_destination = board[final_destination_file][final_destination_rank];
-                            if(final_destination.isEmpty()){ //뛰어넘을 칸이 비어있다면
-                                result.push_back(PGN(cT, threatType::TAKEJUMP, file, rank, final_destination_file, final_destination_rank)); 
-                                break;
-                            }else if(final_destination.getColor() == current_piece.getColor()){ //뛰어넘을 칸에 아군이 있다면
-                                break;
-                            }else{ //뛰어넘을 칸에 적이 있다면
-                                result.push_back(PGN(cT, threatType::TAKEJUMP, file, rank, final_destination_file, final_destination_rank)); 
-                                break;
-                            }
-                        }
-                    }
-                }
-                break;
-            default:
-                break;
+        const auto& promotable_pieces = current_piece.getPromotePool();
+        for(int i = 0; i < promote_count; i++){
+            for(auto& promotable_piece : promotable_pieces){
+                out.push(Move(cT, moveType::PROMOTE, promote_from[i].getThreatType(), promotable_piece, from, promote_from[i].getTo()));
+            }
         }
     }
+}
 
-    if(current_piece.getIsPromotable()){ 
-        //일단 당장은 잘 작동할 거다. 애초에 프로모션 가능한 기물들은 약한 기물들 뿐이라 PGN이 그렇게 많지도 않을 거라서 성능 악화는 없을 것이다. 근데 그런 게 생겨버리면 그건 이제 그때 가서 생각하자.
-        std::vector<PGN> promote;
-        auto promotable_square = current_piece.getPromotableSquare();
-        auto promotable_pieces = current_piece.getPromotePool();
-        for(int i=0; i<result.size(); i++){
-            for(auto& p_sq : promotable_square){
-                if(result[i].getToSquare() == p_sq){
-                    for(auto& promotable_piece : promotable_pieces){
-                        promote.push_back(PGN(cT, result[i].getThreatType(), file, rank, result[i].getToSquare().first, result[i].getToSquare().second, promotable_piece));
-                    }
-                    result[i] = PGN();
-                }
-            }
+// 기물 하나의 이동 & 승격 도착 칸을 수 목록 없이 visit(도착 칸, 승격 칸인지)로 넘긴다.
+// generatePieceMoves와 같은 광선, 같은 스택 조건을 쓴다. 기물이 없거나(스택 조건으로) 움직일 수 없으면 false.
+template<typename Visit>
+static bool scanPieceTargets(const chessboard& b, int file, int rank, bool calc_potential, Visit&& visit)
+{
+    const piece& current_piece = b.at(file, rank);
+    if(current_piece.isEmpty()) return false;
+    if(!calc_potential && (current_piece.getStun() > 0 || current_piece.getMove() == 0)) return false;
+
+    const bitboard own = b.getColorBitboard(current_piece.getColor());
+    const bitboard occupied = b.getOccupancy();
+    const specs::CompiledSpec& spec = specs::compiled(current_piece.getPieceType(), current_piece.getColor());
+    const int from = bb::squareOf(file, rank);
+    for(int ri = spec.rayBegin[from]; ri < spec.rayBegin[from + 1]; ++ri){
+        scanRay(spec.rays[ri], own, occupied, [&](int to){
+            visit(to, (spec.promotableMask & bb::squareBit(to)) != 0ULL);
+        });
+    }
+    return true;
+}
+
+int chessboard::countMobility(int file, int rank, bool calc_potential) const
+{
+    int moves = 0;
+    int promotions = 0;
+    const bool movable = scanPieceTargets(*this, file, rank, calc_potential, [&](int, bool promoting){
+        if(promoting) ++promotions;
+        else ++moves;
+    });
+    if(!movable) return 0;
+    // 승격 칸에 도착하는 수는 승격 풀의 기물 수만큼 PROMOTE 수가 된다
+    if(promotions) moves += promotions * static_cast<int>(board[file][rank].getPromotePool().size());
+    return moves;
+}
+
+int chessboard::countMobility(int file, int rank, bool calc_potential, const std::array<int, NUMBER_OF_PIECEKIND>& values, int& threatened_value) const
+{
+    threatened_value = 0;
+    const piece& current_piece = board[file][rank];
+    if(current_piece.isEmpty()) return 0;
+    const bitboard enemies = getColorBitboard((current_piece.getColor() == colorType::WHITE) ? colorType::BLACK : colorType::WHITE);
+
+    int moves = 0;
+    int promotions = 0;
+    const bool movable = scanPieceTargets(*this, file, rank, calc_potential, [&](int to, bool promoting){
+        if(promoting){
+            ++promotions;
+            return;
         }
+        ++moves;
+        if(enemies & bb::squareBit(to)) threatened_value += values[static_cast<int>(board[bb::fileOf(to)][bb::rankOf(to)].getPieceType())];
+    });
+    if(!movable) return 0;
+    if(promotions) moves += promotions * static_cast<int>(current_piece.getPromotePool().size());
+    return moves;
+}
+
+int chessboard::threatenedValue(int file, int rank, const std::array<int, NUMBER_OF_PIECEKIND>& values) const
+{
+    const piece& current_piece = board[file][rank];
+    if(current_piece.isEmpty()) return 0;
+    const colorType enemy = (current_piece.getColor() == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+    const bitboard enemies = getColorBitboard(enemy);
+    // 광선이 닿는 칸 어디에도 상대 기물이 없으면 따라갈 필요가 없다
+    if(!(specs::compiled(current_piece.getPieceType(), current_piece.getColor()).reach[bb::squareOf(file, rank)] & enemies)) return 0;
+
+    int total = 0;
+    scanPieceTargets(*this, file, rank, true, [&](int to, bool promoting){
+        if(promoting || !(enemies & bb::squareBit(to))) return;
+        total += values[static_cast<int>(board[bb::fileOf(to)][bb::rankOf(to)].getPieceType())];
+    });
+    return total;
+}
+
+void chessboard::generatePlacements(colorType cT, MoveList& out) const
+{
+    if(cT != colorType::WHITE && cT != colorType::BLACK) return;
+
+    const bitboard empty = getEmptySquares(); // 빈 칸에만 착수 가능
+    const auto& pocket = (cT == colorType::WHITE) ? whitePocket : blackPocket;
+
+    for(int idx = 0; idx < NUMBER_OF_PIECEKIND; ++idx){
+        if(pocket[idx] <= 0) continue; // 해당 기물이 포켓에 없음
 
-        result.erase(std::remove(result.begin(), result.end(), PGN()), result.end());
+        pieceType pT = static_cast<pieceType>(idx);
 
-        result.insert(result.end(), promote.begin(), promote.end());
+        // 프로모션 가능 기물은 프로모션 칸에 직접 착수할 수 없음
+        bitboard targets = empty & ~specs::compiled(pT, cT).promotableMask;
+
+        while(targets){
+            int sq = bb::popLsb(targets);
+            out.push(Move(cT, moveType::ADD, threatType::NONE, pT, sq, 0));
+        }
     }
+}
 
-    return result;
+void chessboard::generateSuccesions(colorType cT, MoveList& out) const
+{
+    if(!isRoyalAttacked(cT)) return; // 규칙 12: 로얄 피스가 체크된 상황에서만 계승 가능
+    bitboard mine = getColorBitboard(cT) & ~getRoyalBitboard(cT); // 이미 로얄인 경우 제외
+    while(mine){
+        int sq = bb::popLsb(mine);
+        out.push(Move(cT, moveType::SUCCESION, threatType::NONE, pieceType::NONE, sq, 0));
+    }
 }
 
-std::vector<PGN> chessboard::calcLegalPlacePiece(colorType cT)
+void chessboard::generateDisguises(colorType cT, MoveList& out) const
 {
-    std::vector<PGN> result;
+    const bitboard own = getColorBitboard(cT);
+
+    // 로얄 피스가 선택 가능한 위장 후보 생성 (후보 = 보드에 존재하는 자신의 기물 종류)
+    bitboard royals = getRoyalBitboard(cT);
+    while(royals){
+        int sq = bb::popLsb(royals);
+        const piece& pc = board[bb::fileOf(sq)][bb::rankOf(sq)];
 
-    auto collectPlacements = [&](colorType color, const std::array<int, NUMBER_OF_PIECEKIND>& pocket){
         for(int idx = 0; idx < NUMBER_OF_PIECEKIND; ++idx){
-            if(pocket[idx] <= 0) continue; // 해당 기물이 포켓에 없음
-
-            pieceType pT = static_cast<pieceType>(idx);
-            piece candidate(color, pT);
-
-            for(int file = 0; file < BOARDSIZE; ++file){
-                for(int rank = 0; rank < BOARDSIZE; ++rank){
-                    if(!board[file][rank].isEmpty()) continue; // 빈 칸에만 착수 가능
-
-                    // 프로모션 가능 기물은 프로모션 칸에 직접 착수할 수 없음
-                    if(candidate.getIsPromotable()){
-                        bool on_promotable_square = false;
-                        for(const auto& promotable_sq : candidate.getPromotableSquare()){
-                            if(promotable_sq.first == file && promotable_sq.second == rank){
-                                on_promotable_square = true;
-                                break;
-                            }
-                        }
-                        if(on_promotable_square) continue;
-                    }
+            if((typeBB[idx] & own) == 0ULL) continue;
 
-                    result.push_back(PGN(color, file, rank, pT));
-                }
-            }
+            pieceType target = static_cast<pieceType>(idx);
+            if(target == pc.getPieceType()) continue;
+
+            out.push(Move(cT, moveType::DISGUISE, threatType::NONE, target, sq, 0));
         }
-    };
+    }
+}
+
+void chessboard::generateStuns(colorType cT, MoveList& out) const
+{
+    bitboard occupied = getOccupancy();
+    while(occupied){
+        int sq = bb::popLsb(occupied);
+        out.push(Move(cT, moveType::STUN, threatType::NONE, pieceType::NONE, sq, 0));
+    }
+}
 
-    if(cT == colorType::WHITE) collectPlacements(colorType::WHITE, whitePocket);
-    else if(cT == colorType::BLACK) collectPlacements(colorType::BLACK, blackPocket);
-    else return std::vector<PGN>();
+void chessboard::generateAll(colorType cT, MoveList& out) const
+{
+    generatePlacements(cT, out);
 
-    return result;
+    // cT 소유 기물이 있는 칸에서만 이동 & 승격을 생성 (비트보드 순회)
+    bitboard mine = getColorBitboard(cT);
+    while(mine){
+        int sq = bb::popLsb(mine);
+        generatePieceMoves(cT, bb::fileOf(sq), bb::rankOf(sq), false, out);
+    }
+
+    generateSuccesions(cT, out);
+    generateDisguises(cT, out);
 }
 
-std::vector<PGN> chessboard::calcLegalSuccesion(colorType cT)
+// Move 목록을 API용 PGN 목록으로 변환
+static std::vector<PGN> toPGNList(const MoveList& moves)
 {
     std::vector<PGN> result;
+    result.reserve(moves.size());
+    for(const auto& sm : moves) result.push_back(sm.move.toPGN());
+    return result;
+}
 
-    for(int file = 0; file < BOARDSIZE; ++file){
-        for(int rank = 0; rank < BOARDSIZE; ++rank){
-            const piece& target = board[file][rank];
-            if(target.isEmpty()) continue;
-            if(target.getIsRoyal()) continue; // 이미 로얄인 경우 제외
-            if(target.getColor() != cT) continue;
+std::vector<PGN> chessboard::calcLegalMovesInOnePiece(colorType cT, int file, int rank, bool calc_potential)
+{
+    MoveList moves;
+    generatePieceMoves(cT, file, rank, calc_potential, moves);
+    return toPGNList(moves);
+}
 
-            result.push_back(PGN(cT, file, rank, moveType::SUCCESION));
-        }
-    }
+std::vector<PGN> chessboard::calcLegalPlacePiece(colorType cT)
+{
+    MoveList moves;
+    generatePlacements(cT, moves);
+    return toPGNList(moves);
+}
 
-    return result;
+std::vector<PGN> chessboard::calcLegalSuccesion(colorType cT)
+{
+    MoveList moves;
+    generateSuccesions(cT, moves);
+    return toPGNList(moves);
 }
 
 std::vector<PGN> chessboard::calcLegalDisguise(colorType cT)
 {
-    std::vector<PGN> result;
-    std::array<bool, NUMBER_OF_PIECEKIND> ownTypes{};
+    MoveList moves;
+    generateDisguises(cT, moves);
+    return toPGNList(moves);
+}
 
-    // 보드에 존재하는 자신의 기물 종류 수집
-    for(int file = 0; file < BOARDSIZE; ++file){
-        for(int rank = 0; rank < BOARDSIZE; ++rank){
-            const piece& pc = board[file][rank];
-            if(pc.isEmpty()) continue;
-            if(pc.getColor() != cT) continue;
+std::vector<PGN> chessboard::calcLegalStun(colorType cT)
+{
+    MoveList moves;
+    generateStuns(cT, moves);
+    return toPGNList(moves);
+}
 
-            int idx = static_cast<int>(pc.getPieceType());
-            if(idx >= 0 && idx < NUMBER_OF_PIECEKIND){
-                ownTypes[idx] = true;
-            }
-        }
-    }
+void chessboard::updatePiece(PGN pgn)
+{
+    makeMove(pgn);
+}
 
-    // 로얄 피스가 선택 가능한 위장 후보 생성
-    for(int file = 0; file < BOARDSIZE; ++file){
-        for(int rank = 0; rank < BOARDSIZE; ++rank){
-            const piece& pc = board[file][rank];
-            if(pc.isEmpty()) continue;
-            if(pc.getColor() != cT) continue;
-            if(!pc.getIsRoyal()) continue;
+void chessboard::makeMove(const PGN& pgn)
+{
+    if(!isLegal(pgn)) throw std::runtime_error("illegal pgn");
+    doMove(Move(pgn));
+}
+
+void chessboard::doMove(Move mv)
+{
+    moveUndo undo;
+    applyMove(mv, undo);
+    undo_stack.push_back(undo);
+}
+
+bool chessboard::isLegal(const PGN& pgn) const
+{
+    // Move는 보드 안의 칸만 담을 수 있으므로 좌표를 먼저 확인한다
+    const auto fromSquare = pgn.getFromSquare();
+    const auto toSquare = pgn.getToSquare();
+    if(!isInBounds(fromSquare.first, fromSquare.second)) return false;
+    if(!isInBounds(toSquare.first, toSquare.second)) return false;
+    return isLegal(Move(pgn));
+}
 
-            for(int idx = 0; idx < NUMBER_OF_PIECEKIND; ++idx){
-                if(!ownTypes[idx]) continue;
+bool chessboard::isLegal(Move mv) const
+{
+    const moveType mT = mv.getMoveType();
+    const colorType cT = mv.getColorType();
+    const auto fromSquare = mv.getFromSquare();
+    const pieceType pT = mv.getPieceType();
 
-                pieceType target = static_cast<pieceType>(idx);
-                if(target == pieceType::NONE) continue;
-                if(target == pc.getPieceType()) continue;
+    // 생성기가 만드는 수는 항상 현재 차례의 색을 가진다
+    if(cT != turn_right || cT == colorType::NONE) return false;
 
-                result.push_back(PGN(cT, file, rank, target, moveType::DISGUISE));
-            }
+    const bitboard own = getColorBitboard(cT);
+    const piece& p = board[fromSquare.first][fromSquare.second];
+
+    if(mT == moveType::MOVE || mT == moveType::PROMOTE){
+        if(p.isEmpty() || p.getColor() != cT) return false;
+        if(p.getStun() > 0 || p.getMove() == 0) return false;
+
+        const specs::CompiledSpec& spec = specs::compiled(p.getPieceType(), cT);
+        const int to = mv.getTo();
+
+        // 프로모션 칸에 도착하는 수는 반드시 승격 풀 중 하나로 승격해야 한다
+        if(spec.promotableMask & bb::squareBit(to)){
+            if(mT != moveType::PROMOTE) return false;
+            const auto& pool = p.getPromotePool();
+            if(std::find(pool.begin(), pool.end(), pT) == pool.end()) return false;
+        }else{
+            if(mT != moveType::MOVE || pT != pieceType::NONE) return false;
         }
+
+        // 해당 threatType의 광선 중 하나가 도착 칸에 닿아야 한다
+        const int from = mv.getFrom();
+        if(!(spec.reach[from] & bb::squareBit(to))) return false;
+        const bitboard occupied = getOccupancy();
+        bool reached = false;
+        for(int ri = spec.rayBegin[from]; ri < spec.rayBegin[from + 1] && !reached; ++ri){
+            const specs::CompiledRay& ray = spec.rays[ri];
+            if(ray.tT != mv.getThreatType()) continue;
+            scanRay(ray, own, occupied, [&](int sq){ if(sq == to) reached = true; });
+        }
+        return reached;
     }
 
-    return result;
+    // 착수/계승/위장/스턴 수는 이동 관련 필드가 기본값이어야 한다
+    if(mv.getThreatType() != threatType::NONE || mv.getTo() != 0) return false;
+
+    if(mT == moveType::STUN){
+        return pT == pieceType::NONE && !p.isEmpty(); // 색과 상관없이 보드 위 아무 기물
+    }
+
+    if(mT == moveType::ADD){
+        if(pT == pieceType::NONE) return false;
+        const auto& pocket = (cT == colorType::WHITE) ? whitePocket : blackPocket;
+        if(pocket[static_cast<int>(pT)] <= 0) return false;
+        const bitboard target = bb::squareBit(fromSquare.first, fromSquare.second);
+        if(getOccupancy() & target) return false;
+        return !(specs::compiled(pT, cT).promotableMask & target);
+    }
+    if(mT == moveType::SUCCESION){
+        return pT == pieceType::NONE && !p.isEmpty() && p.getColor() == cT && !p.getIsRoyal() && isRoyalAttacked(cT);
+    }
+    if(mT == moveType::DISGUISE){
+        if(p.isEmpty() || p.getColor() != cT || !p.getIsRoyal()) return false;
+        if(pT == pieceType::NONE || pT == p.getPieceType()) return false;
+        return (typeBB[static_cast<int>(pT)] & own) != 0ULL;
+    }
+    return false;
 }
 
-void chessboard::updatePiece(PGN pgn)
+void chessboard::rememberSquare(moveUndo& undo, int file, int rank) const
 {
-    auto mT = pgn.getMoveType();
-    bool isLegal = false;
-    auto fromSquare = pgn.getFromSquare();
-    auto toSquare = pgn.getToSquare();
-    threatType tT = pgn.getThreatType();
-    auto pT = pgn.getPieceType();
-    auto cT = pgn.getColorType();
-
-    std::vector<PGN> legal_move;
-    if(mT == moveType::MOVE || mT == moveType::PROMOTE) legal_move = calcLegalMovesInOnePiece(turn_right, fromSquare.first, fromSquare.second, false);
-    else if(mT == moveType::ADD) legal_move = calcLegalPlacePiece(turn_right);
-    else if(mT == moveType::SUCCESION) legal_move = calcLegalSuccesion(turn_right);
-    else if(mT == moveType::DISGUISE) legal_move = calcLegalDisguise(turn_right);
-
-    if(legal_move.empty()){
-        return;
+    const int sq = bb::squareOf(file, rank);
+    for(int i = 0; i < undo.touched; ++i){
+        if(undo.squares[i] == sq) return; // 이미 수 적용 전 상태가 기록됨
     }
+    undo.squares[undo.touched] = sq;
+    undo.before[undo.touched] = board[file][rank];
+    undo.touched++;
+}
 
-    for(auto& move : legal_move){
-        if(pgn == move) {
-            isLegal = true;
-            break;
-        }
-    }
+void chessboard::applyMove(Move mv, moveUndo& undo)
+{
+    auto mT = mv.getMoveType();
+    auto fromSquare = mv.getFromSquare();
+    auto toSquare = mv.getToSquare();
+    threatType tT = mv.getThreatType();
+    auto pT = mv.getPieceType();
+    auto cT = mv.getColorType();
+
+    undo.turn = turn_right;
 
-    if(!isLegal) throw std::runtime_error("illegal pgn");
+    if(mT == moveType::MOVE || mT == moveType::PROMOTE){
+        const piece mover = board[fromSquare.first][fromSquare.second];
+        cT = mover.getColor();
 
-    // 스냅샷 저장 (undo를 위해 현재 상태를 position으로 저장)
-    snapshots.push_back(getPosition());
+        // 잡히는 기물 (SHIFT는 자리만 바꾸므로 잡기가 아님)
+        const piece target = board[toSquare.first][toSquare.second];
+        const bool capture = tT != threatType::SHIFT && !target.isEmpty() && target.getColor() != cT;
 
-    if(mT == moveType::MOVE){
         switch (tT)
         {
             case threatType::MOVE:
             case threatType::TAKEMOVE:
             case threatType::TAKEJUMP:
             case threatType::TAKE:
+                rememberSquare(undo, fromSquare.first, fromSquare.second);
+                rememberSquare(undo, toSquare.first, toSquare.second);
                 movePiece(fromSquare.first, fromSquare.second, toSquare.first, toSquare.second);
                 break;
             case threatType::CATCH:
+                rememberSquare(undo, fromSquare.first, fromSquare.second); // 잡은 기물의 스택이 바뀐다
+                rememberSquare(undo, toSquare.first, toSquare.second);
                 removePiece(toSquare.first, toSquare.second);
                 break;
             case threatType::SHIFT:
+                rememberSquare(undo, fromSquare.first, fromSquare.second);
+                rememberSquare(undo, toSquare.first, toSquare.second);
                 shiftPiece(fromSquare.first, fromSquare.second, toSquare.first, toSquare.second);
                 break;
             default:
                 break;
         }
+        if(mT == moveType::PROMOTE){
+            rememberSquare(undo, toSquare.first, toSquare.second);
+            promotePiece(cT, toSquare.first, toSquare.second, pT);
+            // 승격해도 폰이 가지고 있던 스택은 그대로 유지된다
+            piece promoted = board[toSquare.first][toSquare.second];
+            promoted.setStun(mover.getStun());
+            promoted.setMove(mover.getMove());
+            setSquare(toSquare.first, toSquare.second, promoted);
+        }
+
+        // CATCH는 제자리에서 잡으므로 잡은 기물은 출발 칸에 남는다
+        const auto actorSquare = (tT == threatType::CATCH) ? fromSquare : toSquare;
+
+        if(capture){
+            // 규칙 11: 잡힌 기물의 모든 스택을 잡은 기물에 전가, 잡힌 기물은 잡은 쪽 포켓으로
+            changeStacks(actorSquare.first, actorSquare.second, target.getStun(), target.getMove());
+
+            const auto& pocket = (cT == colorType::WHITE) ? whitePocket : blackPocket;
+            const int idx = static_cast<int>(target.getPieceType());
+            undo.pocketColor = cT;
+            undo.pocketType = target.getPieceType();
+            undo.pocketBefore = pocket[idx];
+            setPocket(cT, target.getPieceType(), pocket[idx] + 1);
+        }
+
+        // 규칙 8: 움직인 기물의 이동 스택 -1
+        changeStacks(actorSquare.first, actorSquare.second, 0, -1);
+
+        // 규칙 13: 로얄 피스가 잡히면 그 색의 모든 기물에 스턴 +3
+        if(capture && target.getIsRoyal()){
+            bitboard victims = getColorBitboard(target.getColor());
+            undo.royalStunned = victims;
+            while(victims){
+                int sq = bb::popLsb(victims);
+                changeStacks(bb::fileOf(sq), bb::rankOf(sq), ROYAL_DEATH_STUN, 0);
+            }
+        }
     }else if(mT == moveType::ADD){
+        undo.pocketColor = cT;
+        undo.pocketType = pT;
+        undo.pocketBefore = (cT == colorType::WHITE) ? whitePocket[static_cast<int>(pT)] : blackPocket[static_cast<int>(pT)];
+        rememberSquare(undo, fromSquare.first, fromSquare.second);
         placePiece(cT, pT, fromSquare.first, fromSquare.second);
     }else if(mT == moveType::SUCCESION){
+        rememberSquare(undo, fromSquare.first, fromSquare.second);
         succesionPiece(fromSquare.first, fromSquare.second);
     }else if(mT == moveType::DISGUISE){
+        rememberSquare(undo, fromSquare.first, fromSquare.second);
         disguisePiece(fromSquare.first, fromSquare.second, pT);
-    }else if(mT == moveType::PROMOTE){
-        cT = board[fromSquare.first][fromSquare.second].getColor();
-        switch (tT)
-        {
-            case threatType::MOVE:
-            case threatType::TAKEMOVE:
-            case threatType::TAKEJUMP:
-            case threatType::TAKE:
-                movePiece(fromSquare.first, fromSquare.second, toSquare.first, toSquare.second);
-                break;
-            case threatType::CATCH:
-                removePiece(toSquare.first, toSquare.second);
-                break;
-            case threatType::SHIFT:
-                shiftPiece(fromSquare.first, fromSquare.second, toSquare.first, toSquare.second);
-                break;
-            default:
-                break;
-        }
-        promotePiece(cT, toSquare.first, toSquare.second, pT);
+    }else if(mT == moveType::STUN){
+        // 규칙 10: 보드 위 아무 기물에 스턴 +1, 대신 턴 종료
+        rememberSquare(undo, fromSquare.first, fromSquare.second);
+        changeStacks(fromSquare.first, fromSquare.second, 1, 0);
     }
 
-    log.push_back(pgn);
+    endTurn(cT, undo);
+
+    log.push_back(mv);
     // advance turn after a successful move
-    turn_right = (turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+    setTurn((turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE);
 }
 
-void chessboard::pieceStackControllByColor(colorType cT, int d_stun, int d_move)
+void chessboard::endTurn(colorType mover, moveUndo& undo)
 {
-    for(int i=0; i<8; i++){
-        for(int j=0; j<8; j++){
-            if(board[i][j].getColor() == cT){
-                board[i][j].addStun(d_stun);
-                board[i][j].addMove(d_move);
-            }
-        }
+    bitboard mine = getColorBitboard(mover);
+    while(mine){
+        int sq = bb::popLsb(mine);
+        if(board[bb::fileOf(sq)][bb::rankOf(sq)].getStun() <= 0) continue;
+        changeStacks(bb::fileOf(sq), bb::rankOf(sq), -1, 1);
+        undo.decayed |= bb::squareBit(sq);
     }
 }
 
-void chessboard::undoBoard(){
-    if(snapshots.empty()){
-        // fallback: if no snapshot, fallback to popping last log entry
+void chessboard::unmakeMove()
+{
+    if(undo_stack.empty()){
+        // fallback: if no undo record, fallback to popping last log entry
         if(!log.empty()) log.pop_back();
         // also flip turn since we popped a move
-        turn_right = (turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE;
+        setTurn((turn_right == colorType::WHITE) ? colorType::BLACK : colorType::WHITE);
         return;
     }
 
-    position prev = snapshots.back();
-    snapshots.pop_back();
+    const moveUndo& undo = undo_stack.back();
 
-    // restore full position
-    setPosition(prev);
+    // 스택 일괄 변화를 적용의 역순으로 되돌린다 (턴 종료 -> 로얄 사망 스턴)
+    bitboard decayed = undo.decayed;
+    while(decayed){
+        int sq = bb::popLsb(decayed);
+        changeStacks(bb::fileOf(sq), bb::rankOf(sq), 1, -1);
+    }
+    bitboard stunned = undo.royalStunned;
+    while(stunned){
+        int sq = bb::popLsb(stunned);
+        changeStacks(bb::fileOf(sq), bb::rankOf(sq), -ROYAL_DEATH_STUN, 0);
+    }
+
+    // 기록의 역순으로 칸을 되돌린다
+    for(int i = undo.touched - 1; i >= 0; --i){
+        setSquare(bb::fileOf(undo.squares[i]), bb::rankOf(undo.squares[i]), undo.before[i]);
+    }
+    if(undo.pocketColor != colorType::NONE) setPocket(undo.pocketColor, undo.pocketType, undo.pocketBefore);
+
+    setTurn(undo.turn);
+    if(!log.empty()) log.pop_back();
+
+    undo_stack.pop_back();
 }
 
-victoryType chessboard::getWhoIsVictory()
+void chessboard::pieceStackControllByColor(colorType cT, int d_stun, int d_move)
 {
-    bool white_royal;
-    bool black_royal;
+    bitboard mine = getColorBitboard(cT);
+    while(mine){
+        int sq = bb::popLsb(mine);
+        changeStacks(bb::fileOf(sq), bb::rankOf(sq), d_stun, d_move);
+    }
+}
+
+void chessboard::undoBoard(){
+    unmakeMove();
+}
 
-    if(log.size() < 2) return victoryType::NONE;
+victoryType chessboard::getWhoIsVictory() const
+{
+    if(getPly() < 2) return victoryType::NONE;
 
-    for(int i=0; i<BOARDSIZE; i++){
-        for(int j=0; j<BOARDSIZE; j++){
-            if(board[i][j].isEmpty()) continue;
-            if(board[i][j].getIsRoyal()){
-                if(board[i][j].getColor() == colorType::WHITE){
-                    white_royal = true;
-                }else{
-                    black_royal = true;
-                }
-            }
-        }
-    }
+    const bool white_royal = royalBB[colorIndex(colorType::WHITE)] != 0ULL;
+    const bool black_royal = royalBB[colorIndex(colorType::BLACK)] != 0ULL;
 
-    if(white_royal && black_royal){
-        return victoryType::NONE;
-    }else if(white_royal && black_royal == false){
-        return victoryType::WHITE;
-    }else if(white_royal == false && black_royal){
-        return victoryType::BLACK;
-    }
+    if(white_royal && black_royal) return victoryType::NONE;
+    if(white_royal) return victoryType::WHITE;
+    if(black_royal) return victoryType::BLACK;
+    return victoryType::DRAW; // 양쪽 모두 로얄이 없음
 }
@@ -0,0 +1,170 @@
+#include "perft.hpp"
+#include <atomic>
+#include <memory>
+#include <thread>
+
+namespace {
+
+// 한 수순에서 가능한 수 전부: generateAll(착수, 이동 & 승격, 계승, 위장) + 선택적으로 스턴
+void generateForPerft(const chessboard& b, bool include_stuns, MoveList& out)
+{
+    out.clear();
+    b.generateAll(b.getTurn(), out);
+    if(include_stuns) b.generateStuns(b.getTurn(), out);
+}
+
+// lists[0]을 이 깊이에서, lists[1..]을 더 깊은 곳에서 쓴다. 마지막 깊이는 수를 두지 않고 개수만 센다(bulk counting).
+uint64_t perftRecursive(chessboard& b, int depth, bool include_stuns, MoveList* lists)
+{
+    MoveList& moves = lists[0];
+    generateForPerft(b, include_stuns, moves);
+    if(depth == 1) return static_cast<uint64_t>(moves.size());
+
+    uint64_t nodes = 0;
+    for(const auto& sm : moves){
+        b.doMove(sm.move);
+        nodes += perftRecursive(b, depth - 1, include_stuns, lists + 1);
+        b.unmakeMove();
+    }
+    return nodes;
+}
+
+uint64_t perftChild(chessboard& b, Move mv, int depth, bool include_stuns, MoveList* lists)
+{
+    if(depth <= 1) return 1;
+    b.doMove(mv);
+    uint64_t nodes = perftRecursive(b, depth - 1, include_stuns, lists);
+    b.unmakeMove();
+    return nodes;
+}
+
+// 루트 수마다 노드 수를 센다. threads > 1이면 워커마다 보드를 복사해 루트 수를 나눠 가진다.
+std::vector<uint64_t> divideCounts(const chessboard& root, const MoveList& roots, int depth, bool include_stuns, int threads)
+{
+    std::vector<uint64_t> counts(static_cast<size_t>(roots.size()), 0);
+    const int workers = std::max(1, std::min(threads, roots.size()));
+    std::atomic<int> next{0};
+
+    auto work = [&](){
+        chessboard b = root;
+        std::unique_ptr<MoveList[]> lists(new MoveList[std::max(1, depth)]);
+        for(int i = next++; i < roots.size(); i = next++){
+            counts[static_cast<size_t>(i)] = perftChild(b, roots[i].move, depth, include_stuns, lists.get());
+        }
+    };
+
+    if(workers == 1){
+        work();
+        return counts;
+    }
+    std::vector<std::thread> pool;
+    pool.reserve(static_cast<size_t>(workers));
+    for(int t = 0; t < workers; ++t) pool.emplace_back(work);
+    for(auto& th : pool) th.join();
+    return counts;
+}
+
+position buildPosition(const std::function<void(chessboard&)>& setup)
+{
+    chessboard b;
+    setup(b);
+    return b.getPosition();
+}
+
+// 보드 위 모든 기물의 스택을 같은 값으로 맞춘다 (착수 직후의 스턴 때문에 아무것도 못 움직이는 것을 피함)
+void setAllStacks(chessboard& b, int stun, int move)
+{
+    for(int file = 0; file < BOARDSIZE; ++file){
+        for(int rank = 0; rank < BOARDSIZE; ++rank){
+            if(b.at(file, rank).isEmpty()) continue;
+            b(file, rank).setStun(stun);
+            b(file, rank).setMove(move);
+        }
+    }
+}
+
+} // namespace
+
+uint64_t chessboard::perft(int depth, bool include_stuns, int threads)
+{
+    if(depth <= 0) return 1;
+    if(threads > 1){
+        uint64_t nodes = 0;
+        for(const auto& entry : perftDivide(depth, include_stuns, threads)) nodes += entry.second;
+        return nodes;
+    }
+    std::unique_ptr<MoveList[]> lists(new MoveList[depth]);
+    return perftRecursive(*this, depth, include_stuns, lists.get());
+}
+
+std::vector<std::pair<PGN, uint64_t>> chessboard::perftDivide(int depth, bool include_stuns, int threads)
+{
+    std::vector<std::pair<PGN, uint64_t>> result;
+    if(depth <= 0) return result;
+
+    MoveList roots;
+    generateForPerft(*this, include_stuns, roots);
+    const std::vector<uint64_t> counts = divideCounts(*this, roots, depth, include_stuns, threads);
+
+    result.reserve(static_cast<size_t>(roots.size()));
+    for(int i = 0; i < roots.size(); ++i) result.emplace_back(roots[i].move.toPGN(), counts[static_cast<size_t>(i)]);
+    return result;
+}
+
+namespace perft {
+
+const std::vector<referencePosition>& referencePositions()
+{
+    static const std::vector<referencePosition> positions = {
+        {"start", "빈 보드, 기본 포켓(K Q B B N N R R P x8), 백 차례",
+            buildPosition([](chessboard&){})},
+        {"variant", "빈 보드, 기본 포켓 + 변형 기물 11종 각 1개, 백 차례",
+            buildPosition([](chessboard& b){ b.setVarientPiece(); })},
+        {"kings", "기본 포켓에서 백 킹 e1, 흑 킹 e8을 착수한 뒤, 백 차례",
+            buildPosition([](chessboard& b){
+                b.updatePiece(PGN(colorType::WHITE, 4, 0, pieceType::KING));
+                b.updatePiece(PGN(colorType::BLACK, 4, 7, pieceType::KING));
+            })},
+        {"standard", "표준 체스 배치, 모든 기물 스턴 0 / 이동 3, 포켓 비어 있음, 백 차례",
+            buildPosition([](chessboard& b){
+                const pieceType back[BOARDSIZE] = {
+                    pieceType::ROOK, pieceType::KNIGHT, pieceType::BISHOP, pieceType::QUEEN,
+                    pieceType::KING, pieceType::BISHOP, pieceType::KNIGHT, pieceType::ROOK
+                };
+                for(int f = 0; f < BOARDSIZE; ++f){
+                    b.placePiece(colorType::WHITE, back[f], f, 0);
+                    b.placePiece(colorType::WHITE, pieceType::PWAN, f, 1);
+                    b.placePiece(colorType::BLACK, back[f], f, 7);
+                    b.placePiece(colorType::BLACK, pieceType::PWAN, f, 6);
+                }
+                setAllStacks(b, 0, 3);
+            })},
+        {"tactics", "사무라이(CATCH/SHIFT), 그래스호퍼(TAKEJUMP), 템페스트룩, 승격 직전 폰이 있는 변형 포지션, 백 차례",
+            buildPosition([](chessboard& b){
+                b.setVarientPiece();
+                b.placePiece(colorType::WHITE, pieceType::KING, 4, 0);
+                b.placePiece(colorType::WHITE, pieceType::SAMURAI, 3, 3);
+                b.placePiece(colorType::WHITE, pieceType::GRASSHOPPER, 0, 0);
+                b.placePiece(colorType::WHITE, pieceType::TEMPESTROOK, 7, 0);
+                b.placePiece(colorType::WHITE, pieceType::PWAN, 6, 6);
+                b.placePiece(colorType::BLACK, pieceType::KING, 4, 7);
+                b.placePiece(colorType::BLACK, pieceType::KNIGHT, 3, 4);
+                b.placePiece(colorType::BLACK, pieceType::PWAN, 2, 4);
+                b.placePiece(colorType::BLACK, pieceType::ROOK, 0, 4);
+                b.placePiece(colorType::BLACK, pieceType::QUEEN, 7, 7);
+                setAllStacks(b, 0, 2);
+                b(0, 4).setStun(1); // 스턴이 남은 기물도 하나 둔다 (흑 룩 a5)
+            })},
+    };
+    return positions;
+}
+
+const referencePosition* findPosition(const std::string& name)
+{
+    for(const auto& rp : referencePositions()){
+        if(rp.name == name) return &rp;
+    }
+    return nullptr;
+}
+
+} // namespace perft
@@ -0,0 +1,19 @@
+#pragma once
+#include <string>
+#include <vector>
+#include "chess.hpp"
+
+// perft 기준 포지션 모음. chess_perft CLI, test_perft, docs/perft.md가 같은 이름으로 같은 포지션을 가리킨다.
+// 수 생성기를 바꿀 때 이 포지션들의 노드 수가 그대로인지 확인하면 된다.
+namespace perft {
+
+struct referencePosition {
+    std::string name;
+    std::string description;
+    position pos;
+};
+
+const std::vector<referencePosition>& referencePositions();
+const referencePosition* findPosition(const std::string& name); //없으면 nullptr
+
+} // namespace perft
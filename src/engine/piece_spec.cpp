@@ -121,16 +121,84 @@ static PieceSpec makeSpec(pieceType pt, colorType ct) {
     return spec;
 }
 
-const PieceSpec& get(pieceType pt, colorType ct) {
-    static std::array<std::array<bool, NUMBER_OF_PIECEKIND>, 3> built{};
-    static std::array<std::array<PieceSpec, NUMBER_OF_PIECEKIND>, 3> cache;
-    const int ci = colorIndex(ct);
-    const int pi = static_cast<int>(pt);
-    if (!built[ci][pi]) {
-        cache[ci][pi] = makeSpec(pt, ct);
-        built[ci][pi] = true;
+static CompiledSpec compileSpec(const PieceSpec& spec) {
+    CompiledSpec cs;
+    for (int sq = 0; sq < bb::SQUARE_NB; ++sq) {
+        const int file = bb::fileOf(sq);
+        const int rank = bb::rankOf(sq);
+        cs.rayBegin[sq] = static_cast<uint16_t>(cs.rays.size());
+
+        for (const auto& mC : spec.moves) {
+            const int origin_file = file + mC.getOrigin().first;
+            const int origin_rank = rank + mC.getOrigin().second;
+            const int maxDist = mC.getMaxDistanse();
+            // TAKEJUMP는 maxDist 안의 칸을 뛰어넘어 그 다음 칸에 착지하므로 한 칸을 더 저장한다.
+            const int stored = (mC.getThreatType() == threatType::TAKEJUMP) ? maxDist + 1 : maxDist;
+
+            for (const auto& dir : mC.getDirs()) {
+                CompiledRay ray;
+                ray.tT = mC.getThreatType();
+                for (int i = 1; i <= stored && ray.len < BOARDSIZE; ++i) {
+                    const int f = origin_file + dir.first * i;
+                    const int r = origin_rank + dir.second * i;
+                    if (f < 0 || f >= BOARDSIZE || r < 0 || r >= BOARDSIZE) break;
+                    ray.sq[ray.len++] = static_cast<uint8_t>(bb::squareOf(f, r));
+                    if (i <= maxDist) ray.scan = ray.len;
+                }
+
+                for (int i = 0; i < ray.len; ++i) cs.reach[sq] |= bb::squareBit(ray.sq[i]);
+                if (maxDist == 1 && ray.scan == 1) cs.leaper[sq] |= bb::squareBit(ray.sq[0]);
+                cs.rays.push_back(ray);
+            }
+        }
+    }
+    cs.rayBegin[bb::SQUARE_NB] = static_cast<uint16_t>(cs.rays.size());
+
+    // 잡기가 가능한 광선(MOVE, SHIFT 제외)을 뒤집어 attackFrom을 만든다. 막는 기물은 무시하므로 후보의 상위 집합이다.
+    for (int sq = 0; sq < bb::SQUARE_NB; ++sq) {
+        for (int ri = cs.rayBegin[sq]; ri < cs.rayBegin[sq + 1]; ++ri) {
+            const CompiledRay& ray = cs.rays[ri];
+            if (ray.tT == threatType::MOVE || ray.tT == threatType::SHIFT) continue;
+            for (int i = 0; i < ray.len; ++i) cs.attackFrom[ray.sq[i]] |= bb::squareBit(sq);
+        }
     }
-    return cache[ci][pi];
+
+    for (const auto& p_sq : spec.promotableSquares) {
+        cs.promotableMask |= bb::squareBit(p_sq.first, p_sq.second);
+    }
+    return cs;
+}
+
+namespace {
+// 모든 (pieceType, colorType) 조합을 한 번에 만들고 컴파일해 두는 레지스트리.
+// 함수 내부 static 초기화로 생성되므로 첫 접근이 여러 스레드에서 동시에 일어나도 안전하다.
+struct Registry {
+    std::array<std::array<PieceSpec, NUMBER_OF_PIECEKIND>, 3> spec;
+    std::array<std::array<CompiledSpec, NUMBER_OF_PIECEKIND>, 3> table;
+
+    Registry() {
+        const colorType colors[3] = {colorType::WHITE, colorType::BLACK, colorType::NONE};
+        for (int ci = 0; ci < 3; ++ci) {
+            for (int pi = 0; pi < NUMBER_OF_PIECEKIND; ++pi) {
+                spec[ci][pi] = makeSpec(static_cast<pieceType>(pi), colors[ci]);
+                table[ci][pi] = compileSpec(spec[ci][pi]);
+            }
+        }
+    }
+};
+
+const Registry& registry() {
+    static const Registry reg;
+    return reg;
+}
+} // namespace
+
+const PieceSpec& get(pieceType pt, colorType ct) {
+    return registry().spec[colorIndex(ct)][static_cast<int>(pt)];
+}
+
+const CompiledSpec& compiled(pieceType pt, colorType ct) {
+    return registry().table[colorIndex(ct)][static_cast<int>(pt)];
 }
 
 // Convenience accessors
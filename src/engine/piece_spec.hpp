@@ -3,10 +3,11 @@
 #include <utility>
 #include <array>
 #include <optional>
+#include <cstdint>
 #include "chess.hpp"
 
 // Non-destructive flyweight: read-only spec per (pieceType, colorType).
-// Built lazily from existing piece initialization logic, then cached.
+// All entries are built (and compiled into tables) once, on first access.
 namespace specs {
 
 struct PieceSpec {
@@ -17,6 +18,25 @@ struct PieceSpec {
     std::vector<moveChunk> moves;
 };
 
+// 시작 시 PieceSpec을 칸별 평면 테이블로 컴파일한 결과.
+// 광선(ray)은 청크 -> 방향 순서 그대로 저장되므로 생성 순서가 makeSpec 정의 순서와 같다.
+// 원점 오프셋(TEMPESTROOK)과 보드 경계, maxDistanse는 컴파일 시점에 모두 반영된다.
+struct CompiledRay {
+    threatType tT = threatType::NONE;
+    uint8_t scan = 0;            // 차례로 검사할 칸 수
+    uint8_t len = 0;             // 저장된 칸 수 (TAKEJUMP는 scan 다음의 착지 칸을 하나 더 가질 수 있음)
+    uint8_t sq[BOARDSIZE] = {};  // 원점에서 가까운 순서의 칸 인덱스 (bb::squareOf)
+};
+
+struct CompiledSpec {
+    std::vector<CompiledRay> rays;                       // 모든 칸의 광선을 이어붙인 평면 배열
+    std::array<uint16_t, bb::SQUARE_NB + 1> rayBegin{};  // 칸 sq의 광선 = rays[rayBegin[sq], rayBegin[sq+1])
+    std::array<bitboard, bb::SQUARE_NB> leaper{};        // 거리 1짜리 청크(리퍼)가 닿는 칸
+    std::array<bitboard, bb::SQUARE_NB> reach{};         // 막는 기물이 없을 때 닿을 수 있는 모든 칸
+    std::array<bitboard, bb::SQUARE_NB> attackFrom{};    // 역방향 표: 칸 to를 잡을 수 있는(잡기 가능한 광선이 닿는) 출발 칸들
+    bitboard promotableMask = 0ULL;                      // promotableSquares의 비트보드
+};
+
 // Returns a const reference to cached spec for given type/color.
 // For color-less queries (e.g., isRoyal), pass either color; value is the same.
 const PieceSpec& get(pieceType pt, colorType ct);
@@ -26,5 +46,6 @@ const std::vector<moveChunk>& moves(pieceType pt, colorType ct);
 bool isPromotable(pieceType pt);
 const std::vector<pieceType>& promotePool(pieceType pt);
 const std::vector<std::pair<int,int>>& promotableSquares(pieceType pt, colorType ct);
+const CompiledSpec& compiled(pieceType pt, colorType ct);
 
 } // namespace specs
@@ -0,0 +1,59 @@
+#include "zobrist.hpp"
+#include <array>
+#include <random>
+
+namespace zobrist {
+namespace {
+
+int clampIndex(int v, int n){
+    if(v < 0) return 0;
+    return (v < n) ? v : n - 1;
+}
+
+struct Keys {
+    std::array<std::array<std::array<uint64_t, bb::SQUARE_NB>, NUMBER_OF_PIECEKIND>, 2> piece{};
+    std::array<std::array<uint64_t, STACK_NB>, bb::SQUARE_NB> stun{};
+    std::array<std::array<uint64_t, STACK_NB>, bb::SQUARE_NB> move{};
+    std::array<uint64_t, bb::SQUARE_NB> royal{};
+    std::array<std::array<std::array<uint64_t, POCKET_NB>, NUMBER_OF_PIECEKIND>, 2> pocket{};
+    uint64_t black = 0ULL;
+
+    Keys() {
+        std::mt19937_64 rng(0x9e3779b97f4a7c15ULL);
+        for(auto& byType : piece) for(auto& bySq : byType) for(auto& k : bySq) k = rng();
+        for(auto& bySq : stun) for(auto& k : bySq) k = rng();
+        for(auto& bySq : move) for(auto& k : bySq) k = rng();
+        for(auto& k : royal) k = rng();
+        for(auto& byType : pocket) for(auto& byCount : byType) for(auto& k : byCount) k = rng();
+        black = rng();
+    }
+};
+
+const Keys& keys() {
+    static const Keys k;
+    return k;
+}
+
+} // namespace
+
+uint64_t square(int sq, const piece& p) {
+    if(p.isEmpty()) return 0ULL;
+    const Keys& k = keys();
+    const int ci = (p.getColor() == colorType::WHITE) ? 0 : 1;
+    uint64_t h = k.piece[ci][static_cast<int>(p.getPieceType())][sq];
+    h ^= k.stun[sq][clampIndex(p.getStun(), STACK_NB)];
+    h ^= k.move[sq][clampIndex(p.getMove(), STACK_NB)];
+    if(p.getIsRoyal()) h ^= k.royal[sq];
+    return h;
+}
+
+uint64_t pocket(colorType ct, pieceType pt, int count) {
+    const int ci = (ct == colorType::WHITE) ? 0 : 1;
+    return keys().pocket[ci][static_cast<int>(pt)][clampIndex(count, POCKET_NB)];
+}
+
+uint64_t side(colorType ct) {
+    return (ct == colorType::BLACK) ? keys().black : 0ULL;
+}
+
+} // namespace zobrist
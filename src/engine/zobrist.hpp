@@ -0,0 +1,17 @@
+#pragma once
+#include <cstdint>
+#include "chess.hpp"
+
+// 포지션 해시용 Zobrist 키. 고정 시드로 한 번만 만들어 모든 chessboard가 공유한다.
+// 칸 키에는 기물(색, 종류)뿐 아니라 스턴/이동 스택과 로얄 여부까지 섞여 있으므로
+// 배치가 같아도 스택이나 로얄이 다르면 다른 해시가 된다.
+namespace zobrist {
+
+constexpr int STACK_NB = 32;   // 스택 값은 [0, STACK_NB-1]로 잘라 키를 고른다 (그 이상은 같은 키를 공유)
+constexpr int POCKET_NB = 32;  // 포켓 개수도 같은 방식으로 자른다
+
+uint64_t square(int sq, const piece& p);                 // 칸 sq에 놓인 기물 p의 키 (빈 칸이면 0)
+uint64_t pocket(colorType ct, pieceType pt, int count);  // ct 포켓에 pt가 count개 있을 때의 키
+uint64_t side(colorType ct);                             // 차례 키 (백 차례는 0)
+
+} // namespace zobrist
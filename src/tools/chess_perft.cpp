@@ -0,0 +1,114 @@
+// chess_perft: 수 생성기의 노드 수를 세는 CLI (정확성 확인 + 초당 노드 수 측정용)
+// 사용법: chess_perft [depth] [--position 이름] [--divide] [--threads N] [--stun] [--list]
+#include <chess.hpp>
+#include <perft.hpp>
+
+#include <chrono>
+#include <cstdlib>
+#include <cstring>
+#include <iostream>
+#include <string>
+
+static const char* pieceTypeToStr(pieceType pt){
+    switch(pt){
+        case pieceType::KING: return "K";
+        case pieceType::QUEEN: return "Q";
+        case pieceType::ROOK: return "R";
+        case pieceType::BISHOP: return "B";
+        case pieceType::KNIGHT: return "N";
+        case pieceType::PWAN: return "P";
+        case pieceType::AMAZON: return "A";
+        case pieceType::GRASSHOPPER: return "G";
+        case pieceType::KNIGHTRIDER: return "Kr";
+        case pieceType::ARCHBISHOP: return "W";
+        case pieceType::DABBABA: return "D";
+        case pieceType::ALFIL: return "L";
+        case pieceType::FERZ: return "F";
+        case pieceType::CENTAUR: return "C";
+        case pieceType::CAMEL: return "Cl";
+        case pieceType::TEMPESTROOK: return "Tr";
+        case pieceType::SAMURAI: return "S";
+        default: return "?";
+    }
+}
+
+static const char* threatTypeToStr(threatType tt){
+    switch(tt){
+        case threatType::CATCH: return "catch";
+        case threatType::TAKE: return "take";
+        case threatType::MOVE: return "move";
+        case threatType::TAKEMOVE: return "takemove";
+        case threatType::TAKEJUMP: return "takejump";
+        case threatType::SHIFT: return "shift";
+        default: return "?";
+    }
+}
+
+static std::string squareToStr(std::pair<int, int> sq){
+    return std::string(1, static_cast<char>('a' + sq.first)) + std::to_string(sq.second + 1);
+}
+
+static std::string pgnToStr(const PGN& pgn){
+    const std::string from = squareToStr(pgn.getFromSquare());
+    switch(pgn.getMoveType()){
+        case moveType::ADD: return std::string("add ") + pieceTypeToStr(pgn.getPieceType()) + "@" + from;
+        case moveType::MOVE: return from + "-" + squareToStr(pgn.getToSquare()) + " (" + threatTypeToStr(pgn.getThreatType()) + ")";
+        case moveType::PROMOTE: return from + "-" + squareToStr(pgn.getToSquare()) + "=" + pieceTypeToStr(pgn.getPieceType())
+                                       + " (" + threatTypeToStr(pgn.getThreatType()) + ")";
+        case moveType::SUCCESION: return "succession " + from;
+        case moveType::DISGUISE: return "disguise " + from + "=" + pieceTypeToStr(pgn.getPieceType());
+        case moveType::STUN: return "stun " + from;
+        default: return "?";
+    }
+}
+
+static void printUsage(){
+    std::cout << "usage: chess_perft [depth] [--position NAME] [--divide] [--threads N] [--stun] [--list]\n";
+}
+
+int main(int argc, char** argv){
+    int depth = 3;
+    int threads = 1;
+    bool divide = false;
+    bool include_stuns = false;
+    std::string name = "start";
+
+    for(int i = 1; i < argc; ++i){
+        if(std::strcmp(argv[i], "--position") == 0 && i + 1 < argc) name = argv[++i];
+        else if(std::strcmp(argv[i], "--threads") == 0 && i + 1 < argc) threads = std::atoi(argv[++i]);
+        else if(std::strcmp(argv[i], "--divide") == 0) divide = true;
+        else if(std::strcmp(argv[i], "--stun") == 0) include_stuns = true;
+        else if(std::strcmp(argv[i], "--list") == 0){
+            for(const auto& rp : perft::referencePositions()) std::cout << rp.name << ": " << rp.description << "\n";
+            return 0;
+        }
+        else if(argv[i][0] != '-') depth = std::atoi(argv[i]);
+        else { printUsage(); return 1; }
+    }
+
+    const perft::referencePosition* rp = perft::findPosition(name);
+    if(rp == nullptr){
+        std::cout << "unknown position: " << name << " (--list로 목록 확인)\n";
+        return 1;
+    }
+
+    chessboard board(rp->pos);
+    auto t0 = std::chrono::steady_clock::now();
+    uint64_t nodes = 0;
+    if(divide){
+        for(const auto& entry : board.perftDivide(depth, include_stuns, threads)){
+            std::cout << pgnToStr(entry.first) << ": " << entry.second << "\n";
+            nodes += entry.second;
+        }
+    }else{
+        nodes = board.perft(depth, include_stuns, threads);
+    }
+    auto t1 = std::chrono::steady_clock::now();
+    double ms = std::chrono::duration<double, std::milli>(t1 - t0).count();
+
+    std::cout << "position " << name << " depth " << depth << (include_stuns ? " (with stuns)" : "")
+              << ": nodes=" << nodes << " time=" << ms << "ms";
+    if(ms > 0.0) std::cout << " nps=" << static_cast<uint64_t>(static_cast<double>(nodes) * 1000.0 / ms);
+    std::cout << "\n";
+    return 0;
+}
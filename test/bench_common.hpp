@@ -0,0 +1,145 @@
+// 봇 벤치마크 테스트(test_bot, test_smp, test_search_ab)가 함께 쓰는 준비 코드:
+// 샘플 포지션, 수 출력, 설정 하나로 탐색 한 번을 돌리는 실행기
+#pragma once
+
+#include <chess.hpp>
+#include <agent.hpp>
+
+#include <chrono>
+#include <functional>
+#include <string>
+#include <tuple>
+#include <vector>
+
+namespace bench {
+
+using pieceList = std::vector<std::tuple<colorType, pieceType, int, int>>;
+
+// 기물 목록으로 포지션을 만든다. 킹이 빠져 있으면 기본 자리(e1, e8)에 놓는다.
+inline position makePosition(const pieceList& pieces, bool has_varient){
+    chessboard cb;
+    if(has_varient) cb.setVarientPiece();
+    bool has_white_king=false, has_black_king=false;
+    for(auto &t : pieces){
+        colorType c; pieceType p; int f,r; std::tie(c,p,f,r) = t;
+        cb.placePiece(c, p, f, r);
+        if(p==pieceType::KING && c==colorType::WHITE) has_white_king=true;
+        if(p==pieceType::KING && c==colorType::BLACK) has_black_king=true;
+    }
+    if(!has_white_king) cb.placePiece(colorType::WHITE, pieceType::KING, 4, 0);
+    if(!has_black_king) cb.placePiece(colorType::BLACK, pieceType::KING, 4, 7);
+    return cb.getPosition();
+}
+
+// 벤치마크 샘플 포지션 6개
+inline std::vector<position> samplePositions(){
+    std::vector<position> samples;
+    {
+        chessboard cb;
+        cb.setVarientPiece();
+        samples.push_back(cb.getPosition()); // 빈 보드 + 변형 포켓
+    }
+    samples.push_back(makePosition({
+        {colorType::WHITE, pieceType::ROOK, 0,0},
+        {colorType::WHITE, pieceType::PWAN, 1,1},
+        {colorType::WHITE, pieceType::PWAN, 2,1},
+        {colorType::BLACK, pieceType::ROOK, 7,7},
+        {colorType::BLACK, pieceType::PWAN, 6,6}
+    }, false)); // rook endgame-like
+    samples.push_back(makePosition({
+        {colorType::WHITE, pieceType::QUEEN, 3,3},
+        {colorType::WHITE, pieceType::BISHOP, 2,2},
+        {colorType::WHITE, pieceType::KNIGHT, 1,2},
+        {colorType::BLACK, pieceType::QUEEN, 4,4},
+        {colorType::BLACK, pieceType::ROOK, 6,6},
+        {colorType::BLACK, pieceType::KNIGHT, 5,5}
+    }, false)); // tactical middlegame
+    samples.push_back(makePosition({
+        {colorType::WHITE, pieceType::ROOK, 0,1},
+        {colorType::WHITE, pieceType::ROOK, 1,1},
+        {colorType::WHITE, pieceType::KNIGHT, 2,2},
+        {colorType::BLACK, pieceType::ROOK, 7,6},
+        {colorType::BLACK, pieceType::BISHOP, 5,5},
+        {colorType::BLACK, pieceType::PWAN, 4,4}
+    }, false)); // cramped tactics
+    samples.push_back(makePosition({
+        {colorType::WHITE, pieceType::AMAZON, 2,2},
+        {colorType::WHITE, pieceType::GRASSHOPPER, 3,2},
+        {colorType::WHITE, pieceType::KNIGHTRIDER, 1,3},
+        {colorType::BLACK, pieceType::ARCHBISHOP, 5,5},
+        {colorType::BLACK, pieceType::DABBABA, 6,6}
+    }, true)); // variant tactical mix
+    samples.push_back(makePosition({
+        {colorType::WHITE, pieceType::CENTAUR, 1,1},
+        {colorType::WHITE, pieceType::CAMEL, 2,1},
+        {colorType::WHITE, pieceType::TEMPESTROOK, 3,1},
+        {colorType::BLACK, pieceType::ALFIL, 6,6},
+        {colorType::BLACK, pieceType::FERZ, 5,6}
+    }, true)); // variant endgame-like
+    return samples;
+}
+
+inline const char* pieceTypeToStr(pieceType pt){
+    switch(pt){
+        case pieceType::KING: return "K";
+        case pieceType::QUEEN: return "Q";
+        case pieceType::ROOK: return "R";
+        case pieceType::BISHOP: return "B";
+        case pieceType::KNIGHT: return "N";
+        case pieceType::PWAN: return "P";
+        case pieceType::AMAZON: return "A";
+        case pieceType::GRASSHOPPER: return "G";
+        case pieceType::KNIGHTRIDER: return "Kr";
+        case pieceType::ARCHBISHOP: return "W";
+        case pieceType::DABBABA: return "D";
+        case pieceType::ALFIL: return "L";
+        case pieceType::FERZ: return "F";
+        case pieceType::CENTAUR: return "C";
+        case pieceType::CAMEL: return "Cl";
+        case pieceType::TEMPESTROOK: return "Tr";
+        case pieceType::SAMURAI: return "S";
+        default: return "?";
+    }
+}
+
+inline std::string moveToStr(const PGN& mv){
+    auto sq = [](std::pair<int,int> s){ return "(" + std::to_string(s.first) + "," + std::to_string(s.second) + ")"; };
+    switch(mv.getMoveType()){
+        case moveType::NONE: return "NO_MOVE";
+        case moveType::ADD: return std::string("ADD ") + pieceTypeToStr(mv.getPieceType()) + " at" + sq(mv.getFromSquare());
+        case moveType::SUCCESION: return "SUCESSION at" + sq(mv.getFromSquare());
+        case moveType::STUN: return "STUN at" + sq(mv.getFromSquare());
+        default: return "from" + sq(mv.getFromSquare()) + "->" + sq(mv.getToSquare());
+    }
+}
+
+// 탐색 설정 하나: 기본값(샘플 30, 반복 심화)에서 출발해 apply가 필요한 것만 바꾼다
+struct searchConfig {
+    std::string name;
+    std::function<void(agent::minimax_GPTproposed&)> apply;
+};
+
+struct runResult {
+    agent::calcInfo info;
+    double ms = 0.0;
+};
+
+// 새 봇(빈 TT, 빈 히스토리)으로 pos를 depth까지 한 번 탐색하고 걸린 시간을 잰다
+inline runResult runConfig(const searchConfig& config, const position& pos, int depth, int threads = 1){
+    agent::minimax_GPTproposed botx(colorType::WHITE);
+    botx.setPlacementSample(30);
+    botx.setIterativeDeepening(true);
+    botx.setThreads(threads);
+    if(config.apply) config.apply(botx);
+
+    agent::SearchLimits limits;
+    limits.depth = depth;
+    runResult result;
+    auto t0 = std::chrono::steady_clock::now();
+    result.info = botx.search(pos, limits);
+    auto t1 = std::chrono::steady_clock::now();
+    result.ms = std::chrono::duration<double, std::milli>(t1 - t0).count();
+    return result;
+}
+
+} // namespace bench
@@ -1,4 +1,5 @@
 #include <chess.hpp>
+#include <perft.hpp>
 
 int main(){
     chessboard testboard;
@@ -25,14 +26,135 @@ int main(){
 
     testboard.displayPieceInfo(4, 0);
 
-    testboard.updatePiece(PGN(colorType::WHITE, threatType::TAKEMOVE, 4, 0, 4, 1));
+    if(!testboard.isLegal(PGN(colorType::WHITE, threatType::TAKEMOVE, 4, 0, 4, 2))) std::cout << "isLegal: king cannot move two squares." << std::endl;
+    if(testboard.isLegal(PGN(colorType::WHITE, threatType::TAKEMOVE, 4, 0, 4, 1))) std::cout << "isLegal: e1->e2 is legal." << std::endl;
+
+    PGN king_step(colorType::WHITE, threatType::TAKEMOVE, 4, 0, 4, 1);
+    if(Move(king_step).toPGN() == king_step) std::cout << "Move: PGN round trip ok (" << sizeof(Move) << " bytes)." << std::endl;
+
+    testboard.updatePiece(king_step);
 
     if(testboard(4, 0).isEmpty()) std::cout << "no piece in e1 square." << std::endl;
     if(!testboard(4, 1).isEmpty() && testboard(4, 1).getPieceType() == pieceType::KING) std::cout << "the king is in e2 square." << std::endl;
 
     testboard.displayBoard();
 
+    testboard.undoBoard(); //undo 기록으로 이동 전 상태 복구 확인
+    if(testboard(4, 1).isEmpty() && testboard(4, 0).getPieceType() == pieceType::KING && testboard(4, 0).getMove() == 10) std::cout << "undo: the king is back in e1 square." << std::endl;
+    if(testboard.getTurn() == colorType::WHITE) std::cout << "undo: turn restored to white." << std::endl;
+
     testboard.placePiece(colorType::WHITE, pieceType::PWAN, 2, 7); //프로모션되는 칸에 착수 방지 확인
+
+    std::cout << "royal count: white=" << testboard.getRoyalCount(colorType::WHITE) << " black=" << testboard.getRoyalCount(colorType::BLACK) << std::endl;
+
+    chessboard no_royal_board; //양쪽 모두 로얄이 없으면 무승부
+    no_royal_board.updatePiece(PGN(colorType::WHITE, 0, 2, pieceType::PWAN));
+    no_royal_board.updatePiece(PGN(colorType::BLACK, 7, 5, pieceType::PWAN));
+    if(no_royal_board.getWhoIsVictory() == victoryType::DRAW) std::cout << "victory: no royals on either side is a draw." << std::endl;
+
+    chessboard lifecycle; //턴 진행 규칙(7, 9, 10, 11, 13) 확인
+    lifecycle.setVarientPiece();
+    lifecycle.placePiece(colorType::WHITE, pieceType::ROOK, 0, 0); //wR@a1
+    lifecycle.placePiece(colorType::WHITE, pieceType::ROOK, 1, 0); //wR@b1
+    lifecycle.placePiece(colorType::WHITE, pieceType::KING, 7, 0); //wK@h1
+    lifecycle.placePiece(colorType::BLACK, pieceType::KNIGHT, 0, 2); //bN@a3
+    lifecycle.placePiece(colorType::BLACK, pieceType::KING, 1, 4); //bK@b5
+    lifecycle.placePiece(colorType::BLACK, pieceType::PWAN, 5, 5); //bP@f6
+    lifecycle(0, 0).setStun(0); lifecycle(0, 0).setMove(2);
+    lifecycle(1, 0).setStun(0); lifecycle(1, 0).setMove(1);
+    lifecycle(0, 2).setStun(2); lifecycle(0, 2).setMove(1);
+
+    int knights_before = lifecycle.getWhitePocket()[static_cast<int>(pieceType::KNIGHT)];
+    lifecycle.updatePiece(PGN(colorType::WHITE, threatType::TAKEMOVE, 0, 0, 0, 2)); //Rxa3
+    //잡은 룩: 스턴 0+2, 이동 2+1-1 -> 턴 종료로 스턴 1, 이동 3
+    std::cout << "capture: rook on a3 stun=" << lifecycle(0, 2).getStun() << " move=" << lifecycle(0, 2).getMove()
+              << ", white knights in pocket " << knights_before << "->" << lifecycle.getWhitePocket()[static_cast<int>(pieceType::KNIGHT)] << std::endl;
+
+    lifecycle.updatePiece(PGN(colorType::BLACK, 0, 2, moveType::STUN)); //흑이 a3 룩에 스턴
+    std::cout << "stun: rook on a3 stun=" << lifecycle(0, 2).getStun() << ", turn=" << (lifecycle.getTurn() == colorType::WHITE ? "white" : "black") << std::endl;
+
+    int pawn_stun_before = lifecycle(5, 5).getStun();
+    uint64_t hash_before = lifecycle.getHash();
+    lifecycle.updatePiece(PGN(colorType::WHITE, threatType::TAKEMOVE, 1, 0, 1, 4)); //Rxb5, 로얄 사망
+    std::cout << "royal capture: black pawn stun " << pawn_stun_before << "->" << lifecycle(5, 5).getStun() << std::endl;
+    if(lifecycle.getWhoIsVictory() == victoryType::WHITE) std::cout << "victory: white wins after capturing the last royal." << std::endl;
+    lifecycle.undoBoard();
+    if(lifecycle(5, 5).getStun() == pawn_stun_before && lifecycle(1, 4).getIsRoyal()) std::cout << "undo: royal capture restored." << std::endl;
+
+    //Zobrist 해시: 증분 갱신 값이 처음부터 다시 계산한 값과 같고, 스택만 달라도 해시가 달라야 한다
+    chessboard rebuilt(lifecycle.getPosition());
+    chessboard restacked(lifecycle.getPosition());
+    restacked(5, 5).addOneStun();
+    std::cout << "hash: undo restores=" << (lifecycle.getHash() == hash_before)
+              << " matches rebuild=" << (rebuilt.getHash() == lifecycle.getHash())
+              << " stack-sensitive=" << (restacked.getHash() != lifecycle.getHash()) << std::endl;
+
+    //규칙 12: 계승은 로얄 피스가 체크된 경우에만 가능
+    chessboard check_board;
+    check_board.placePiece(colorType::WHITE, pieceType::KING, 4, 0); //wK@e1
+    check_board.placePiece(colorType::WHITE, pieceType::KNIGHT, 1, 0); //wN@b1
+    check_board.placePiece(colorType::BLACK, pieceType::ROOK, 4, 7); //bR@e8
+    check_board(4, 7).setStun(1); check_board(4, 7).setMove(1);
+    std::cout << "check: stunned rook -> attacked=" << check_board.isRoyalAttacked(colorType::WHITE)
+              << " successions=" << check_board.calcLegalSuccesion(colorType::WHITE).size();
+    check_board(4, 7).setStun(0);
+    std::cout << ", active rook -> attacked=" << check_board.isRoyalAttacked(colorType::WHITE)
+              << " attackers=" << bb::popcount(check_board.attackersOf(bb::squareOf(4, 0), colorType::BLACK))
+              << " successions=" << check_board.calcLegalSuccesion(colorType::WHITE).size() << std::endl;
+
+    //SEE용 공격자 검사: 점유에서 앞 기물을 치우면 뒤의 룩이 드러나고, 사무라이는 CATCH로(제자리에서) 잡는다
+    chessboard xray_board;
+    xray_board.setVarientPiece(); //사무라이는 변형 포켓에 있다
+    xray_board.placePiece(colorType::WHITE, pieceType::ROOK, 0, 0); //wR@a1
+    xray_board.placePiece(colorType::WHITE, pieceType::ROOK, 0, 1); //wR@a2
+    xray_board.placePiece(colorType::WHITE, pieceType::SAMURAI, 1, 6); //wS@b7
+    xray_board.placePiece(colorType::BLACK, pieceType::KNIGHT, 0, 7); //bN@a8
+    for(int f : {0, 1}) for(int r = 0; r < BOARDSIZE; ++r){
+        if(xray_board.at(f, r).isEmpty()) continue;
+        xray_board(f, r).setStun(0); xray_board(f, r).setMove(1);
+    }
+    const int a8 = bb::squareOf(0, 7);
+    const bitboard occ = xray_board.getOccupancy();
+    std::cout << "xray: attackers=" << bb::popcount(xray_board.attackersOf(a8, colorType::WHITE, occ, false))
+              << " a1 hidden=" << ((xray_board.attackersOf(a8, colorType::WHITE, occ, false) & bb::squareBit(bb::squareOf(0, 0))) != 0ULL)
+              << " a1 without a2=" << ((xray_board.attackersOf(a8, colorType::WHITE, occ & ~bb::squareBit(bb::squareOf(0, 1)), false) & bb::squareBit(bb::squareOf(0, 0))) != 0ULL)
+              << " catchers=" << bb::popcount(xray_board.catchersOf(a8, colorType::WHITE, occ)) << std::endl;
+
+    //수 목록 없이 센 이동성/위협이 수 생성 결과와 같은지 (사무라이 SHIFT, 그래스호퍼 TAKEJUMP, 승격 직전 폰이 있는 tactics 포지션)
+    chessboard count_board(perft::findPosition("tactics")->pos);
+    std::array<int, NUMBER_OF_PIECEKIND> ones;
+    ones.fill(1);
+    int counted_pieces = 0, count_mismatches = 0;
+    MoveList piece_moves;
+    for(int f = 0; f < BOARDSIZE; ++f) for(int r = 0; r < BOARDSIZE; ++r){
+        const piece &p = count_board.at(f, r);
+        if(p.isEmpty()) continue;
+        ++counted_pieces;
+        for(bool potential : {true, false}){
+            piece_moves.clear();
+            count_board.generatePieceMoves(p.getColor(), f, r, potential, piece_moves);
+            if(count_board.countMobility(f, r, potential) != piece_moves.size()) ++count_mismatches;
+        }
+        int victims = 0;
+        piece_moves.clear();
+        count_board.generatePieceMoves(p.getColor(), f, r, true, piece_moves);
+        for(const auto &sm : piece_moves){
+            if(sm.move.getMoveType() == moveType::PROMOTE) continue;
+            const piece &v = count_board.at(bb::fileOf(sm.move.getTo()), bb::rankOf(sm.move.getTo()));
+            if(!v.isEmpty() && v.getColor() != p.getColor()) ++victims;
+        }
+        if(count_board.threatenedValue(f, r, ones) != victims) ++count_mismatches;
+    }
+    std::cout << "count: pieces=" << counted_pieces << " mismatches=" << count_mismatches << std::endl;
+
+    //압축된 piece: 4바이트, 스택은 STACK_MAX에서 포화
+    piece packed(colorType::BLACK, pieceType::SAMURAI, 0, 0);
+    packed.setRoyal(true);
+    packed.addStun(piece::STACK_MAX + 10);
+    packed.minusOneMove(); //0 아래로는 내려가지 않는다
+    std::cout << "piece: sizeof=" << sizeof(piece) << " position=" << sizeof(position)
+              << " stun=" << packed.getStun() << " move=" << packed.getMove()
+              << " royal=" << packed.getIsRoyal() << " samurai=" << (packed.getPieceType() == pieceType::SAMURAI) << std::endl;
     
     return 0;
 }
@@ -0,0 +1,95 @@
+#include <agent.hpp>
+#include <chess.hpp>
+
+#include <atomic>
+#include <cstdlib>
+#include <iostream>
+#include <new>
+
+// 전역 operator new를 가로채 힙 할당 횟수를 센다.
+static std::atomic<unsigned long long> g_alloc_count{0};
+
+void* operator new(std::size_t size){
+    ++g_alloc_count;
+    if(size == 0) size = 1;
+    if(void* p = std::malloc(size)) return p;
+    throw std::bad_alloc();
+}
+void* operator new[](std::size_t size){ return ::operator new(size); }
+void operator delete(void* p) noexcept { std::free(p); }
+void operator delete[](void* p) noexcept { std::free(p); }
+void operator delete(void* p, std::size_t) noexcept { std::free(p); }
+void operator delete[](void* p, std::size_t) noexcept { std::free(p); }
+
+// 표준 체스 배치
+static void setup_standard(chessboard& cb){
+    const pieceType back[BOARDSIZE] = {
+        pieceType::ROOK, pieceType::KNIGHT, pieceType::BISHOP, pieceType::QUEEN,
+        pieceType::KING, pieceType::BISHOP, pieceType::KNIGHT, pieceType::ROOK
+    };
+    for(int f=0; f<BOARDSIZE; ++f){
+        cb.placePiece(colorType::WHITE, back[f], f, 0);
+        cb.placePiece(colorType::WHITE, pieceType::PWAN, f, 1);
+        cb.placePiece(colorType::BLACK, back[f], f, 7);
+        cb.placePiece(colorType::BLACK, pieceType::PWAN, f, 6);
+    }
+    for(int f=0; f<BOARDSIZE; ++f){
+        for(int r=0; r<BOARDSIZE; ++r){
+            if(!cb(f,r).isEmpty()){
+                cb(f,r).setMove(10);
+                cb(f,r).setStun(0);
+            }
+        }
+    }
+}
+
+int main(){
+    chessboard cb;
+    cb.setVarientPiece(); // 변형 기물까지 포켓에 넣어 착수 수도 많이 생성되게 한다
+    setup_standard(cb);
+
+    MoveList moves;
+
+    // 워밍업: 로그/되돌리기 스택 용량을 미리 확보
+    cb.generateAll(colorType::WHITE, moves);
+    for(const auto& sm : moves){ cb.doMove(sm.move); cb.unmakeMove(); }
+
+    const int ROUNDS = 1000;
+    unsigned long long generated = 0;
+    unsigned long long before = g_alloc_count.load();
+    for(int i=0; i<ROUNDS; ++i){
+        moves.clear();
+        cb.generateAll(colorType::WHITE, moves);
+        generated += moves.size();
+        for(const auto& sm : moves){
+            cb.doMove(sm.move);
+            cb.unmakeMove();
+        }
+    }
+    unsigned long long gen_allocs = g_alloc_count.load() - before;
+
+    std::cout << "alloc: generateAll + doMove/unmakeMove over " << generated
+              << " moves -> " << gen_allocs << " heap allocations\n";
+    if(gen_allocs != 0){
+        std::cout << "alloc: FAILED (move generation must not allocate)\n";
+        return 1;
+    }
+    std::cout << "alloc: move generation is allocation-free.\n";
+
+    // 탐색 전체의 노드당 할당 횟수 (루트의 PV/결과 벡터 정도만 남으므로 참고용으로만 출력)
+    agent::minimax bot(colorType::WHITE);
+    bot.setPlacementSample(3);
+    position pos = cb.getPosition();
+    pos.turn_right = colorType::WHITE;
+    bot.getBestMove(pos, 2); // 워밍업
+    bot.resetNodesSearched();
+    before = g_alloc_count.load();
+    bot.getBestMove(pos, 3);
+    unsigned long long search_allocs = g_alloc_count.load() - before;
+    unsigned long long nodes = bot.getNodesSearched();
+    std::cout << "alloc: search depth 3 -> " << nodes << " nodes, "
+              << search_allocs << " heap allocations ("
+              << (nodes ? static_cast<double>(search_allocs) / static_cast<double>(nodes) : 0.0)
+              << " per node)\n";
+    return 0;
+}
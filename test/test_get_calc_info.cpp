@@ -1,6 +1,9 @@
 #include <agent.hpp>
 #include <chess.hpp>
 
+#include "bench_common.hpp"
+
+#include <cstdio>
 #include <iostream>
 #include <string>
 
@@ -35,6 +38,7 @@ static const char* moveTypeToStr(moveType mt){
         case moveType::PROMOTE: return "PROMOTE";
         case moveType::SUCCESION: return "SUCCESION";
         case moveType::DISGUISE: return "DISGUISE";
+        case moveType::STUN: return "STUN";
         case moveType::NONE: return "NONE";
         default: return "?";
     }
@@ -144,5 +148,145 @@ int main(){
         std::cout << "\n";
     }
 
+    // SearchLimits: 깊이 한도 없이 시간/노드 한도만 주면 마지막으로 끝난 반복의 결과를 돌려준다
+    SearchLimits timed;
+    timed.depth = 30;
+    timed.hard_ms = 200;
+    calcInfo tinfo = bot.search(start_default, timed);
+    std::cout << "search(hard_ms=200): depth=" << tinfo.depth << " nodes=" << tinfo.nodes
+              << " time=" << tinfo.time_ms << "ms line length=" << tinfo.line.size()
+              << (tinfo.time_ms < 400.0 ? " (within budget)" : " (OVER BUDGET)") << "\n";
+    std::cout << "tt: " << bot.getHashMB() << "MB hashfull=" << bot.hashfull() << "/1000\n";
+
+    // saveHash/loadHash: 저장한 TT를 새 봇이 불러오면 같은 깊이 탐색이 더 적은 노드로 끝나야 한다
+    const std::string hash_path = "test_get_calc_info.hash";
+    bool saved = bot.saveHash(hash_path);
+    minimax_GPTproposed cold(colorType::WHITE);
+    cold.setFollowTurn(true);
+    cold.setIterativeDeepening(true);
+    cold.setPlacementSample(6);
+    minimax_GPTproposed warm(colorType::WHITE);
+    warm.setFollowTurn(true);
+    warm.setIterativeDeepening(true);
+    warm.setPlacementSample(6);
+    bool loaded = warm.loadHash(hash_path);
+    std::remove(hash_path.c_str());
+    uint64_t cold_nodes = cold.getCalcInfo(start_default, depth).nodes;
+    uint64_t warm_nodes = warm.getCalcInfo(start_default, depth).nodes;
+    std::cout << "hash file: saved=" << saved << " loaded=" << loaded
+              << " depth " << depth << " nodes cold=" << cold_nodes << " warm=" << warm_nodes
+              << (warm_nodes < cold_nodes ? " (warm start)" : " (NO REUSE)") << "\n";
+
+    SearchLimits budget;
+    budget.nodes = 2000;
+    calcInfo ninfo = bot.search(start_default, budget);
+    std::cout << "search(nodes=2000): depth=" << ninfo.depth << " nodes=" << ninfo.nodes
+              << " bestMove=" << (ninfo.bestMove.getMoveType() == moveType::NONE ? "NONE" : moveTypeToStr(ninfo.bestMove.getMoveType())) << "\n";
+
+    // 백 킹 하나만 스턴 상태이고 포켓이 비어 있으면 스턴(규칙 10)만 둘 수 있다 — 탐색이 수 없음(NONE)으로 끝나면 안 된다
+    chessboard cb_stunned;
+    cb_stunned.placePiece(colorType::WHITE, pieceType::KING, 4, 0);
+    cb_stunned.placePiece(colorType::BLACK, pieceType::KING, 4, 7);
+    cb_stunned.placePiece(colorType::BLACK, pieceType::ROOK, 0, 7);
+    cb_stunned(4,0).setStun(2);
+    cb_stunned(4,7).setStun(0);
+    cb_stunned(4,7).setMove(3);
+    cb_stunned(0,7).setStun(0);
+    cb_stunned(0,7).setMove(3);
+    position stunned = cb_stunned.getPosition();
+    stunned.whitePocket.fill(0);
+    stunned.blackPocket.fill(0);
+    stunned.turn_right = colorType::WHITE;
+    calcInfo sinfo = bot.getCalcInfo(stunned, 4);
+    std::cout << "all stunned: bestMove=" << moveTypeToStr(sinfo.bestMove.getMoveType())
+              << " eval=" << sinfo.eval_val << " line length=" << sinfo.line.size() << "\n";
+
+    // 메이트 거리: TT는 수를 넘겨 이어지므로, 두 수 뒤 포지션을 같은 봇(웜 TT)으로 탐색한 평가가
+    // 새 봇(콜드 TT)의 평가와 같아야 한다. 흑 킹은 스턴에 묶여 있고 백 룩이 깊이 7 안에 잡는다.
+    chessboard cb_mate;
+    cb_mate.placePiece(colorType::WHITE, pieceType::KING, 0, 0);
+    cb_mate.placePiece(colorType::WHITE, pieceType::ROOK, 1, 1);
+    cb_mate.placePiece(colorType::BLACK, pieceType::KING, 7, 7);
+    cb_mate(0,0).setStun(0);
+    cb_mate(0,0).setMove(3);
+    cb_mate(1,1).setStun(0);
+    cb_mate(1,1).setMove(3);
+    cb_mate(7,7).setStun(6);
+    position mate_pos = cb_mate.getPosition();
+    mate_pos.whitePocket.fill(0);
+    mate_pos.blackPocket.fill(0);
+    mate_pos.turn_right = colorType::WHITE;
+    minimax_GPTproposed mate_bot(colorType::WHITE);
+    mate_bot.setFollowTurn(true);
+    mate_bot.setIterativeDeepening(true);
+    calcInfo first = mate_bot.getCalcInfo(mate_pos, 7);
+    chessboard after(mate_pos);
+    for(size_t i=0;i<2 && i<first.line.size();++i) after.updatePiece(first.line[i]);
+    calcInfo warm_mate = mate_bot.getCalcInfo(after.getPosition(), 5);
+    minimax_GPTproposed cold_mate_bot(colorType::WHITE);
+    cold_mate_bot.setFollowTurn(true);
+    cold_mate_bot.setIterativeDeepening(true);
+    calcInfo cold_mate = cold_mate_bot.getCalcInfo(after.getPosition(), 5);
+    std::cout << "mate distance: first=" << first.eval_val << " warm=" << warm_mate.eval_val << " cold=" << cold_mate.eval_val
+              << (warm_mate.eval_val == cold_mate.eval_val ? " (match)" : " (MISMATCH)") << "\n";
+
+    // 착수 사전 점수는 두는 쪽 기준이어야 한다: 킹만 대칭으로 놓인 포지션에서 흑의 최선 착수는
+    // 백의 최선 착수를 위아래로 뒤집은 것과 같은 기물이어야 한다 (샘플이 작으면 사전 점수가 그대로 드러난다)
+    chessboard cb_drop;
+    cb_drop.placePiece(colorType::WHITE, pieceType::KING, 4, 0);
+    cb_drop.placePiece(colorType::BLACK, pieceType::KING, 4, 7);
+    cb_drop(4,0).setStun(5); // 킹은 묶어 두어 착수만 남긴다
+    cb_drop(4,7).setStun(5);
+    cb_drop.setThisIsCustom(true); // 기본 포지션 초반의 "킹 착수만" 제한을 끈다
+    position drop_white = cb_drop.getPosition();
+    drop_white.turn_right = colorType::WHITE;
+    position drop_black = drop_white;
+    drop_black.turn_right = colorType::BLACK;
+    minimax_GPTproposed drop_bot(colorType::WHITE);
+    drop_bot.setFollowTurn(true);
+    drop_bot.setPlacementSample(3);
+    const PGN white_drop = drop_bot.getBestMove(drop_white, 1);
+    const PGN black_drop = drop_bot.getBestMove(drop_black, 1);
+    const bool drops_match = white_drop.getMoveType() == moveType::ADD && black_drop.getMoveType() == moveType::ADD
+        && white_drop.getPieceType() == black_drop.getPieceType();
+    std::cout << "top drop: white=" << pieceTypeToStr(white_drop.getPieceType())
+              << "(" << white_drop.getFromSquare().first << "," << white_drop.getFromSquare().second << ")"
+              << " black=" << pieceTypeToStr(black_drop.getPieceType())
+              << "(" << black_drop.getFromSquare().first << "," << black_drop.getFromSquare().second << ")"
+              << (drops_match ? " (match)" : " (MISMATCH)") << "\n";
+
+    // PVS는 탐색 순서만 바꾸므로 같은 수 집합이면 알파베타와 루트 값이 같아야 한다.
+    // 착수 샘플링은 히스토리/킬러/TT 수로 상위 K개를 고르기 때문에 탐색 순서에 따라 수 집합이 달라진다
+    // (test_search_ab의 빈 보드 포지션에서 두 값이 갈리는 원인). 그래서 샘플을 충분히 크게 잡아 착수를 모두 두고,
+    // 가지치기와 윈도우에 의존하는 퀴센스 델타 가지치기/퀴센스 TT도 끈 채 비교한다.
+    const int equal_depth = 3;
+    const std::vector<position> equal_samples = bench::samplePositions();
+    int equal_count = 0;
+    std::string equal_diff;
+    for(size_t pid=0; pid<equal_samples.size(); ++pid){
+        int evals[2] = {0, 0};
+        for(int pvs=0; pvs<2; ++pvs){
+            minimax_GPTproposed full_bot(colorType::WHITE);
+            full_bot.setPlacementSample(100000);
+            full_bot.setIterativeDeepening(true);
+            full_bot.setUsePlacementWidening(false);
+            full_bot.setNullMove(false);
+            full_bot.setUseLMR(false);
+            full_bot.setUseFutility(false);
+            full_bot.setUseReverseFutility(false);
+            full_bot.setUseDeltaPruning(false);
+            full_bot.setUseQSearchTT(false);
+            full_bot.setUsePVS(pvs == 1);
+            SearchLimits limits;
+            limits.depth = equal_depth;
+            evals[pvs] = full_bot.search(equal_samples[pid], limits).eval_val;
+        }
+        if(evals[0] == evals[1]) ++equal_count;
+        else equal_diff += " pos" + std::to_string(pid+1) + "(" + std::to_string(evals[0]) + " vs " + std::to_string(evals[1]) + ")";
+    }
+    std::cout << "pvs vs alphabeta (no sampling, depth " << equal_depth << "): "
+              << equal_count << "/" << equal_samples.size() << " equal"
+              << (equal_diff.empty() ? " (match)" : " (MISMATCH)" + equal_diff) << "\n";
+
     return 0;
 }
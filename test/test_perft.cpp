@@ -0,0 +1,67 @@
+#include <chess.hpp>
+#include <perft.hpp>
+
+#include <iostream>
+#include <string>
+#include <vector>
+
+// docs/perft.md의 기준 노드 수. 수 생성기를 바꿨는데 값이 달라졌다면 규칙이 바뀐 것인지 버그인지 확인할 것.
+struct expectedCount {
+    std::string position;
+    int depth;
+    bool include_stuns;
+    uint64_t nodes;
+};
+
+int main(){
+    const std::vector<expectedCount> expected = {
+        {"start", 1, false, 376ULL},
+        {"start", 2, false, 139168ULL},
+        {"start", 3, false, 47752448ULL},
+        {"variant", 1, false, 1080ULL},
+        {"variant", 2, false, 1148176ULL},
+        {"kings", 1, false, 303ULL},
+        {"kings", 2, false, 90329ULL},
+        {"kings", 3, false, 25466555ULL},
+        {"standard", 1, false, 17ULL},
+        {"standard", 2, false, 289ULL},
+        {"standard", 3, false, 5423ULL},
+        {"standard", 4, false, 101806ULL},
+        {"standard", 5, false, 2150811ULL},
+        {"standard", 4, true, 5817920ULL},
+        {"tactics", 1, false, 740ULL},
+        {"tactics", 2, false, 606578ULL},
+    };
+
+    int failed = 0;
+    for(const auto& e : expected){
+        const perft::referencePosition* rp = perft::findPosition(e.position);
+        if(rp == nullptr){
+            std::cout << "perft: unknown position " << e.position << "\n";
+            ++failed;
+            continue;
+        }
+        chessboard board(rp->pos);
+        const uint64_t hash_before = board.getHash();
+        const uint64_t nodes = board.perft(e.depth, e.include_stuns);
+        const bool ok = (nodes == e.nodes) && (board.getHash() == hash_before);
+        std::cout << "perft " << e.position << " depth " << e.depth << (e.include_stuns ? " +stun" : "")
+                  << ": " << nodes << (ok ? "" : "  MISMATCH (expected " + std::to_string(e.nodes) + ")") << "\n";
+        if(!ok) ++failed;
+    }
+
+    // 스레드로 나눠 센 값과 divide 합계는 단일 스레드 값과 같아야 한다
+    chessboard tactics(perft::findPosition("tactics")->pos);
+    uint64_t divided = 0;
+    for(const auto& entry : tactics.perftDivide(2, false, 3)) divided += entry.second;
+    const uint64_t threaded = tactics.perft(2, false, 3);
+    std::cout << "perft tactics depth 2: divide(3 threads)=" << divided << " perft(3 threads)=" << threaded << "\n";
+    if(divided != 606578ULL || threaded != 606578ULL) ++failed;
+
+    if(failed){
+        std::cout << "perft: FAILED (" << failed << " mismatches)\n";
+        return 1;
+    }
+    std::cout << "perft: all reference counts match.\n";
+    return 0;
+}
@@ -0,0 +1,134 @@
+// 탐색 기법 A/B 벤치마크: bench_common.hpp의 샘플 포지션에서 설정(기법 on/off)별로
+// 같은 깊이까지의 노드 수(그중 퀴센스 노드 수), 시간(time-to-depth), 평가값을 비교한다.
+// 사용법: test_search_ab [depth]   (기본: depth 5)
+#include "bench_common.hpp"
+#include <perft.hpp>
+
+#include <cstdlib>
+#include <iomanip>
+#include <algorithm>
+#include <iostream>
+#include <string>
+#include <vector>
+
+int main(int argc, char** argv){
+    const int depth = (argc > 1) ? std::atoi(argv[1]) : 5;
+
+    // bench_common.hpp의 샘플 포지션 + 잡기 위주 포지션 하나
+    std::vector<position> samples = bench::samplePositions();
+    // 잡기가 많은 포지션(사무라이 CATCH/SHIFT, 그래스호퍼 TAKEJUMP, 승격 직전 폰): 퀴센스 기법은 여기서 차이가 난다
+    samples.push_back(perft::findPosition("tactics")->pos);
+
+    // 첫 설정이 기준. 각 설정은 기본값에서 출발해 필요한 것만 바꾼다.
+    // 착수 샘플(상위 K개)은 히스토리/킬러/TT 수에 따라 골라지므로 탐색 순서가 다른 alphabeta와 pvs는 값이 다를 수 있다.
+    // 착수를 모두 둘 때 두 값이 같은지는 test_get_calc_info가 확인한다.
+    // plain은 본 탐색의 가지치기와 착수 widening을 모두 끈다 (PVS는 따로): plain + PVS 끔 = 순수 알파베타
+    auto plain = [](agent::minimax_GPTproposed& b){
+        b.setUsePlacementWidening(false);
+        b.setNullMove(false);
+        b.setUseLMR(false);
+        b.setUseFutility(false);
+        b.setUseReverseFutility(false);
+    };
+    // 퀴센스 가지치기/TT를 끈 기본 설정 (퀴센스 기법 비교의 기준)
+    auto plain_q = [](agent::minimax_GPTproposed& b){
+        b.setUseSEEPruning(false);
+        b.setUseDeltaPruning(false);
+        b.setUseQSearchTT(false);
+    };
+    const std::vector<bench::searchConfig> configs = {
+        {"alphabeta", [&](agent::minimax_GPTproposed& b){ plain(b); b.setUsePVS(false); }},
+        {"pvs",       [&](agent::minimax_GPTproposed& b){ plain(b); }},
+        {"+null",     [&](agent::minimax_GPTproposed& b){ plain(b); b.setNullMove(true); }},
+        {"+lmr",      [&](agent::minimax_GPTproposed& b){ plain(b); b.setUseLMR(true); }},
+        {"+futility", [&](agent::minimax_GPTproposed& b){ plain(b); b.setUseFutility(true); }},
+        {"+rfp",      [&](agent::minimax_GPTproposed& b){ plain(b); b.setUseReverseFutility(true); }},
+        {"default",   [](agent::minimax_GPTproposed&){}},
+        {"all",       [](agent::minimax_GPTproposed& b){ b.setUseLMR(true); b.setUseFutility(true); }},
+        {"-evalcache",[](agent::minimax_GPTproposed& b){ b.setUseEvalCache(false); }},
+        {"-widening", [](agent::minimax_GPTproposed& b){ b.setUsePlacementWidening(false); }},
+        {"q-plain",   [&](agent::minimax_GPTproposed& b){ plain_q(b); }},
+        {"q+see",     [&](agent::minimax_GPTproposed& b){ plain_q(b); b.setUseSEEPruning(true); }},
+        {"q+delta",   [&](agent::minimax_GPTproposed& b){ plain_q(b); b.setUseDeltaPruning(true); }},
+        {"q+tt",      [&](agent::minimax_GPTproposed& b){ plain_q(b); b.setUseQSearchTT(true); }},
+    };
+
+    std::cout << "search A/B, depth=" << depth << "\n";
+    std::vector<uint64_t> total_nodes(configs.size(), 0);
+    std::vector<uint64_t> total_qnodes(configs.size(), 0);
+    std::vector<uint64_t> total_probes(configs.size(), 0);
+    std::vector<uint64_t> total_hits(configs.size(), 0);
+    // 평가 캐시 적중률(%)
+    auto hit_rate = [](uint64_t hits, uint64_t probes){ return probes ? 100.0 * double(hits) / double(probes) : 0.0; };
+    std::vector<double> total_ms(configs.size(), 0.0);
+    std::vector<std::vector<std::string>> best_moves(configs.size());
+
+    for(size_t pid=0; pid<samples.size(); ++pid){
+        for(size_t ci=0; ci<configs.size(); ++ci){
+            const bench::runResult run = bench::runConfig(configs[ci], samples[pid], depth);
+            const agent::calcInfo &info = run.info;
+            const double ms = run.ms;
+            total_nodes[ci] += info.nodes;
+            total_qnodes[ci] += info.qnodes;
+            total_probes[ci] += info.eval_probes;
+            total_hits[ci] += info.eval_hits;
+            total_ms[ci] += ms;
+            best_moves[ci].push_back(bench::moveToStr(info.bestMove));
+
+            std::cout << "pos " << pid+1 << " " << std::left << std::setw(10) << configs[ci].name << std::right
+                      << " nodes=" << std::setw(10) << info.nodes
+                      << " qnodes=" << std::setw(10) << info.qnodes
+                      << " time=" << std::fixed << std::setprecision(1) << std::setw(9) << ms << "ms"
+                      << " evalhit=" << std::setw(5) << hit_rate(info.eval_hits, info.eval_probes) << "%"
+                      << " eval=" << info.eval_val
+                      << " depth=" << info.depth;
+            if(info.bestMove.getMoveType() == moveType::NONE) std::cout << " NO_MOVE";
+            else std::cout << " move=" << static_cast<int>(info.bestMove.getMoveType())
+                           << "@" << info.bestMove.getFromSquare().first << info.bestMove.getFromSquare().second
+                           << "-" << info.bestMove.getToSquare().first << info.bestMove.getToSquare().second;
+            std::cout << "\n";
+        }
+    }
+
+    std::cout << "\ntotal:\n";
+    for(size_t ci=0; ci<configs.size(); ++ci){
+        std::cout << std::left << std::setw(10) << configs[ci].name << std::right
+                  << " nodes=" << std::setw(10) << total_nodes[ci]
+                  << " (" << std::setprecision(2) << (total_nodes[0] ? double(total_nodes[ci]) / double(total_nodes[0]) : 0.0) << "x)"
+                  << " qnodes=" << std::setw(10) << total_qnodes[ci]
+                  << " time=" << std::setprecision(1) << std::setw(9) << total_ms[ci] << "ms"
+                  << " (" << std::setprecision(2) << (total_ms[0] > 0.0 ? total_ms[ci] / total_ms[0] : 0.0) << "x)"
+                  << " evalhit=" << std::setprecision(1) << std::setw(5) << hit_rate(total_hits[ci], total_probes[ci]) << "%\n";
+    }
+
+    // 기본으로 켜진 가지치기는 각각 pvs(가지치기 없음)보다 노드 수를 줄이고 모든 포지션에서 같은 최선수를 내야 한다
+    auto index_of = [&](const std::string& name){
+        for(size_t ci=0; ci<configs.size(); ++ci) if(configs[ci].name == name) return ci;
+        return configs.size();
+    };
+    const agent::minimax_GPTproposed defaults(colorType::WHITE);
+    const std::vector<std::pair<std::string, bool>> default_pruning = {
+        {"+null", defaults.getNullMove()},
+        {"+lmr", defaults.getUseLMR()},
+        {"+futility", defaults.getUseFutility()},
+        {"+rfp", defaults.getUseReverseFutility()},
+    };
+    const size_t ref = index_of("pvs");
+    int failed = 0;
+    std::cout << "\ndefault-on pruning vs pvs:\n";
+    for(const auto& entry : default_pruning){
+        if(!entry.second) continue;
+        const size_t ci = index_of(entry.first);
+        std::string changed;
+        for(size_t pid=0; pid<samples.size(); ++pid){
+            if(best_moves[ci][pid] != best_moves[ref][pid]) changed += " " + std::to_string(pid+1);
+        }
+        const bool fewer = total_nodes[ci] < total_nodes[ref];
+        std::cout << std::left << std::setw(10) << entry.first << std::right
+                  << " nodes " << std::setprecision(2) << double(total_nodes[ci]) / double(std::max<uint64_t>(total_nodes[ref], 1)) << "x"
+                  << (fewer ? "" : " (NOT FEWER)")
+                  << (changed.empty() ? " best move unchanged" : " best move CHANGED at pos" + changed) << "\n";
+        if(!fewer || !changed.empty()) ++failed;
+    }
+    return failed ? 1 : 0;
+}
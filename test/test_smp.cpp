@@ -0,0 +1,50 @@
+// Lazy SMP 벤치마크: bench_common.hpp의 샘플 포지션에서 스레드 수(1, 2, 4, ... N)별로
+// 같은 깊이까지 도달하는 시간(time-to-depth)과 노드 수를 잰다.
+// 사용법: test_smp [depth] [max_threads]   (기본: depth 5, max_threads = 코어 수)
+#include "bench_common.hpp"
+
+#include <cstdlib>
+#include <iomanip>
+#include <iostream>
+#include <thread>
+#include <vector>
+
+int main(int argc, char** argv){
+    const int depth = (argc > 1) ? std::atoi(argv[1]) : 5;
+    int max_threads = (argc > 2) ? std::atoi(argv[2]) : static_cast<int>(std::thread::hardware_concurrency());
+    if(max_threads < 2) max_threads = 2;
+
+    const std::vector<position> samples = bench::samplePositions();
+
+    std::vector<int> thread_counts;
+    for(int t = 1; t < max_threads; t *= 2) thread_counts.push_back(t);
+    thread_counts.push_back(max_threads);
+
+    std::cout << "Lazy SMP time-to-depth, depth=" << depth << ", hardware threads=" << std::thread::hardware_concurrency() << "\n";
+    std::vector<double> total_ms(thread_counts.size(), 0.0);
+    const bench::searchConfig config{"default", nullptr};
+
+    for(size_t pid=0; pid<samples.size(); ++pid){
+        double base_ms = 0.0;
+        for(size_t ti=0; ti<thread_counts.size(); ++ti){
+            const int threads = thread_counts[ti];
+            const bench::runResult run = bench::runConfig(config, samples[pid], depth, threads);
+            if(ti == 0) base_ms = run.ms;
+            total_ms[ti] += run.ms;
+
+            std::cout << "pos " << pid+1 << " threads=" << std::setw(2) << threads
+                      << " time=" << std::fixed << std::setprecision(1) << std::setw(9) << run.ms << "ms"
+                      << " nodes=" << std::setw(10) << run.info.nodes
+                      << " speedup=" << std::setprecision(2) << (run.ms > 0.0 ? base_ms / run.ms : 0.0)
+                      << (run.info.bestMove.getMoveType() == moveType::NONE ? " NO_MOVE" : "") << "\n";
+        }
+    }
+
+    std::cout << "\ntotal:\n";
+    for(size_t ti=0; ti<thread_counts.size(); ++ti){
+        std::cout << "threads=" << std::setw(2) << thread_counts[ti]
+                  << " time=" << std::fixed << std::setprecision(1) << std::setw(9) << total_ms[ti] << "ms"
+                  << " speedup=" << std::setprecision(2) << (total_ms[ti] > 0.0 ? total_ms[0] / total_ms[ti] : 0.0) << "\n";
+    }
+    return 0;
+}